@@ -68,6 +68,7 @@ from zepben.evolve.model.cim.iec61970.infiec61970.feeder.circuit import *
 from zepben.evolve.model.cim.iec61970.infiec61970.feeder.loop import *
 from zepben.evolve.model.phasedirection import *
 from zepben.evolve.model.phases import *
+from zepben.evolve.model.network_scenario import *
 
 
 from zepben.evolve.services.network.tracing.traversals.tracker import *
@@ -85,6 +86,12 @@ from zepben.evolve.services.network.tracing.util import *
 from zepben.evolve.services.network.tracing.find import *
 from zepben.evolve.services.network.tracing.traces import *
 from zepben.evolve.services.network.tracing.connectivity import *
+from zepben.evolve.services.network.tracing.compiled_topology import *
+from zepben.evolve.services.network.tracing.phases.bulk_phasing import *
+from zepben.evolve.services.network.tracing.downstream_index import *
+from zepben.evolve.services.network.tracing.upstream_device_index import *
+from zepben.evolve.services.network.tracing.shortest_path import *
+from zepben.evolve.services.network.tracing.network_islands import *
 
 from zepben.evolve.services.network.translator.network_proto2cim import *
 from zepben.evolve.services.network.translator.network_cim2proto import *
@@ -92,6 +99,7 @@ from zepben.evolve.services.network.network import *
 from zepben.evolve.services.common.translator.base_cim2proto import *
 from zepben.evolve.services.common.translator.base_proto2cim import *
 from zepben.evolve.services.common.base_service import *
+from zepben.evolve.services.common.attribute_index import *
 from zepben.evolve.services.common.reference_resolvers import BoundReferenceResolver, ReferenceResolver, UnresolvedReference
 import zepben.evolve.services.common.resolver as resolver
 
@@ -112,6 +120,7 @@ from zepben.evolve.streaming.get.consumer import *
 from zepben.evolve.streaming.get.customer_consumer import *
 from zepben.evolve.streaming.get.diagram_consumer import *
 from zepben.evolve.streaming.get.network_consumer import *
+from zepben.evolve.streaming.get.partitioned_network import *
 from zepben.evolve.streaming.exceptions import *
 from zepben.evolve.streaming.grpc.grpc import *
 from zepben.evolve.streaming.grpc.connect import *
@@ -6,11 +6,11 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61968.common.location import Location
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove
+from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove_by_id
 
 __all__ = ["Asset", "AssetContainer"]
 
@@ -26,7 +26,7 @@ class Asset(IdentifiedObject):
     location: Optional[Location] = None
     """`zepben.evolve.cim.iec61968.common.location.Location` of this asset"""
 
-    _organisation_roles: Optional[List[AssetOrganisationRole]] = None
+    _organisation_roles: Optional[Dict[str, AssetOrganisationRole]] = None
 
     def __init__(self, organisation_roles: List[AssetOrganisationRole] = None):
         if organisation_roles:
@@ -44,7 +44,7 @@ class Asset(IdentifiedObject):
         """
         The `zepben.evolve.cim.iec61968.assets.asset_organisation_role.AssetOrganisationRole`s of this `Asset`.
         """
-        return ngen(self._organisation_roles)
+        return ngen(self._organisation_roles.values() if self._organisation_roles is not None else None)
 
     def get_organisation_role(self, mrid: str) -> AssetOrganisationRole:
         """
@@ -66,8 +66,8 @@ class Asset(IdentifiedObject):
         if self._validate_reference(role, self.get_organisation_role, "An AssetOrganisationRole"):
             return self
 
-        self._organisation_roles = list() if self._organisation_roles is None else self._organisation_roles
-        self._organisation_roles.append(role)
+        self._organisation_roles = dict() if self._organisation_roles is None else self._organisation_roles
+        self._organisation_roles[role.mrid] = role
         return self
 
     def remove_organisation_role(self, role: AssetOrganisationRole) -> Asset:
@@ -79,7 +79,7 @@ class Asset(IdentifiedObject):
         Raises `ValueError` if `role` was not associated with this `Asset`.
         Returns A reference to this `Asset` to allow fluent use.
         """
-        self._organisation_roles = safe_remove(self._organisation_roles, role)
+        self._organisation_roles = safe_remove_by_id(self._organisation_roles, role)
         return self
 
     def clear_organisation_roles(self) -> Asset:
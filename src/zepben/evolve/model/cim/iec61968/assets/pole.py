@@ -6,10 +6,10 @@
 
 from __future__ import annotations
 
-from typing import List, Optional, Generator
+from typing import List, Optional, Generator, Dict
 
 from zepben.evolve.model.cim.iec61968.assets.structure import Structure
-from zepben.evolve.util import get_by_mrid, ngen, nlen, safe_remove
+from zepben.evolve.util import get_by_mrid, ngen, nlen, safe_remove_by_id
 
 __all__ = ["Pole"]
 
@@ -20,7 +20,7 @@ class Pole(Structure):
     classification: str = ""
     """Pole class: 1, 2, 3, 4, 5, 6, 7, H1, H2, Other, Unknown."""
 
-    _streetlights: Optional[List[Streetlight]] = None
+    _streetlights: Optional[Dict[str, Streetlight]] = None
 
     def __init__(self, organisation_roles: List[AssetOrganisationRole] = None, streetlights: List[Streetlight] = None):
         super(Pole, self).__init__(organisation_roles=organisation_roles)
@@ -40,7 +40,7 @@ class Pole(Structure):
         """
         The `zepben.evolve.cim.iec61968.assets.streetlight.Streetlight`s of this `Pole`.
         """
-        return ngen(self._streetlights)
+        return ngen(self._streetlights.values() if self._streetlights is not None else None)
 
     def get_streetlight(self, mrid: str) -> Streetlight:
         """
@@ -63,8 +63,8 @@ class Pole(Structure):
         if self._validate_reference(streetlight, self.get_streetlight, "A Streetlight"):
             return self
 
-        self._streetlights = list() if self._streetlights is None else self._streetlights
-        self._streetlights.append(streetlight)
+        self._streetlights = dict() if self._streetlights is None else self._streetlights
+        self._streetlights[streetlight.mrid] = streetlight
         return self
 
     def remove_streetlight(self, streetlight: Streetlight) -> Pole:
@@ -74,7 +74,7 @@ class Pole(Structure):
         Raises `ValueError` if `streetlight` was not associated with this `Pole`.
         Returns A reference to this `Pole` to allow fluent use.
         """
-        self._streetlights = safe_remove(self._streetlights, streetlight)
+        self._streetlights = safe_remove_by_id(self._streetlights, streetlight)
         return self
 
     def clear_streetlights(self) -> Pole:
@@ -11,7 +11,7 @@ from typing import List, Optional, Generator, Tuple
 
 
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import require, nlen, ngen, safe_remove
+from zepben.evolve.util import require, nlen, ngen, safe_remove, mutable_list
 
 __all__ = ["PositionPoint", "Location", "StreetAddress", "TownDetail"]
 
@@ -132,7 +132,7 @@ class Location(IdentifiedObject):
         require(0 <= sequence_number <= self.num_points(),
                 lambda: f"Unable to add PositionPoint to Location {str(self)}. Sequence number {sequence_number} is invalid. "
                         f"Expected a value between 0 and {self.num_points()}. Make sure you are adding the points in order and there are no gaps in the numbering.")
-        self._position_points = [] if self._position_points is None else self._position_points
+        self._position_points = mutable_list(self._position_points)
         self._position_points.insert(sequence_number, point)
         return self
 
@@ -6,11 +6,11 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61968.common.organisation_role import OrganisationRole
 from zepben.evolve.model.cim.iec61968.customers.customer_kind import CustomerKind
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["Customer"]
 
@@ -23,7 +23,7 @@ class Customer(OrganisationRole):
     kind: CustomerKind = CustomerKind.UNKNOWN
     """Kind of customer"""
 
-    _customer_agreements: Optional[List[CustomerAgreement]] = None
+    _customer_agreements: Optional[Dict[str, CustomerAgreement]] = None
 
     def __init__(self, customer_agreements: List[CustomerAgreement] = None):
         if customer_agreements:
@@ -41,7 +41,7 @@ class Customer(OrganisationRole):
         """
         The `zepben.evolve.cim.iec61968.customers.customer_agreement.CustomerAgreement`s for this `Customer`.
         """
-        return ngen(self._customer_agreements)
+        return ngen(self._customer_agreements.values() if self._customer_agreements is not None else None)
 
     def get_agreement(self, mrid: str) -> CustomerAgreement:
         """
@@ -63,8 +63,8 @@ class Customer(OrganisationRole):
         if self._validate_reference(customer_agreement, self.get_agreement, "A CustomerAgreement"):
             return self
 
-        self._customer_agreements = list() if self._customer_agreements is None else self._customer_agreements
-        self._customer_agreements.append(customer_agreement)
+        self._customer_agreements = dict() if self._customer_agreements is None else self._customer_agreements
+        self._customer_agreements[customer_agreement.mrid] = customer_agreement
         return self
 
     def remove_agreement(self, customer_agreement: CustomerAgreement) -> Customer:
@@ -75,7 +75,7 @@ class Customer(OrganisationRole):
         Returns A reference to this `Customer` to allow fluent use.
         Raises `ValueError` if `customer_agreement` was not associated with this `Customer`.
         """
-        self._customer_agreements = safe_remove(self._customer_agreements, customer_agreement)
+        self._customer_agreements = safe_remove_by_id(self._customer_agreements, customer_agreement)
         return self
 
     def clear_agreements(self) -> Customer:
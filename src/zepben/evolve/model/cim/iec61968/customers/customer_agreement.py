@@ -6,10 +6,10 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61968.common.document import Agreement
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["CustomerAgreement"]
 
@@ -24,7 +24,7 @@ class CustomerAgreement(Agreement):
     _customer: Optional[Customer] = None
     """The `zepben.evolve.cim.iec61968.customers.customer.Customer` that has this `CustomerAgreement`."""
 
-    _pricing_structures: Optional[List[PricingStructure]] = None
+    _pricing_structures: Optional[Dict[str, PricingStructure]] = None
 
     def __init__(self, customer: Customer = None, pricing_structures: List[PricingStructure] = None):
         self.customer = customer
@@ -55,7 +55,7 @@ class CustomerAgreement(Agreement):
         """
         The `zepben.evolve.cim.iec61968.customers.pricing_structure.PricingStructure`s of this `CustomerAgreement`.
         """
-        return ngen(self._pricing_structures)
+        return ngen(self._pricing_structures.values() if self._pricing_structures is not None else None)
 
     def get_pricing_structure(self, mrid: str) -> PricingStructure:
         """
@@ -78,8 +78,8 @@ class CustomerAgreement(Agreement):
         if self._validate_reference(ps, self.get_pricing_structure, "A PricingStructure"):
             return self
 
-        self._pricing_structures = list() if self._pricing_structures is None else self._pricing_structures
-        self._pricing_structures.append(ps)
+        self._pricing_structures = dict() if self._pricing_structures is None else self._pricing_structures
+        self._pricing_structures[ps.mrid] = ps
         return self
 
     def remove_pricing_structure(self, ps: PricingStructure) -> CustomerAgreement:
@@ -90,7 +90,7 @@ class CustomerAgreement(Agreement):
         Returns A reference to this `CustomerAgreement` to allow fluent use.
         Raises `ValueError` if `ps` was not associated with this `CustomerAgreement`.
         """
-        self._pricing_structures = safe_remove(self._pricing_structures, ps)
+        self._pricing_structures = safe_remove_by_id(self._pricing_structures, ps)
         return self
 
     def clear_pricing_structures(self) -> CustomerAgreement:
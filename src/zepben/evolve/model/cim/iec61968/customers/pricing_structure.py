@@ -8,10 +8,10 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61968.common.document import Document
-from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove
+from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove_by_id
 
 __all__ = ["PricingStructure"]
 
@@ -23,7 +23,7 @@ class PricingStructure(Document):
     customer classification, site characteristics, classification (i.e. fee price structure, deposit price
     structure, electric service price structure, etc.) and accounting requirements.
     """
-    _tariffs: Optional[List[Tariff]] = None
+    _tariffs: Optional[Dict[str, Tariff]] = None
 
     def __init__(self, tariffs: List[Tariff] = None):
         if tariffs:
@@ -41,7 +41,7 @@ class PricingStructure(Document):
         """
         The `zepben.evolve.cim.iec61968.customers.tariff.Tariff`s of this `PricingStructure`.
         """
-        return ngen(self._tariffs)
+        return ngen(self._tariffs.values() if self._tariffs is not None else None)
 
     def get_tariff(self, mrid: str) -> Tariff:
         """
@@ -63,8 +63,8 @@ class PricingStructure(Document):
         """
         if self._validate_reference(tariff, self.get_tariff, "A Tariff"):
             return self
-        self._tariffs = list() if self._tariffs is None else self._tariffs
-        self._tariffs.append(tariff)
+        self._tariffs = dict() if self._tariffs is None else self._tariffs
+        self._tariffs[tariff.mrid] = tariff
         return self
 
     def remove_tariff(self, tariff: Tariff) -> PricingStructure:
@@ -75,7 +75,7 @@ class PricingStructure(Document):
         Returns A reference to this `PricingStructure` to allow fluent use.
         Raises `ValueError` if `tariff` was not associated with this `PricingStructure`.
         """
-        self._tariffs = safe_remove(self._tariffs, tariff)
+        self._tariffs = safe_remove_by_id(self._tariffs, tariff)
         return self
 
     def clear_tariffs(self) -> PricingStructure:
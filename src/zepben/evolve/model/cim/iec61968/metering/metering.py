@@ -7,13 +7,13 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional, Generator
+from typing import Optional, Generator, Dict
 from typing import List
 
 from zepben.evolve.model.cim.iec61968.assets.asset import AssetContainer
 from zepben.evolve.model.cim.iec61968.common.location import Location
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["Meter", "EndDevice", "UsagePoint"]
 
@@ -41,7 +41,7 @@ class EndDevice(AssetContainer):
     service_location: Optional[Location] = None
     """Service `zepben.evolve.cim.iec61968.common.location.Location` whose service delivery is measured by this `EndDevice`."""
 
-    _usage_points: Optional[List[UsagePoint]] = None
+    _usage_points: Optional[Dict[str, UsagePoint]] = None
 
     def __init__(self, organisation_roles: List[AssetOrganisationRole] = None, usage_points: List[UsagePoint] = None):
         super(EndDevice, self).__init__(organisation_roles=organisation_roles)
@@ -60,7 +60,7 @@ class EndDevice(AssetContainer):
         """
         The `zepben.evolve.cim.iec61968.metering.metering.UsagePoint`s associated with this `EndDevice`
         """
-        return ngen(self._usage_points)
+        return ngen(self._usage_points.values() if self._usage_points is not None else None)
 
     def get_usage_point(self, mrid: str) -> UsagePoint:
         """
@@ -82,8 +82,8 @@ class EndDevice(AssetContainer):
         """
         if self._validate_reference(up, self.get_usage_point, "A UsagePoint"):
             return self
-        self._usage_points = list() if self._usage_points is None else self._usage_points
-        self._usage_points.append(up)
+        self._usage_points = dict() if self._usage_points is None else self._usage_points
+        self._usage_points[up.mrid] = up
         return self
 
     def remove_usage_point(self, up: UsagePoint) -> EndDevice:
@@ -94,7 +94,7 @@ class EndDevice(AssetContainer):
         Returns A reference to this `EndDevice` to allow fluent use.
         Raises `ValueError` if `up` was not associated with this `EndDevice`.
         """
-        self._usage_points = safe_remove(self._usage_points, up)
+        self._usage_points = safe_remove_by_id(self._usage_points, up)
         return self
 
     def clear_usage_points(self) -> EndDevice:
@@ -115,8 +115,8 @@ class UsagePoint(IdentifiedObject):
     usage_point_location: Optional[Location] = None
     """Service `zepben.evolve.cim.iec61968.common.location.Location` where the service delivered by this `UsagePoint` is consumed."""
 
-    _equipment: Optional[List[Equipment]] = None
-    _end_devices: Optional[List[EndDevice]] = None
+    _equipment: Optional[Dict[str, Equipment]] = None
+    _end_devices: Optional[Dict[str, EndDevice]] = None
 
     def __init__(self, equipment: List[Equipment] = None, end_devices: List[EndDevice] = None):
         if equipment:
@@ -143,14 +143,14 @@ class UsagePoint(IdentifiedObject):
         """
         The `EndDevice`'s (Meter's) associated with this `UsagePoint`.
         """
-        return ngen(self._end_devices)
+        return ngen(self._end_devices.values() if self._end_devices is not None else None)
 
     @property
     def equipment(self) -> Generator[Equipment, None, None]:
         """
         The `zepben.model.Equipment` associated with this `UsagePoint`.
         """
-        return ngen(self._equipment)
+        return ngen(self._equipment.values() if self._equipment is not None else None)
 
     def get_equipment(self, mrid: str) -> Equipment:
         """
@@ -173,8 +173,8 @@ class UsagePoint(IdentifiedObject):
         if self._validate_reference(equipment, self.get_equipment, "An Equipment"):
             return self
 
-        self._equipment = list() if self._equipment is None else self._equipment
-        self._equipment.append(equipment)
+        self._equipment = dict() if self._equipment is None else self._equipment
+        self._equipment[equipment.mrid] = equipment
         return self
 
     def remove_equipment(self, equipment: Equipment) -> UsagePoint:
@@ -185,7 +185,7 @@ class UsagePoint(IdentifiedObject):
         Returns A reference to this `UsagePoint` to allow fluent use.
         Raises `ValueError` if `equipment` was not associated with this `UsagePoint`.
         """
-        self._equipment = safe_remove(self._equipment, equipment)
+        self._equipment = safe_remove_by_id(self._equipment, equipment)
         return self
 
     def clear_equipment(self) -> UsagePoint:
@@ -216,8 +216,8 @@ class UsagePoint(IdentifiedObject):
         """
         if self._validate_reference(end_device, self.get_end_device, "An EndDevice"):
             return self
-        self._end_devices = list() if self._end_devices is None else self._end_devices
-        self._end_devices.append(end_device)
+        self._end_devices = dict() if self._end_devices is None else self._end_devices
+        self._end_devices[end_device.mrid] = end_device
         return self
 
     def remove_end_device(self, end_device: EndDevice) -> UsagePoint:
@@ -228,7 +228,7 @@ class UsagePoint(IdentifiedObject):
         Returns A reference to this `UsagePoint` to allow fluent use.
         Raises `ValueError` if `end_device` was not associated with this `UsagePoint`.
         """
-        self._end_devices = safe_remove(self._end_devices, end_device)
+        self._end_devices = safe_remove_by_id(self._end_devices, end_device)
         return self
 
     def clear_end_devices(self) -> UsagePoint:
@@ -6,10 +6,10 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61968.common.document import Document
-from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove
+from zepben.evolve.util import get_by_mrid, nlen, ngen, safe_remove_by_id
 
 __all__ = ["OperationalRestriction"]
 
@@ -25,7 +25,7 @@ class OperationalRestriction(Document):
     They then apply operational restrictions in the operational systems to warn operators of potential problems.
     After appropriate inspection and maintenance, the operational restrictions may be removed.
     """
-    _equipment: Optional[List[Equipment]] = None
+    _equipment: Optional[Dict[str, Equipment]] = None
 
     def __init__(self, equipment: List[Equipment] = None):
         if equipment:
@@ -44,7 +44,7 @@ class OperationalRestriction(Document):
         """
         The `zepben.evolve.cim.iec61970.base.core.equipment.Equipment` to which this `OperationalRestriction` applies.
         """
-        return ngen(self._equipment)
+        return ngen(self._equipment.values() if self._equipment is not None else None)
 
     def get_equipment(self, mrid: str) -> Equipment:
         """
@@ -66,8 +66,8 @@ class OperationalRestriction(Document):
         """
         if self._validate_reference(equipment, self.get_equipment, "An Equipment"):
             return self
-        self._equipment = list() if self._equipment is None else self._equipment
-        self._equipment.append(equipment)
+        self._equipment = dict() if self._equipment is None else self._equipment
+        self._equipment[equipment.mrid] = equipment
         return self
 
     def remove_equipment(self, equipment: Equipment) -> OperationalRestriction:
@@ -78,7 +78,7 @@ class OperationalRestriction(Document):
         Returns A reference to this `OperationalRestriction` to allow fluent use.
         Raises `ValueError` if `equipment` was not associated with this `OperationalRestriction`.
         """
-        self._equipment = safe_remove(self._equipment, equipment)
+        self._equipment = safe_remove_by_id(self._equipment, equipment)
         return self
 
     def clear_equipment(self) -> OperationalRestriction:
@@ -13,7 +13,7 @@ from zepben.evolve.model.cim.iec61970.base.core.equipment import Equipment
 
 __all__ = ['ConductingEquipment']
 
-from zepben.evolve.util import get_by_mrid, require
+from zepben.evolve.util import get_by_mrid, require, mutable_list
 
 
 class ConductingEquipment(Equipment):
@@ -106,6 +106,7 @@ class ConductingEquipment(Equipment):
         if terminal.sequence_number == 0:
             terminal.sequence_number = self.num_terminals() + 1
 
+        self._terminals = mutable_list(self._terminals)
         self._terminals.append(terminal)
         self._terminals.sort(key=lambda t: t.sequence_number)
 
@@ -119,6 +120,7 @@ class ConductingEquipment(Equipment):
         Returns A reference to this `ConductingEquipment` to allow fluent use.
         Raises `ValueError` if `terminal` was not associated with this `ConductingEquipment`.
         """
+        self._terminals = mutable_list(self._terminals)
         self._terminals.remove(terminal)
         return self
 
@@ -127,7 +129,7 @@ class ConductingEquipment(Equipment):
         Clear all terminals.
         Returns A reference to this `ConductingEquipment` to allow fluent use.
         """
-        self._terminals.clear()
+        self._terminals = []
         return self
 
     def __repr__(self):
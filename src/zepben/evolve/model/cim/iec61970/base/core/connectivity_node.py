@@ -6,12 +6,12 @@
 
 from __future__ import annotations
 
-from typing import Generator, List
+from typing import Generator, List, Dict
 
 from dataclassy import dataclass
 
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import get_by_mrid
+from zepben.evolve.util import get_by_mrid, safe_remove_by_id
 
 __all__ = ["ConnectivityNode"]
 
@@ -21,16 +21,19 @@ class ConnectivityNode(IdentifiedObject):
     """
     Connectivity nodes are points where terminals of AC conducting equipment are connected together with zero impedance.
     """
-    __slots__ = ["_terminals", "__weakref__"]
-    _terminals: List[Terminal] = []
+    __slots__ = ["_terminals", "_connectivity", "__weakref__"]
+    _terminals: Dict[str, Terminal] = dict()
 
     def __init__(self, terminals: List[Terminal] = None):
+        # The connectivity between the terminals of this node, cached by `zepben.evolve.services.network.tracing.connectivity.get_connectivity`.
+        # This is not a field, so it is not compared or copied, and is cleared whenever the terminals of this node change.
+        self._connectivity = None
         if terminals:
             for term in terminals:
                 self.add_terminal(term)
 
     def __iter__(self):
-        return iter(self._terminals)
+        return iter(self._terminals.values())
 
     def num_terminals(self):
         """
@@ -43,7 +46,7 @@ class ConnectivityNode(IdentifiedObject):
         """
         The `zepben.evolve.cim.iec61970.base.core.terminal.Terminal`s attached to this `ConnectivityNode`
         """
-        for term in self._terminals:
+        for term in self._terminals.values():
             yield term
 
     def get_terminal_by_mrid(self, mrid: str) -> Terminal:
@@ -67,7 +70,8 @@ class ConnectivityNode(IdentifiedObject):
         if self._validate_reference(terminal, self.get_terminal_by_mrid, "A Terminal"):
             return self
 
-        self._terminals.append(terminal)
+        self._terminals[terminal.mrid] = terminal
+        self._connectivity = None
         return self
 
     def remove_terminal(self, terminal: Terminal) -> ConnectivityNode:
@@ -78,7 +82,8 @@ class ConnectivityNode(IdentifiedObject):
         Returns A reference to this `ConnectivityNode` to allow fluent use.
         Raises `ValueError` if `terminal` was not associated with this `ConnectivityNode`.
         """
-        self._terminals.remove(terminal)
+        self._terminals = safe_remove_by_id(self._terminals, terminal) or dict()
+        self._connectivity = None
         return self
 
     def clear_terminals(self) -> ConnectivityNode:
@@ -86,14 +91,15 @@ class ConnectivityNode(IdentifiedObject):
         Clear all terminals.
         Returns A reference to this `ConnectivityNode` to allow fluent use.
         """
-        self._terminals.clear()
+        self._terminals = dict()
+        self._connectivity = None
         return self
 
     def is_switched(self):
         return self.get_switch() is not None
 
     def get_switch(self):
-        for term in self._terminals:
+        for term in self._terminals.values():
             try:
                 # All switches should implement is_open
                 _ = term.conducting_equipment.is_open()
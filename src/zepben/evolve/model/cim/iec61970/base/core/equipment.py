@@ -6,12 +6,13 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61970.base.core.equipment_container import Feeder, Site
 from zepben.evolve.model.cim.iec61970.base.core.power_system_resource import PowerSystemResource
 from zepben.evolve.model.cim.iec61970.base.core.substation import Substation
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.model.network_scenario import scenario_state, set_scenario_state, owned_scenario_state
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ['Equipment']
 
@@ -27,10 +28,10 @@ class Equipment(PowerSystemResource):
     normally_in_service: bool = True
     """If True, the equipment is _normally_ in service."""
 
-    _usage_points: Optional[List[UsagePoint]] = None
-    _equipment_containers: Optional[List[EquipmentContainer]] = None
-    _operational_restrictions: Optional[List[OperationalRestriction]] = None
-    _current_feeders: Optional[List[Feeder]] = None
+    _usage_points: Optional[Dict[str, UsagePoint]] = None
+    _equipment_containers: Optional[Dict[str, EquipmentContainer]] = None
+    _operational_restrictions: Optional[Dict[str, OperationalRestriction]] = None
+    _current_feeders: Optional[Dict[str, Feeder]] = None
 
     def __init__(self, usage_points: List[UsagePoint] = None, equipment_containers: List[EquipmentContainer] = None,
                  operational_restrictions: List[OperationalRestriction] = None, current_feeders: List[Feeder] = None):
@@ -52,14 +53,15 @@ class Equipment(PowerSystemResource):
         """
         The `zepben.evolve.cim.iec61970.base.core.equipment_container.EquipmentContainer`s this equipment belongs to.
         """
-        return ngen(self._equipment_containers)
+        return ngen(self._equipment_containers.values() if self._equipment_containers is not None else None)
 
     @property
     def current_feeders(self) -> Generator[Feeder, None, None]:
         """
         The current `zepben.evolve.cim.iec61970.base.core.equipment_container.Feeder`s this equipment belongs to.
         """
-        return ngen(self._current_feeders)
+        current_feeders = scenario_state(self, "_current_feeders")
+        return ngen(current_feeders.values() if current_feeders is not None else None)
 
     @property
     def normal_feeders(self) -> Generator[Feeder, None, None]:
@@ -90,14 +92,14 @@ class Equipment(PowerSystemResource):
         """
         The `zepben.evolve.cim.iec61968.metering.metering.UsagePoint`s for this equipment.
         """
-        return ngen(self._usage_points)
+        return ngen(self._usage_points.values() if self._usage_points is not None else None)
 
     @property
     def operational_restrictions(self) -> Generator[OperationalRestriction, None, None]:
         """
         The `zepben.evolve.cim.iec61968.operations.operational_restriction.OperationalRestriction`s that this equipment is associated with.
         """
-        return ngen(self._operational_restrictions)
+        return ngen(self._operational_restrictions.values() if self._operational_restrictions is not None else None)
 
     def num_equipment_containers(self) -> int:
         """
@@ -133,7 +135,7 @@ class Equipment(PowerSystemResource):
         """
         Returns The number of `zepben.evolve.cim.iec61970.base.core.equipment_container.Feeder`s associated with this `Equipment`
         """
-        return nlen(self._current_feeders)
+        return nlen(scenario_state(self, "_current_feeders"))
 
     def num_restrictions(self) -> int:
         """
@@ -161,8 +163,8 @@ class Equipment(PowerSystemResource):
         """
         if self._validate_reference(ec, self.get_container, "An EquipmentContainer"):
             return self
-        self._equipment_containers = list() if self._equipment_containers is None else self._equipment_containers
-        self._equipment_containers.append(ec)
+        self._equipment_containers = dict() if self._equipment_containers is None else self._equipment_containers
+        self._equipment_containers[ec.mrid] = ec
         return self
 
     def remove_containers(self, ec: EquipmentContainer) -> Equipment:
@@ -173,7 +175,7 @@ class Equipment(PowerSystemResource):
         Returns A reference to this `Equipment` to allow fluent use.
         Raises `ValueError` if `ec` was not associated with this `Equipment`.
         """
-        self._equipment_containers = safe_remove(self._equipment_containers, ec)
+        self._equipment_containers = safe_remove_by_id(self._equipment_containers, ec)
         return self
 
     def clear_containers(self) -> Equipment:
@@ -192,7 +194,7 @@ class Equipment(PowerSystemResource):
         Returns The `zepben.evolve.cim.iec61970.base.core.equipment_container.Feeder` with the specified `mrid` if it exists
         Raises `KeyError` if `mrid` wasn't present.
         """
-        return get_by_mrid(self._current_feeders, mrid)
+        return get_by_mrid(scenario_state(self, "_current_feeders"), mrid)
 
     def add_current_feeder(self, feeder: Feeder) -> Equipment:
         """
@@ -204,8 +206,7 @@ class Equipment(PowerSystemResource):
         """
         if self._validate_reference(feeder, self.get_current_feeder, "A Feeder"):
             return self
-        self._current_feeders = list() if self._current_feeders is None else self._current_feeders
-        self._current_feeders.append(feeder)
+        owned_scenario_state(self, "_current_feeders", dict)[feeder.mrid] = feeder
         return self
 
     def remove_current_feeder(self, feeder: Feeder) -> Equipment:
@@ -216,7 +217,10 @@ class Equipment(PowerSystemResource):
         Returns A reference to this `Equipment` to allow fluent use.
         Raises `ValueError` if `feeder` was not associated with this `Equipment`.
         """
-        self._current_feeders = safe_remove(self._current_feeders, feeder)
+        current_feeders = scenario_state(self, "_current_feeders")
+        if current_feeders is not None:
+            current_feeders = owned_scenario_state(self, "_current_feeders", dict)
+        set_scenario_state(self, "_current_feeders", safe_remove_by_id(current_feeders, feeder))
         return self
 
     def clear_current_feeders(self) -> Equipment:
@@ -224,7 +228,7 @@ class Equipment(PowerSystemResource):
         Clear all current `Feeder`s.
         Returns A reference to this `Equipment` to allow fluent use.
         """
-        self._current_feeders = None
+        set_scenario_state(self, "_current_feeders", None)
         return self
 
     def get_usage_point(self, mrid: str) -> UsagePoint:
@@ -247,8 +251,8 @@ class Equipment(PowerSystemResource):
         """
         if self._validate_reference(up, self.get_usage_point, "A UsagePoint"):
             return self
-        self._usage_points = list() if self._usage_points is None else self._usage_points
-        self._usage_points.append(up)
+        self._usage_points = dict() if self._usage_points is None else self._usage_points
+        self._usage_points[up.mrid] = up
         return self
 
     def remove_usage_point(self, up: UsagePoint) -> Equipment:
@@ -259,7 +263,7 @@ class Equipment(PowerSystemResource):
         Returns A reference to this `Equipment` to allow fluent use.
         Raises `ValueError` if `up` was not associated with this `Equipment`.
         """
-        self._usage_points = safe_remove(self._usage_points, up)
+        self._usage_points = safe_remove_by_id(self._usage_points, up)
         return self
 
     def clear_usage_points(self) -> Equipment:
@@ -290,8 +294,8 @@ class Equipment(PowerSystemResource):
         """
         if self._validate_reference(op, self.get_restriction, "An OperationalRestriction"):
             return self
-        self._operational_restrictions = list() if self._operational_restrictions is None else self._operational_restrictions
-        self._operational_restrictions.append(op)
+        self._operational_restrictions = dict() if self._operational_restrictions is None else self._operational_restrictions
+        self._operational_restrictions[op.mrid] = op
         return self
 
     def remove_restriction(self, op: OperationalRestriction) -> Equipment:
@@ -302,7 +306,7 @@ class Equipment(PowerSystemResource):
         Returns A reference to this `Equipment` to allow fluent use.
         Raises `ValueError` if `op` was not associated with this `Equipment`.
         """
-        self._operational_restrictions = safe_remove(self._operational_restrictions, op)
+        self._operational_restrictions = safe_remove_by_id(self._operational_restrictions, op)
         return self
 
     def clear_restrictions(self) -> Equipment:
@@ -316,6 +320,6 @@ class Equipment(PowerSystemResource):
     def _equipment_containers_of_type(self, ectype: type) -> List[EquipmentContainer]:
         """Get the `EquipmentContainer`s for this `Equipment` of type `ectype`"""
         if self._equipment_containers:
-            return [ec for ec in self._equipment_containers if isinstance(ec, ectype)]
+            return [ec for ec in self._equipment_containers.values() if isinstance(ec, ectype)]
         else:
             return []
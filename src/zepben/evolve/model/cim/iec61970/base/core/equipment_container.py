@@ -9,6 +9,7 @@ from __future__ import annotations
 from typing import Optional, Dict, Generator, List
 
 from zepben.evolve.model.cim.iec61970.base.core.connectivity_node_container import ConnectivityNodeContainer
+from zepben.evolve.model.network_scenario import scenario_state, set_scenario_state, owned_scenario_state
 from zepben.evolve.util import nlen, ngen
 
 __all__ = ['EquipmentContainer', 'Feeder', 'Site']
@@ -157,13 +158,14 @@ class Feeder(EquipmentContainer):
         """
         Contained `zepben.evolve.iec61970.base.core.equipment.Equipment` using the current state of the network.
         """
-        return ngen(self._current_equipment.values() if self._current_equipment is not None else None)
+        current_equipment = scenario_state(self, "_current_equipment")
+        return ngen(current_equipment.values() if current_equipment is not None else None)
 
     def num_current_equipment(self):
         """
         Returns The number of `zepben.evolve.iec61970.base.core.equipment.Equipment` associated with this `Feeder`
         """
-        return nlen(self._current_equipment)
+        return nlen(scenario_state(self, "_current_equipment"))
 
     def get_current_equipment(self, mrid: str) -> Equipment:
         """
@@ -173,10 +175,11 @@ class Feeder(EquipmentContainer):
         Returns The `zepben.evolve.iec61970.base.core.equipment.Equipment` with the specified `mrid` if it exists
         Raises `KeyError` if `mrid` wasn't present.
         """
-        if not self._current_equipment:
+        current_equipment = scenario_state(self, "_current_equipment")
+        if not current_equipment:
             raise KeyError(mrid)
         try:
-            return self._current_equipment[mrid]
+            return current_equipment[mrid]
         except AttributeError:
             raise KeyError(mrid)
 
@@ -190,8 +193,7 @@ class Feeder(EquipmentContainer):
         """
         if self._validate_reference(equipment, self.get_current_equipment, "An Equipment"):
             return self
-        self._current_equipment = dict() if self._current_equipment is None else self._current_equipment
-        self._current_equipment[equipment.mrid] = equipment
+        owned_scenario_state(self, "_current_equipment", dict)[equipment.mrid] = equipment
         return self
 
     def remove_current_equipment(self, equipment: Equipment) -> Feeder:
@@ -202,13 +204,15 @@ class Feeder(EquipmentContainer):
         Returns A reference to this `Feeder` to allow fluent use.
         Raises `KeyError` if `equipment` was not associated with this `Feeder`.
         """
-        if self._current_equipment:
-            del self._current_equipment[equipment.mrid]
+        current_equipment = scenario_state(self, "_current_equipment")
+        if current_equipment:
+            current_equipment = owned_scenario_state(self, "_current_equipment", dict)
+            del current_equipment[equipment.mrid]
         else:
             raise KeyError(equipment)
 
-        if not self._current_equipment:
-            self._current_equipment = None
+        if not current_equipment:
+            set_scenario_state(self, "_current_equipment", None)
         return self
 
     def clear_current_equipment(self) -> Feeder:
@@ -216,7 +220,7 @@ class Feeder(EquipmentContainer):
         Clear all equipment.
         Returns A reference to this `Feeder` to allow fluent use.
         """
-        self._current_equipment = None
+        set_scenario_state(self, "_current_equipment", None)
         return self
 
 
@@ -6,10 +6,10 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["GeographicalRegion", "SubGeographicalRegion"]
 
@@ -18,7 +18,7 @@ class GeographicalRegion(IdentifiedObject):
     """
     A geographical region of a power system network phases.
     """
-    _sub_geographical_regions: Optional[List[SubGeographicalRegion]] = None
+    _sub_geographical_regions: Optional[Dict[str, SubGeographicalRegion]] = None
 
     def __init__(self, sub_geographical_regions: List[SubGeographicalRegion] = None):
         if sub_geographical_regions:
@@ -36,7 +36,7 @@ class GeographicalRegion(IdentifiedObject):
         """
         The `SubGeographicalRegion`s of this `GeographicalRegion`.
         """
-        return ngen(self._sub_geographical_regions)
+        return ngen(self._sub_geographical_regions.values() if self._sub_geographical_regions is not None else None)
 
     def get_sub_geographical_region(self, mrid: str) -> SubGeographicalRegion:
         """
@@ -58,8 +58,8 @@ class GeographicalRegion(IdentifiedObject):
         """
         if self._validate_reference(sub_geographical_region, self.get_sub_geographical_region, "A SubgeographicalRegion"):
             return self
-        self._sub_geographical_regions = list() if self._sub_geographical_regions is None else self._sub_geographical_regions
-        self._sub_geographical_regions.append(sub_geographical_region)
+        self._sub_geographical_regions = dict() if self._sub_geographical_regions is None else self._sub_geographical_regions
+        self._sub_geographical_regions[sub_geographical_region.mrid] = sub_geographical_region
         return self
 
     def remove_sub_geographical_region(self, sub_geographical_region: SubGeographicalRegion) -> GeographicalRegion:
@@ -69,7 +69,7 @@ class GeographicalRegion(IdentifiedObject):
         Returns A reference to this `GeographicalRegion` to allow fluent use.
         Raises `ValueError` if `sub_geographical_region` was not associated with this `GeographicalRegion`.
         """
-        self._sub_geographical_regions = safe_remove(self._sub_geographical_regions, sub_geographical_region)
+        self._sub_geographical_regions = safe_remove_by_id(self._sub_geographical_regions, sub_geographical_region)
         return self
 
     def clear_sub_geographical_regions(self) -> GeographicalRegion:
@@ -89,7 +89,7 @@ class SubGeographicalRegion(IdentifiedObject):
     geographical_region: Optional[GeographicalRegion] = None
     """The geographical region to which this sub-geographical region is within."""
 
-    _substations: Optional[List[Substation]] = None
+    _substations: Optional[Dict[str, Substation]] = None
 
     def __init__(self, substations: List[Substation] = None):
         if substations:
@@ -107,7 +107,7 @@ class SubGeographicalRegion(IdentifiedObject):
         """
         All substations belonging to this sub geographical region.
         """
-        return ngen(self._substations)
+        return ngen(self._substations.values() if self._substations is not None else None)
 
     def get_substation(self, mrid: str) -> Substation:
         """
@@ -129,8 +129,8 @@ class SubGeographicalRegion(IdentifiedObject):
         """
         if self._validate_reference(substation, self.get_substation, "A Substation"):
             return self
-        self._substations = list() if self._substations is None else self._substations
-        self._substations.append(substation)
+        self._substations = dict() if self._substations is None else self._substations
+        self._substations[substation.mrid] = substation
         return self
 
     def remove_substation(self, substation: Substation) -> SubGeographicalRegion:
@@ -141,7 +141,7 @@ class SubGeographicalRegion(IdentifiedObject):
         Returns A reference to this `SubGeographicalRegion` to allow fluent use.
         Raises `ValueError` if `substation` was not associated with this `SubGeographicalRegion`.
         """
-        self._substations = safe_remove(self._substations, substation)
+        self._substations = safe_remove_by_id(self._substations, substation)
         return self
 
     def clear_substations(self) -> SubGeographicalRegion:
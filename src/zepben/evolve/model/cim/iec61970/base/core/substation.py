@@ -6,11 +6,11 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61970.base.core.equipment_container import EquipmentContainer
 from zepben.evolve.model.cim.iec61970.base.core.regions import SubGeographicalRegion
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["Substation"]
 
@@ -24,13 +24,13 @@ class Substation(EquipmentContainer):
     sub_geographical_region: Optional[SubGeographicalRegion] = None
     """The SubGeographicalRegion containing the substation."""
 
-    _normal_energized_feeders: Optional[List[Feeder]] = None
+    _normal_energized_feeders: Optional[Dict[str, Feeder]] = None
 
-    _loops: Optional[List[Loop]] = None
+    _loops: Optional[Dict[str, Loop]] = None
 
-    _energized_loops: Optional[List[Loop]] = None
+    _energized_loops: Optional[Dict[str, Loop]] = None
 
-    _circuits: Optional[List[Circuit]] = None
+    _circuits: Optional[Dict[str, Circuit]] = None
 
     def __init__(self, equipment: List[Equipment] = None, normal_energized_feeders: List[Feeder] = None, loops: List[Loop] = None,
                  energized_loops: List[Loop] = None, circuits: List[Circuit] = None):
@@ -53,28 +53,28 @@ class Substation(EquipmentContainer):
         """
         The `zepben.evolve.cim.infiec61970.feeder.circuit.Circuit`s originating from this substation.
         """
-        return ngen(self._circuits)
+        return ngen(self._circuits.values() if self._circuits is not None else None)
 
     @property
     def loops(self) -> Generator[Loop, None, None]:
         """
         The `zepben.evolve.cim.infiec61970.feeder.loop.Loop` originating from this substation.
         """
-        return ngen(self._loops)
+        return ngen(self._loops.values() if self._loops is not None else None)
 
     @property
     def energized_loops(self) -> Generator[Loop, None, None]:
         """
         The `zepben.evolve.cim.infiec61970.feeder.loop.Loop`s originating from this substation that are energised.
         """
-        return ngen(self._energized_loops)
+        return ngen(self._energized_loops.values() if self._energized_loops is not None else None)
 
     @property
     def feeders(self) -> Generator[Feeder, None, None]:
         """
         The normal energized feeders of the substation. Also used for naming purposes.
         """
-        return ngen(self._normal_energized_feeders)
+        return ngen(self._normal_energized_feeders.values() if self._normal_energized_feeders is not None else None)
 
     def num_feeders(self):
         """
@@ -102,8 +102,8 @@ class Substation(EquipmentContainer):
         """
         if self._validate_reference(feeder, self.get_feeder, "A Feeder"):
             return self
-        self._normal_energized_feeders = list() if self._normal_energized_feeders is None else self._normal_energized_feeders
-        self._normal_energized_feeders.append(feeder)
+        self._normal_energized_feeders = dict() if self._normal_energized_feeders is None else self._normal_energized_feeders
+        self._normal_energized_feeders[feeder.mrid] = feeder
         return self
 
     def remove_feeder(self, feeder: Feeder) -> Substation:
@@ -114,7 +114,7 @@ class Substation(EquipmentContainer):
         Returns A reference to this `Substation` to allow fluent use.
         Raises `ValueError` if `feeder` was not associated with this `Substation`.
         """
-        self._normal_energized_feeders = safe_remove(self._normal_energized_feeders, feeder)
+        self._normal_energized_feeders = safe_remove_by_id(self._normal_energized_feeders, feeder)
         return self
 
     def clear_feeders(self) -> Substation:
@@ -151,8 +151,8 @@ class Substation(EquipmentContainer):
         """
         if self._validate_reference(loop, self.get_loop, "A Loop"):
             return self
-        self._loops = list() if self._loops is None else self._loops
-        self._loops.append(loop)
+        self._loops = dict() if self._loops is None else self._loops
+        self._loops[loop.mrid] = loop
         return self
 
     def remove_loop(self, loop: Loop) -> Substation:
@@ -163,7 +163,7 @@ class Substation(EquipmentContainer):
         Returns A reference to this `Substation` to allow fluent use.
         Raises `ValueError` if `loop` was not associated with this `Substation`.
         """
-        self._loops = safe_remove(self._loops, loop)
+        self._loops = safe_remove_by_id(self._loops, loop)
         return self
 
     def clear_loops(self) -> Substation:
@@ -200,8 +200,8 @@ class Substation(EquipmentContainer):
         """
         if self._validate_reference(loop, self.get_energized_loop, "A Loop"):
             return self
-        self._energized_loops = list() if self._energized_loops is None else self._energized_loops
-        self._energized_loops.append(loop)
+        self._energized_loops = dict() if self._energized_loops is None else self._energized_loops
+        self._energized_loops[loop.mrid] = loop
         return self
 
     def remove_energized_loop(self, loop: Loop) -> Substation:
@@ -212,7 +212,7 @@ class Substation(EquipmentContainer):
         Returns A reference to this `Substation` to allow fluent use.
         Raises `ValueError` if `loop` was not associated with this `Substation`.
         """
-        self._energized_loops = safe_remove(self._energized_loops, loop)
+        self._energized_loops = safe_remove_by_id(self._energized_loops, loop)
         return self
 
     def clear_energized_loops(self) -> Substation:
@@ -249,8 +249,8 @@ class Substation(EquipmentContainer):
         """
         if self._validate_reference(circuit, self.get_circuit, "A Circuit"):
             return self
-        self._circuits = list() if self._circuits is None else self._circuits
-        self._circuits.append(circuit)
+        self._circuits = dict() if self._circuits is None else self._circuits
+        self._circuits[circuit.mrid] = circuit
         return self
 
     def remove_circuit(self, circuit: Circuit) -> Substation:
@@ -261,7 +261,7 @@ class Substation(EquipmentContainer):
         Returns A reference to this `Substation` to allow fluent use.
         Raises `ValueError` if `circuit` was not associated with this `Substation`.
         """
-        self._circuits = safe_remove(self._circuits, circuit)
+        self._circuits = safe_remove_by_id(self._circuits, circuit)
         return self
 
     def clear_circuits(self) -> Substation:
@@ -77,7 +77,7 @@ class Terminal(AcDcTerminal):
 
     @connectivity_node.setter
     def connectivity_node(self, cn):
-        self._cn = ref(cn)
+        self._cn = ref(cn) if cn is not None else None
 
     @property
     def connected(self) -> bool:
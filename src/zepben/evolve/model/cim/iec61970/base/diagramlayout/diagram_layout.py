@@ -14,7 +14,7 @@ from zepben.evolve.model.cim.iec61970.base.core.identified_object import Identif
 from zepben.evolve.model.cim.iec61970.base.diagramlayout.diagram_object_style import DiagramObjectStyle
 from zepben.evolve.model.cim.iec61970.base.diagramlayout.diagram_style import DiagramStyle
 from zepben.evolve.model.cim.iec61970.base.diagramlayout.orientation_kind import OrientationKind
-from zepben.evolve.util import nlen, require, contains_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, require, contains_mrid, ngen, safe_remove, mutable_list
 
 __all__ = ["DiagramObjectPoint", "Diagram", "DiagramObject"]
 
@@ -127,7 +127,7 @@ class DiagramObject(IdentifiedObject):
                 lambda: f"Unable to add DiagramObjectPoint to {str(self)}. Sequence number {sequence_number}"
                         f" is invalid. Expected a value between 0 and {self.num_points}. Make sure you are "
                         f"adding the points in the correct order and there are no missing sequence numbers.")
-        self._diagram_object_points = list() if self._diagram_object_points is None else self._diagram_object_points
+        self._diagram_object_points = mutable_list(self._diagram_object_points)
         self._diagram_object_points.insert(sequence_number, point)
         return self
 
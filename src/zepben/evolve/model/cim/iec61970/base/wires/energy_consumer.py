@@ -6,7 +6,7 @@
 
 from __future__ import annotations
 
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61970.base.core.power_system_resource import PowerSystemResource
 from zepben.evolve.model.cim.iec61970.base.wires.energy_connection import EnergyConnection
@@ -15,7 +15,7 @@ from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import Single
 
 __all__ = ["EnergyConsumer", "EnergyConsumerPhase"]
 
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 
 class EnergyConsumerPhase(PowerSystemResource):
@@ -62,7 +62,7 @@ class EnergyConsumerPhase(PowerSystemResource):
 class EnergyConsumer(EnergyConnection):
     """Generic user of energy - a point of consumption on the power system phases. May also represent a pro-sumer with negative p/q values. """
 
-    _energy_consumer_phases: Optional[List[EnergyConsumerPhase]] = None
+    _energy_consumer_phases: Optional[Dict[str, EnergyConsumerPhase]] = None
     """The individual phase models for this energy consumer."""
 
     customer_count: int = 0
@@ -112,7 +112,7 @@ class EnergyConsumer(EnergyConnection):
     @property
     def phases(self) -> Generator[EnergyConsumerPhase, None, None]:
         """The individual phase models for this energy consumer."""
-        return ngen(self._energy_consumer_phases)
+        return ngen(self._energy_consumer_phases.values() if self._energy_consumer_phases is not None else None)
 
     def get_phase(self, mrid: str) -> EnergyConsumer:
         """
@@ -134,8 +134,8 @@ class EnergyConsumer(EnergyConnection):
         """
         if self._validate_reference(phase, self.get_phase, "An EnergyConsumerPhase"):
             return self
-        self._energy_consumer_phases = list() if self._energy_consumer_phases is None else self._energy_consumer_phases
-        self._energy_consumer_phases.append(phase)
+        self._energy_consumer_phases = dict() if self._energy_consumer_phases is None else self._energy_consumer_phases
+        self._energy_consumer_phases[phase.mrid] = phase
         return self
 
     def remove_phase(self, phase: EnergyConsumerPhase) -> EnergyConsumer:
@@ -147,7 +147,7 @@ class EnergyConsumer(EnergyConnection):
         Returns A reference to this `EnergyConsumer` to allow fluent use.
         Raises `ValueError` if `phase` was not associated with this `EnergyConsumer`.
         """
-        self._energy_consumer_phases = safe_remove(self._energy_consumer_phases, phase)
+        self._energy_consumer_phases = safe_remove_by_id(self._energy_consumer_phases, phase)
         return self
 
     def clear_phases(self) -> EnergyConsumer:
@@ -6,11 +6,11 @@
 
 from __future__ import annotations
 
-from typing import List, Optional, Generator
+from typing import List, Optional, Generator, Dict
 
 from zepben.evolve.model.cim.iec61970.base.wires.energy_connection import EnergyConnection
 from zepben.evolve.model.cim.iec61970.base.wires.energy_source_phase import EnergySourcePhase
-from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import nlen, get_by_mrid, ngen, safe_remove_by_id
 
 __all__ = ["EnergySource"]
 
@@ -20,7 +20,7 @@ class EnergySource(EnergyConnection):
     A generic equivalent for an energy supplier on a transmission or distribution voltage level.
     """
 
-    _energy_source_phases: Optional[List[EnergySourcePhase]] = None
+    _energy_source_phases: Optional[Dict[str, EnergySourcePhase]] = None
     active_power: float = 0.0
     """High voltage source active injection. Load sign convention is used, i.e. positive sign means flow out from a node. Starting value for steady state solutions"""
 
@@ -62,7 +62,7 @@ class EnergySource(EnergyConnection):
         """
         The `EnergySourcePhase`s for this `EnergySource`.
         """
-        return ngen(self._energy_source_phases)
+        return ngen(self._energy_source_phases.values() if self._energy_source_phases is not None else None)
 
     def has_phases(self):
         """
@@ -95,8 +95,8 @@ class EnergySource(EnergyConnection):
         """
         if self._validate_reference(phase, self.get_phase, "An EnergySourcePhase"):
             return self
-        self._energy_source_phases = list() if self._energy_source_phases is None else self._energy_source_phases
-        self._energy_source_phases.append(phase)
+        self._energy_source_phases = dict() if self._energy_source_phases is None else self._energy_source_phases
+        self._energy_source_phases[phase.mrid] = phase
         return self
 
     def remove_phases(self, phase: EnergySourcePhase) -> EnergySource:
@@ -107,7 +107,7 @@ class EnergySource(EnergyConnection):
         Returns A reference to this `EnergySource` to allow fluent use.
         Raises `ValueError` if `phase` was not associated with this `EnergySource`.
         """
-        self._energy_source_phases = safe_remove(self._energy_source_phases, phase)
+        self._energy_source_phases = safe_remove_by_id(self._energy_source_phases, phase)
         return self
 
     def clear_phases(self) -> EnergySource:
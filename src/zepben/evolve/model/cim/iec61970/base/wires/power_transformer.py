@@ -14,7 +14,7 @@ from zepben.evolve.model.cim.iec61970.base.core.identified_object import Identif
 from zepben.evolve.model.cim.iec61970.base.core.power_system_resource import PowerSystemResource
 from zepben.evolve.model.cim.iec61970.base.wires.vector_group import VectorGroup
 from zepben.evolve.model.cim.iec61970.base.wires.winding_connection import WindingConnection
-from zepben.evolve.util import require, nlen, get_by_mrid, ngen, safe_remove
+from zepben.evolve.util import require, nlen, get_by_mrid, ngen, safe_remove, mutable_list
 
 __all__ = ["TapChanger", "RatioTapChanger", "PowerTransformer", "PowerTransformerEnd", "TransformerEnd"]
 
@@ -377,7 +377,7 @@ class PowerTransformer(ConductingEquipment):
         if end.end_number == 0:
             end.end_number = self.num_ends() + 1
 
-        self._power_transformer_ends = list() if self._power_transformer_ends is None else self._power_transformer_ends
+        self._power_transformer_ends = mutable_list(self._power_transformer_ends)
         self._power_transformer_ends.append(end)
         self._power_transformer_ends.sort(key=lambda t: t.end_number)
         return self
@@ -396,7 +396,7 @@ class PowerTransformer(ConductingEquipment):
         Clear all `PowerTransformerEnd`s.
         Returns A reference to this `PowerTransformer` to allow fluent use.
         """
-        self._power_transformer_ends.clear()
+        self._power_transformer_ends = None
         return self
 
     def _validate_end(self, end: PowerTransformerEnd) -> bool:
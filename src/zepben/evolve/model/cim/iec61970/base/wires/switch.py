@@ -8,6 +8,7 @@ from __future__ import annotations
 
 from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
 from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind
+from zepben.evolve.model.network_scenario import _active_scenario
 
 __all__ = ["Switch", "Breaker", "Disconnector", "Jumper", "Fuse", "ProtectedSwitch", "Recloser"]
 
@@ -38,6 +39,8 @@ class Switch(ConductingEquipment):
     NOTE: The normal and currently open properties are implemented as an integer rather than a boolean to allow for the caching of
       measurement values if the switch is operating un-ganged. These values will cache the latest values from the measurement
       value for each phase of the switch.
+
+    Both states are part of the state branched by a `zepben.evolve.model.network_scenario.NetworkScenario`.
     """
 
     _open: int = 0
@@ -54,13 +57,14 @@ class Switch(ConductingEquipment):
         `phase` The `single_phase_kind.SinglePhaseKind` to check the normal status. A `phase` of `None` (default) checks if any phase is open.
         Returns True if `phase` is open in its normal state, False if it is closed
         """
-        return _check_open(self._normal_open, phase)
+        return _check_open(self.get_normal_state(), phase)
 
     def get_normal_state(self) -> int:
         """
         Get the underlying normal open states. Stored as 4 bits, 1 per phase.
         """
-        return self._normal_open
+        scenario = _active_scenario.get()
+        return self._normal_open if scenario is None else scenario.get_state(self, "_normal_open")
 
     def is_open(self, phase: SinglePhaseKind = None):
         """
@@ -70,14 +74,15 @@ class Switch(ConductingEquipment):
         if any phase is open.
         Returns True if `phase` is open in its current state, False if it is closed
         """
-        return _check_open(self._open, phase)
+        return _check_open(self.get_state(), phase)
 
     def get_state(self) -> int:
         """
         The attribute tells if the switch is considered open when used as input to topology processing.
         Get the underlying open states. Stored as 4 bits, 1 per phase.
         """
-        return self._open
+        scenario = _active_scenario.get()
+        return self._open if scenario is None else scenario.get_state(self, "_open")
 
     def set_normally_open(self, is_normally_open: bool, phase: SinglePhaseKind = None) -> Switch:
         """
@@ -85,7 +90,11 @@ class Switch(ConductingEquipment):
         `phase` the phase to set the normal status. If set to None will default to all phases.
         Returns This `Switch` to be used fluently.
         """
-        self._normal_open = _calculate_open_state(self._normal_open, is_normally_open, phase)
+        scenario = _active_scenario.get()
+        if scenario is None:
+            self._normal_open = _calculate_open_state(self._normal_open, is_normally_open, phase)
+        else:
+            scenario.set_state(self, "_normal_open", _calculate_open_state(self.get_normal_state(), is_normally_open, phase))
         return self
 
     def set_open(self, is_open: bool, phase: SinglePhaseKind = None) -> Switch:
@@ -94,7 +103,11 @@ class Switch(ConductingEquipment):
         `phase` the phase to set the current status. If set to None will default to all phases.
         Returns This `Switch` to be used fluently.
         """
-        self._open = _calculate_open_state(self._open, is_open, phase)
+        scenario = _active_scenario.get()
+        if scenario is None:
+            self._open = _calculate_open_state(self._open, is_open, phase)
+        else:
+            scenario.set_state(self, "_open", _calculate_open_state(self.get_state(), is_open, phase))
         return self
 
 
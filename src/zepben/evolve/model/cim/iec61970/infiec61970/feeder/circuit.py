@@ -4,10 +4,10 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
 from __future__ import annotations
-from typing import Optional, Generator, List
+from typing import Optional, Generator, List, Dict
 
 from zepben.evolve.model.cim.iec61970.base.wires.line import Line
-from zepben.evolve.util import ngen, get_by_mrid, safe_remove, nlen
+from zepben.evolve.util import ngen, get_by_mrid, nlen, safe_remove_by_id
 
 __all__ = ["Circuit"]
 
@@ -16,8 +16,8 @@ class Circuit(Line):
     """Missing description"""
 
     loop: Optional[Loop] = None
-    _end_terminals: Optional[List[Terminal]] = None
-    _end_substations: Optional[List[Substation]] = None
+    _end_terminals: Optional[Dict[str, Terminal]] = None
+    _end_substations: Optional[Dict[str, Substation]] = None
 
     def __init__(self, equipment: List[Equipment] = None, end_terminals: List[Terminal] = None, end_substations: List[Substation] = None):
         super(Circuit, self).__init__(equipment)
@@ -34,14 +34,14 @@ class Circuit(Line):
         """
         The `Terminal`s representing the ends for this `Circuit`.
         """
-        return ngen(self._end_terminals)
+        return ngen(self._end_terminals.values() if self._end_terminals is not None else None)
 
     @property
     def end_substations(self) -> Generator[Substation, None, None]:
         """
         The `Substations`s representing the ends for this `Circuit`.
         """
-        return ngen(self._end_substations)
+        return ngen(self._end_substations.values() if self._end_substations is not None else None)
 
     def num_end_terminals(self):
         """Return the number of end `Terminal`s associated with this `Circuit`"""
@@ -67,8 +67,8 @@ class Circuit(Line):
         """
         if self._validate_reference(terminal, self.get_terminal, "An Terminal"):
             return self
-        self._end_terminals = list() if self._end_terminals is None else self._end_terminals
-        self._end_terminals.append(terminal)
+        self._end_terminals = dict() if self._end_terminals is None else self._end_terminals
+        self._end_terminals[terminal.mrid] = terminal
         return self
 
     def remove_end_terminals(self, terminal: Terminal) -> Circuit:
@@ -79,7 +79,7 @@ class Circuit(Line):
         Returns A reference to this `Circuit` to allow fluent use.
         Raises `ValueError` if `terminal` was not associated with this `Circuit`.
         """
-        self._end_terminals = safe_remove(self._end_terminals, terminal)
+        self._end_terminals = safe_remove_by_id(self._end_terminals, terminal)
         return self
 
     def clear_end_terminals(self) -> Circuit:
@@ -114,8 +114,8 @@ class Circuit(Line):
         """
         if self._validate_reference(substation, self.get_substation, "An Substation"):
             return self
-        self._end_substations = list() if self._end_substations is None else self._end_substations
-        self._end_substations.append(substation)
+        self._end_substations = dict() if self._end_substations is None else self._end_substations
+        self._end_substations[substation.mrid] = substation
         return self
 
     def remove_end_substations(self, substation: Substation) -> Circuit:
@@ -126,7 +126,7 @@ class Circuit(Line):
         Returns A reference to this `Circuit` to allow fluent use.
         Raises `ValueError` if `substation` was not associated with this `Circuit`.
         """
-        self._end_substations = safe_remove(self._end_substations, substation)
+        self._end_substations = safe_remove_by_id(self._end_substations, substation)
         return self
 
     def clear_end_substations(self) -> Circuit:
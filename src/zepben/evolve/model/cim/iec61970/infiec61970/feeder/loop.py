@@ -6,21 +6,21 @@
 
 
 from __future__ import annotations
-from typing import Optional, List, Generator
+from typing import Optional, List, Generator, Dict
 
 __all__ = ["Loop"]
 
 from zepben.evolve.model.cim.iec61970.base.core.identified_object import IdentifiedObject
-from zepben.evolve.util import safe_remove, ngen, nlen, get_by_mrid
+from zepben.evolve.util import ngen, nlen, get_by_mrid, safe_remove_by_id
 
 
 class Loop(IdentifiedObject):
     """Missing description"""
 
     loop: Optional[Loop] = None
-    _circuits: Optional[List[Circuit]] = None
-    _substations: Optional[List[Substation]] = None
-    _energizing_substations: Optional[List[Substation]] = None
+    _circuits: Optional[Dict[str, Circuit]] = None
+    _substations: Optional[Dict[str, Substation]] = None
+    _energizing_substations: Optional[Dict[str, Substation]] = None
 
     def __init__(self, circuits: List[Circuit] = None, substations: List[Substation] = None, energizing_substations: List[Substation] = None):
         if circuits:
@@ -40,21 +40,21 @@ class Loop(IdentifiedObject):
         """
         Sub-transmission `zepben.evolve.cim.infiec61970.base.core.circuit.Circuit`s that form part of this loop.
         """
-        return ngen(self._circuits)
+        return ngen(self._circuits.values() if self._circuits is not None else None)
 
     @property
     def substations(self) -> Generator[Substation, None, None]:
         """
         The `zepben.evolve.cim.iec61970.base.core.substation.Substation`s that are powered by this `Loop`.
         """
-        return ngen(self._substations)
+        return ngen(self._substations.values() if self._substations is not None else None)
 
     @property
     def energizing_substations(self) -> Generator[Substation, None, None]:
         """
         The `zepben.evolve.cim.iec61970.base.core.substation.Substation`s that normally energize this `Loop`.
         """
-        return ngen(self._energizing_substations)
+        return ngen(self._energizing_substations.values() if self._energizing_substations is not None else None)
 
     def num_circuits(self):
         """Return the number of end `zepben.evolve.cim.infiec61970.base.core.circuit.Circuit`s associated with this `Loop`"""
@@ -80,8 +80,8 @@ class Loop(IdentifiedObject):
         """
         if self._validate_reference(circuit, self.get_circuit, "An Circuit"):
             return self
-        self._circuits = list() if self._circuits is None else self._circuits
-        self._circuits.append(circuit)
+        self._circuits = dict() if self._circuits is None else self._circuits
+        self._circuits[circuit.mrid] = circuit
         return self
 
     def remove_circuits(self, circuit: Circuit) -> Loop:
@@ -92,7 +92,7 @@ class Loop(IdentifiedObject):
         Returns A reference to this `Loop` to allow fluent use.
         Raises `ValueError` if `circuit` was not associated with this `Loop`.
         """
-        self._circuits = safe_remove(self._circuits, circuit)
+        self._circuits = safe_remove_by_id(self._circuits, circuit)
         return self
 
     def clear_circuits(self) -> Loop:
@@ -127,8 +127,8 @@ class Loop(IdentifiedObject):
         """
         if self._validate_reference(substation, self.get_substation, "An Substation"):
             return self
-        self._substations = list() if self._substations is None else self._substations
-        self._substations.append(substation)
+        self._substations = dict() if self._substations is None else self._substations
+        self._substations[substation.mrid] = substation
         return self
 
     def remove_substations(self, substation: Substation) -> Loop:
@@ -139,7 +139,7 @@ class Loop(IdentifiedObject):
         Returns A reference to this `Loop` to allow fluent use.
         Raises `ValueError` if `substation` was not associated with this `Loop`.
         """
-        self._substations = safe_remove(self._substations, substation)
+        self._substations = safe_remove_by_id(self._substations, substation)
         return self
 
     def clear_substations(self) -> Loop:
@@ -174,8 +174,8 @@ class Loop(IdentifiedObject):
         """
         if self._validate_reference(substation, self.get_energizing_substation, "An Substation"):
             return self
-        self._energizing_substations = list() if self._energizing_substations is None else self._energizing_substations
-        self._energizing_substations.append(substation)
+        self._energizing_substations = dict() if self._energizing_substations is None else self._energizing_substations
+        self._energizing_substations[substation.mrid] = substation
         return self
 
     def remove_energizing_substations(self, substation: Substation) -> Loop:
@@ -186,7 +186,7 @@ class Loop(IdentifiedObject):
         Returns A reference to this `Loop` to allow fluent use.
         Raises `ValueError` if `substation` was not associated with this `Loop`.
         """
-        self._energizing_substations = safe_remove(self._energizing_substations, substation)
+        self._energizing_substations = safe_remove_by_id(self._energizing_substations, substation)
         return self
 
     def clear_energizing_substations(self) -> Loop:
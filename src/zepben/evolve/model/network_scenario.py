@@ -0,0 +1,151 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable, Tuple, Generator
+
+__all__ = ["NetworkScenario", "active_scenario"]
+
+_active_scenario: ContextVar[Optional[NetworkScenario]] = ContextVar("active_network_scenario", default=None)
+_previous_scenarios: ContextVar[Tuple[Optional[NetworkScenario], ...]] = ContextVar("previous_network_scenarios", default=())
+"""The scenario that was active before each scenario entered in the current context, restored as they exit."""
+_MISSING = object()
+
+
+def active_scenario() -> Optional[NetworkScenario]:
+    """
+    Returns The `NetworkScenario` active in the current context, or None if changes are being made to the network itself.
+    """
+    return _active_scenario.get()
+
+
+class NetworkScenario(object):
+    """
+    A copy-on-write branch of the operational state of a `zepben.evolve.services.network.network.NetworkService`, used to run what-if analysis
+    without modifying or reloading the network. Create one with `NetworkService.fork()`.
+
+    While a scenario is active (`with scenario:`), changes to the open state of switches, the traced phases of terminals and the current feeder
+    assignments of equipment are stored in the scenario rather than on the objects, and reading that state sees the scenario's changes. Everything
+    else, including adding and removing objects, is shared with the network. Only the state of objects the scenario changes is copied, so memory
+    use is proportional to the changes rather than to the network.
+
+    The active scenario is held in a `ContextVar`, so each thread, and each asyncio task created while a scenario is active, sees its own scenario.
+    This allows many scenarios to run concurrently against the one network, and the same scenario to be entered by many tasks at once. Scenarios always branch from the network itself, not from the
+    scenario that is active when they are entered.
+    """
+
+    __slots__ = ["network", "_state", "__weakref__"]
+
+    network: NetworkService
+    """The network this scenario branches from."""
+
+    _state: Dict[int, Tuple[Any, Dict[str, Any]]]
+    """The changed state of each object by its id, held with the object itself so the id can't be reused while the scenario exists."""
+
+    def __init__(self, network: NetworkService):
+        self.network = network
+        self._state = dict()
+
+    def __enter__(self) -> NetworkScenario:
+        _previous_scenarios.set(_previous_scenarios.get() + (_active_scenario.get(),))
+        _active_scenario.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        previous = _previous_scenarios.get()
+        _active_scenario.set(previous[-1])
+        _previous_scenarios.set(previous[:-1])
+
+    def num_changed_objects(self) -> int:
+        """
+        Returns The number of objects with state that has been changed in this scenario.
+        """
+        return len(self._state)
+
+    def changed_objects(self) -> Generator[Tuple[Any, Dict[str, Any]], None, None]:
+        """
+        Generator for each object with state that has been changed in this scenario, with its changed attribute values by name. The values can be
+        updated in place, such as to clear references to objects removed from the network.
+        """
+        yield from tuple(self._state.values())
+
+    def discard_changes(self, obj):
+        """
+        Discard every change to the state of `obj` in this scenario, such as when it is removed from the network.
+        """
+        self._state.pop(id(obj), None)
+
+    def get_state(self, obj, name: str):
+        """
+        Get the value of the attribute `name` of `obj` as seen by this scenario.
+        """
+        entry = self._state.get(id(obj))
+        if entry is not None:
+            value = entry[1].get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+        return getattr(obj, name)
+
+    def set_state(self, obj, name: str, value):
+        """
+        Set the value of the attribute `name` of `obj` for this scenario only.
+        """
+        self._changes_for(obj)[name] = value
+
+    def owned_state(self, obj, name: str, copy: Callable):
+        """
+        Get the value of the attribute `name` of `obj` for modifying in place, copying it with `copy` the first time it is modified by this scenario.
+        A value of None is replaced with an empty `copy()`.
+        """
+        changes = self._changes_for(obj)
+        value = changes.get(name, _MISSING)
+        if value is _MISSING:
+            base = getattr(obj, name)
+            value = changes[name] = copy() if base is None else copy(base)
+        elif value is None:
+            value = changes[name] = copy()
+        return value
+
+    def _changes_for(self, obj) -> Dict[str, Any]:
+        entry = self._state.get(id(obj))
+        if entry is None:
+            entry = self._state[id(obj)] = (obj, dict())
+        return entry[1]
+
+
+def scenario_state(obj, name: str):
+    """Get the attribute `name` of `obj` as seen by the active `NetworkScenario`, if any."""
+    scenario = _active_scenario.get()
+    return getattr(obj, name) if scenario is None else scenario.get_state(obj, name)
+
+
+def set_scenario_state(obj, name: str, value):
+    """Set the attribute `name` of `obj`, in the active `NetworkScenario` if there is one."""
+    scenario = _active_scenario.get()
+    if scenario is None:
+        setattr(obj, name, value)
+    else:
+        scenario.set_state(obj, name, value)
+
+
+def owned_scenario_state(obj, name: str, copy: Callable):
+    """
+    Get the attribute `name` of `obj` for modifying in place, copied into the active `NetworkScenario` if there is one.
+    A value of None is replaced with an empty `copy()`, and a tuple left by compacting the service with a `copy` of it.
+    """
+    scenario = _active_scenario.get()
+    if scenario is None:
+        value = getattr(obj, name)
+        if value is None:
+            value = copy()
+            setattr(obj, name, value)
+        elif isinstance(value, tuple):
+            value = copy(value)
+            setattr(obj, name, value)
+        return value
+    return scenario.owned_state(obj, name, copy)
@@ -16,6 +16,7 @@ from dataclassy import dataclass
 from zepben.evolve.exceptions import PhaseException
 from zepben.evolve.model.phasedirection import PhaseDirection
 from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind, SINGLE_PHASE_KIND_VALUES
+from zepben.evolve.model.network_scenario import _active_scenario
 
 __all__ = ["phase", "direction", "pos_shift", "add", "setphs", "remove", "remove_all", "TracedPhases", "NominalPhasePath"]
 CORE_MASKS = [0x000000ff, 0x0000ff00, 0x00ff0000, 0xff000000]
@@ -105,6 +106,9 @@ class TracedPhases(object):
                      |  2bits  |  2bits  |  2bits  |  2bits  |
     Phase:           |    N    |    C    |    B    |    A    |
     Direction:       |OUT | IN |OUT | IN |OUT | IN |OUT | IN |
+    <p>
+    Both statuses are part of the state branched by a `zepben.evolve.model.network_scenario.NetworkScenario`, so should be accessed through
+    `normal_status` and `current_status` rather than directly.
     """
     _normal_status: int = 0
     _current_status: int = 0
@@ -113,6 +117,34 @@ class TracedPhases(object):
         self._normal_status = normal_status
         self._current_status = current_status
 
+    @property
+    def normal_status(self) -> int:
+        """The normal phase status of every core."""
+        scenario = _active_scenario.get()
+        return self._normal_status if scenario is None else scenario.get_state(self, "_normal_status")
+
+    @normal_status.setter
+    def normal_status(self, status: int):
+        scenario = _active_scenario.get()
+        if scenario is None:
+            self._normal_status = status
+        else:
+            scenario.set_state(self, "_normal_status", status)
+
+    @property
+    def current_status(self) -> int:
+        """The current phase status of every core."""
+        scenario = _active_scenario.get()
+        return self._current_status if scenario is None else scenario.get_state(self, "_current_status")
+
+    @current_status.setter
+    def current_status(self, status: int):
+        scenario = _active_scenario.get()
+        if scenario is None:
+            self._current_status = status
+        else:
+            scenario.set_state(self, "_current_status", status)
+
     def __str__(self):
         s = []
         for phs in (SinglePhaseKind.A, SinglePhaseKind.B, SinglePhaseKind.C, SinglePhaseKind.N):
@@ -131,7 +163,7 @@ class TracedPhases(object):
         Raises `CoreException` if core is invalid.
         """
         _valid_phase_check(nominal_phase)
-        return phase(self._normal_status, nominal_phase)
+        return phase(self.normal_status, nominal_phase)
 
     def phase_current(self, nominal_phase: SinglePhaseKind):
         """
@@ -140,7 +172,7 @@ class TracedPhases(object):
         Returns `zepben.protobuf.cim.iec61970.base.wires.SinglePhaseKind` for the core
         """
         _valid_phase_check(nominal_phase)
-        return phase(self._current_status, nominal_phase)
+        return phase(self.current_status, nominal_phase)
 
     def direction_normal(self, nominal_phase: SinglePhaseKind):
         """
@@ -149,7 +181,7 @@ class TracedPhases(object):
         Returns `zepben.phases.direction.Direction` for the core
         """
         _valid_phase_check(nominal_phase)
-        return direction(self._normal_status, nominal_phase)
+        return direction(self.normal_status, nominal_phase)
 
     def direction_current(self, nominal_phase: SinglePhaseKind):
         """
@@ -158,7 +190,7 @@ class TracedPhases(object):
         Returns `zepben.phases.direction.Direction` for the core
         """
         _valid_phase_check(nominal_phase)
-        return direction(self._current_status, nominal_phase)
+        return direction(self.current_status, nominal_phase)
 
     def add_normal(self, phs: SinglePhaseKind, nominal_phase: SinglePhaseKind, dir_: PhaseDirection):
         """
@@ -178,7 +210,7 @@ class TracedPhases(object):
         if self.direction_normal(nominal_phase).has(dir_):
             return False
 
-        self._normal_status = add(self._normal_status, phs, dir_, nominal_phase)
+        self.normal_status = add(self.normal_status, phs, dir_, nominal_phase)
         return True
 
     def add_current(self, phs: SinglePhaseKind, nominal_phase: SinglePhaseKind, dir_: PhaseDirection):
@@ -198,7 +230,7 @@ class TracedPhases(object):
         if self.direction_current(nominal_phase).has(dir_):
             return False
 
-        self._current_status = add(self._current_status, phs, dir_, nominal_phase)
+        self.current_status = add(self.current_status, phs, dir_, nominal_phase)
         return True
 
     def set_normal(self, phs: SinglePhaseKind, nominal_phase: SinglePhaseKind, dir_: PhaseDirection):
@@ -216,7 +248,7 @@ class TracedPhases(object):
         if self.phase_normal(nominal_phase) == phs and self.direction_normal(nominal_phase) == dir_:
             return False
 
-        self._normal_status = setphs(self._normal_status, phs, dir_, nominal_phase)
+        self.normal_status = setphs(self.normal_status, phs, dir_, nominal_phase)
         return True
 
     def set_current(self, phs: SinglePhaseKind, dir_: PhaseDirection, nominal_phase: SinglePhaseKind):
@@ -234,7 +266,7 @@ class TracedPhases(object):
         if self.phase_current(nominal_phase) == phs and self.direction_current(nominal_phase) == dir_:
             return False
 
-        self._current_status = setphs(self._current_status, phs, dir_, nominal_phase)
+        self.current_status = setphs(self.current_status, phs, dir_, nominal_phase)
         return True
 
     def remove_normal(self, phs: SinglePhaseKind, nominal_phase: SinglePhaseKind, dir_: PhaseDirection = None):
@@ -251,9 +283,9 @@ class TracedPhases(object):
         if dir_ is not None:
             if not self.direction_normal(nominal_phase).has(dir_):
                 return False
-            self._normal_status = remove(self._normal_status, phs, dir_, nominal_phase)
+            self.normal_status = remove(self.normal_status, phs, dir_, nominal_phase)
         else:
-            self._normal_status = remove_all(self._normal_status, nominal_phase)
+            self.normal_status = remove_all(self.normal_status, nominal_phase)
             return True
 
     def remove_current(self, phs: SinglePhaseKind, nominal_phase: SinglePhaseKind, dir_: PhaseDirection = None):
@@ -270,9 +302,9 @@ class TracedPhases(object):
         if dir_ is not None:
             if not self.direction_current(nominal_phase).has(dir_):
                 return False
-            self._current_status = remove(self._current_status, phs, dir_, nominal_phase)
+            self.current_status = remove(self.current_status, phs, dir_, nominal_phase)
         else:
-            self._current_status = remove_all(self._current_status, nominal_phase)
+            self.current_status = remove_all(self.current_status, nominal_phase)
             return True
 
     def copy(self):
@@ -0,0 +1,104 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Any, Dict, Optional, List, Generator
+
+from dataclassy import dataclass
+
+__all__ = ["AttributeIndex"]
+
+_MISSING = object()
+
+
+@dataclass(slots=True)
+class AttributeIndex(object):
+    """
+    A secondary index over the objects of `obj_type` in a `zepben.evolve.services.common.base_service.BaseService`, keyed by the value `key` returns
+    for each object. Objects for which `key` returns None are not indexed.
+
+    Keys must be hashable, and must also be comparable with each other to be used for range lookups. References to other objects should be keyed
+    by their mRID rather than the object itself.
+    """
+
+    obj_type: type
+    """The type of object to index, including subclasses."""
+
+    key: Callable[[IdentifiedObject], Any]
+    """Function returning the key of an object."""
+
+    _objects_by_key: Dict[Any, Dict[str, IdentifiedObject]] = dict()
+    _key_by_mrid: Dict[str, Any] = dict()
+    """The key each object was indexed with, so it can be found again after the object changes."""
+    _sorted_keys: Optional[List[Any]] = None
+    """The distinct keys in order, built on the first range lookup after the set of keys changes."""
+
+    def __len__(self) -> int:
+        return len(self._key_by_mrid)
+
+    def add(self, identified_object: IdentifiedObject):
+        """
+        Index `identified_object` if it is of `obj_type` and has a key.
+        """
+        if not isinstance(identified_object, self.obj_type):
+            return
+
+        key = self.key(identified_object)
+        if key is None:
+            return
+
+        objects = self._objects_by_key.get(key)
+        if objects is None:
+            objects = self._objects_by_key[key] = dict()
+            self._sorted_keys = None
+        objects[identified_object.mrid] = identified_object
+        self._key_by_mrid[identified_object.mrid] = key
+
+    def remove(self, identified_object: IdentifiedObject):
+        """
+        Remove `identified_object` from the index if it is present.
+        """
+        key = self._key_by_mrid.pop(identified_object.mrid, _MISSING)
+        if key is _MISSING:
+            return
+
+        objects = self._objects_by_key[key]
+        del objects[identified_object.mrid]
+        if not objects:
+            del self._objects_by_key[key]
+            self._sorted_keys = None
+
+    def update(self, identified_object: IdentifiedObject):
+        """
+        Re-index `identified_object` if its key has changed since it was indexed.
+        """
+        key = self.key(identified_object) if isinstance(identified_object, self.obj_type) else None
+        if self._key_by_mrid.get(identified_object.mrid, None) != key:
+            self.remove(identified_object)
+            self.add(identified_object)
+
+    def find(self, key) -> Generator[IdentifiedObject, None, None]:
+        """
+        Generator for the objects indexed with `key`.
+        """
+        yield from tuple(self._objects_by_key.get(key, {}).values())
+
+    def find_range(self, min_key=None, max_key=None) -> Generator[IdentifiedObject, None, None]:
+        """
+        Generator for the objects with keys between `min_key` and `max_key` inclusive, in key order.
+        `min_key` The lowest key to include. If None, there is no lower bound.
+        `max_key` The highest key to include. If None, there is no upper bound.
+        """
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._objects_by_key)
+        keys = self._sorted_keys
+
+        start = 0 if min_key is None else bisect_left(keys, min_key)
+        end = len(keys) if max_key is None else bisect_right(keys, max_key)
+        for key in keys[start:end]:
+            yield from tuple(self._objects_by_key.get(key, {}).values())
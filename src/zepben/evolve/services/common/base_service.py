@@ -7,21 +7,58 @@
 from __future__ import annotations
 from abc import ABCMeta
 from collections import OrderedDict
-from dataclassy import dataclass
-from typing import Dict, Generator, Callable, Optional, List, Union, Sized
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock, RLock
+from dataclassy import dataclass, fields
+from typing import Dict, Generator, Callable, Optional, List, Union, Sized, Set, Tuple, Iterable, Any
 
-from zepben.evolve.services.common.reference_resolvers import BoundReferenceResolver, UnresolvedReference
+from zepben.evolve.services.common.attribute_index import AttributeIndex
+from zepben.evolve.services.common.reference_resolvers import BoundReferenceResolver, UnresolvedReference, ReferenceResolver
 
 __all__ = ["BaseService"]
 
 _GET_DEFAULT = (1,)
+_bulk_loads: ContextVar[Tuple[list, ...]] = ContextVar("bulk_loads", default=())
+"""
+A `[service, operations]` frame for each `BaseService.bulk_load` open in the current context. Frames are closed by setting their operations to None
+when their context exits, so tasks started inside a bulk load that outlive it go back to resolving references as they are requested.
+"""
+_collection_slots: Dict[type, Tuple[Tuple[str, bool], ...]] = dict()
+
+
+def _writer(func):
+    """Serialise calls to `func` with the other writers of the service when concurrent access is enabled."""
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self._write_lock is None:
+            return func(self, *args, **kwargs)
+        with self._write_lock:
+            return func(self, *args, **kwargs)
+
+    return wrapper
 
 
 @dataclass(slots=True)
 class BaseService(object, metaclass=ABCMeta):
     name: str
     _objectsByType: Dict[type, Dict[str, IdentifiedObject]] = OrderedDict()
+    _objects_by_mrid: Dict[str, IdentifiedObject] = dict()
+    """Index of every object in the service by its mRID, kept in sync with `_objectsByType` by `add` and `remove`."""
+    _concrete_subtypes: Dict[type, List[type]] = dict()
+    """Map of each class to the concrete types stored in `_objectsByType` that are that class or inherit from it. Updated when a new type is first added."""
     _unresolved_references: Dict[str, List[UnresolvedReference]] = OrderedDict()
+    _unresolved_references_by_from: Dict[Tuple[int, ReferenceResolver], Set[str]] = dict()
+    """Reverse index of `_unresolved_references`, mapping the identity of each referencing object and its resolver to the mRIDs it is waiting on."""
+    _indexes: Dict[str, AttributeIndex] = dict()
+    _write_lock: Optional[RLock] = None
+    """Held by writers when concurrent access is enabled. See `enable_concurrent_access`."""
+    _pin_lock: Optional[Lock] = None
+    """Guards `_pins` and changes to the type maps when concurrent access is enabled."""
+    _pins: Dict[int, int] = dict()
+    """The number of readers iterating each type map, by the id of the map. Pinned maps are copied rather than modified."""
 
     def __contains__(self, mrid: str) -> bool:
         """
@@ -30,10 +67,7 @@ class BaseService(object, metaclass=ABCMeta):
         `mrid` The mRID to search for.
         Returns True if there is an object associated with the specified `mrid`, False otherwise.
         """
-        for type_map in self._objectsByType.values():
-            if mrid in type_map:
-                return True
-        return False
+        return mrid in self._objects_by_mrid
 
     def __str__(self):
         return f"{type.__name__}{f' {self.name}' if self.name else ''}"
@@ -46,22 +80,20 @@ class BaseService(object, metaclass=ABCMeta):
 
     def len_of(self, t: type = None) -> int:
         """
-        Get the len of objects of type `t` in the service.
-        `t` The type of object to get the len of. If None (default), will get the len of all objects in the service.
+        Get the len of objects of type `t` in the service. This is cheap enough to call for progress reporting while loading.
+        `t` The type of object to get the len of, including any subclasses. If None (default), will get the len of all objects in the service.
         """
         if t is None:
-            return sum([len(vals) for vals in self._objectsByType.values()])
+            return len(self._objects_by_mrid)
         else:
-            return len(self._objectsByType[t].values())
+            return sum(len(self._objectsByType[_type]) for _type in self._concrete_subtypes.get(t, ()))
 
     def num_unresolved_references(self):
         """
-        Get the total number of unresolved references.
-        Note that this is not terribly cheap call, and should be used sparingly. To test if unresolved references exist,
-        use `has_unresolved_references()` instead.
-        Returns The number of references in the network that have not already been resolved.
+        Get the total number of unresolved references. References requested inside `bulk_load` are not counted until it exits.
+        Returns The number of distinct mRIDs referenced in the network that have not already been resolved.
         """
-        return len({r.to_mrid for reflist in self._unresolved_references.values() for r in reflist})
+        return len(self._unresolved_references)
 
     def unresolved_references(self):
         for from_mrid, unresolved_refs in self._unresolved_references.copy().items():
@@ -94,27 +126,20 @@ class BaseService(object, metaclass=ABCMeta):
             raise KeyError("You must specify an mRID to get. Empty/None is invalid.")
 
         if type_:
+            obj = self._objects_by_mrid.get(mrid)
+            if obj is not None and isinstance(obj, type_):
+                return obj
+            if default is _GET_DEFAULT:
+                raise KeyError(generate_error(mrid, type_.__name__))
+            else:
+                return default
+        else:
             try:
-                return self._objectsByType[type_][mrid]
+                return self._objects_by_mrid[mrid]
             except KeyError:
-                for c, obj_map in self._objectsByType.items():
-                    if issubclass(c, type_):
-                        try:
-                            return obj_map[mrid]
-                        except KeyError:
-                            pass
                 if default is _GET_DEFAULT:
-                    raise KeyError(generate_error(mrid, type_.__name__))
-                else:
-                    return default
-        else:
-            for object_map in self._objectsByType.values():
-                if mrid in object_map:
-                    return object_map[mrid]
-
-            if default is _GET_DEFAULT:
-                raise KeyError(generate_error(mrid, ""))
-            return default
+                    raise KeyError(generate_error(mrid, ""))
+                return default
 
     def __getitem__(self, mrid):
         """
@@ -126,6 +151,25 @@ class BaseService(object, metaclass=ABCMeta):
         """
         return self.get(mrid)
 
+    def enable_concurrent_access(self):
+        """
+        Allow this service to be read by many threads while it is being updated.
+
+        Once enabled, methods that modify the service (`add`, `remove`, `resolve_or_defer_reference` and the index methods) are serialised by a
+        writer lock. Readers never take the writer lock:
+
+        - `get` and `in` are single dictionary lookups and always see the latest objects.
+        - Each `objects` generator iterates a snapshot of the service taken when it yields its first object. It never sees later changes,
+          and never fails because of them. Nothing is copied up front. A writer that modifies a type currently being iterated replaces
+          that type's map with a copy, leaving the readers with the version they started with.
+
+        Generators that are not run to completion keep their snapshot until they are closed or garbage collected.
+        """
+        if self._write_lock is None:
+            self._pin_lock = Lock()
+            self._write_lock = RLock()
+
+    @_writer
     def add(self, identified_object: IdentifiedObject) -> bool:
         """
         Associate an object with this service.
@@ -136,25 +180,34 @@ class BaseService(object, metaclass=ABCMeta):
             return False
         # TODO: Only allow supported types
 
-        objs = self._objectsByType.get(identified_object.__class__, dict())
-        if identified_object.mrid in objs:
+        # mRIDs must be unique across all types in the service.
+        if identified_object.mrid in self._objects_by_mrid:
             return False
 
-        # Check other types and make sure this mRID is unique
-        for obj_map in self._objectsByType.values():
-            if identified_object.mrid in obj_map:
-                return False
-
-        unresolved_refs = self._unresolved_references.get(identified_object.mrid, None)
-        if unresolved_refs:
-            for ref in unresolved_refs:
-                ref.resolver.resolve(ref.from_ref, identified_object)
-            del self._unresolved_references[identified_object.mrid]
-
-        objs[identified_object.mrid] = identified_object
-        self._objectsByType[identified_object.__class__] = objs
+        operations = self._bulk_load_operations()
+        if operations is not None:
+            # References waiting on this object are resolved in order when the bulk load finishes.
+            operations.append(identified_object)
+        else:
+            unresolved_refs = self._unresolved_references.get(identified_object.mrid, None)
+            if unresolved_refs:
+                for ref in unresolved_refs:
+                    ref.resolver.resolve(ref.from_ref, identified_object)
+                    self._reindex_if_stored(ref.from_ref)
+                del self._unresolved_references[identified_object.mrid]
+                self._forget_unresolved_references(unresolved_refs)
+
+        if self._pin_lock is None:
+            self._type_map(identified_object.__class__)[identified_object.mrid] = identified_object
+        else:
+            with self._pin_lock:
+                self._unpinned_type_map(identified_object.__class__)[identified_object.mrid] = identified_object
+        self._objects_by_mrid[identified_object.mrid] = identified_object
+        for index in self._indexes.values():
+            index.add(identified_object)
         return True
 
+    @_writer
     def resolve_or_defer_reference(self, bound_resolver: BoundReferenceResolver, to_mrid: str) -> bool:
         """
         Resolves a property reference between two types by looking up the `to_mrid` in the service and
@@ -172,27 +225,45 @@ class BaseService(object, metaclass=ABCMeta):
         if not to_mrid:
             return True
 
+        operations = self._bulk_load_operations()
+        if operations is not None:
+            to = self.get(to_mrid, bound_resolver.resolver.to_class, default=None)
+            operations.append((bound_resolver, to_mrid, to))
+            return to is not None
+
         from_ = bound_resolver.from_obj
         resolver = bound_resolver.resolver
         reverse_resolver = bound_resolver.reverse_resolver
         try:
             to = self.get(to_mrid, resolver.to_class)
             resolver.resolve(from_, to)
+            self._reindex_if_stored(from_)
             if reverse_resolver:
                 reverse_resolver.resolve(to, from_)
+                self._reindex_if_stored(to)
 
                 # Clean up any reverse unresolved references now that the reference has been resolved
                 if from_.mrid in self._unresolved_references:
                     refs = self._unresolved_references[from_.mrid]
-                    self._unresolved_references[from_.mrid] = [ref for ref in refs if not ref.to_mrid == from_.mrid or not ref.resolver == reverse_resolver]
-
-                    if not self._unresolved_references[from_.mrid]:
+                    remaining = []
+                    resolved = []
+                    for ref in refs:
+                        if not ref.to_mrid == from_.mrid or not ref.resolver == reverse_resolver:
+                            remaining.append(ref)
+                        else:
+                            resolved.append(ref)
+
+                    if remaining:
+                        self._unresolved_references[from_.mrid] = remaining
+                    else:
                         del self._unresolved_references[from_.mrid]
+                    self._forget_unresolved_references(resolved)
             return True
         except KeyError:
             urefs = self._unresolved_references.get(to_mrid, list())
             urefs.append(UnresolvedReference(from_ref=from_, to_mrid=to_mrid, resolver=resolver))
             self._unresolved_references[to_mrid] = urefs
+            self._unresolved_references_by_from.setdefault((id(from_), resolver), set()).add(to_mrid)
             return False
 
     def get_unresolved_reference_mrids(self, bound_resolvers: Union[BoundReferenceResolver, Sized[BoundReferenceResolver]]) -> Generator[str, None, None]:
@@ -208,13 +279,76 @@ class BaseService(object, metaclass=ABCMeta):
         except TypeError:
             resolvers = [bound_resolvers]
 
-        for refs in self._unresolved_references.values():
-            for ref in refs:
-                for resolver in resolvers:
-                    if ref.from_ref is resolver.from_obj and ref.to_mrid not in seen and ref.resolver == resolver.resolver:
-                        seen.add(ref.to_mrid)
-                        yield ref.to_mrid
+        for resolver in resolvers:
+            # Copy the pending mRIDs so resolving references while this generator is consumed doesn't break iteration.
+            for to_mrid in tuple(self._unresolved_references_by_from.get((id(resolver.from_obj), resolver.resolver), ())):
+                if to_mrid not in seen:
+                    seen.add(to_mrid)
+                    yield to_mrid
+
+    def add_all(self, identified_objects: Iterable[IdentifiedObject]) -> bool:
+        """
+        Associate many objects with this service, resolving any references waiting on them in a single pass once they have all been added.
+        `identified_objects` The objects to associate with this service.
+        Returns True if every object was associated with this service, False otherwise.
+        """
+        with self.bulk_load():
+            added = [self.add(io) for io in identified_objects]
+        return all(added)
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Context manager for loading many objects into this service at once.
 
+        Inside the context `add` only stores objects, and `resolve_or_defer_reference` only records the reference to be resolved. All the recorded
+        references are resolved in a single pass when the outermost context exits, leaving the same references resolved and unresolved as if each
+        call had been made outside the context. Objects are visible to `get` as soon as they are added, but their references are not populated,
+        and `get_unresolved_reference_mrids` does not include references recorded in the context, until it exits.
+
+        The recorded operations are held per `contextvars` context, so each thread and asyncio task has its own bulk load, and one that exits is
+        resolved straight away even while others on the same service are still open, such as when fetching several feeders at once.
+        """
+        if self._bulk_load_operations() is not None:
+            yield self
+            return
+
+        frame = [self, []]
+        token = _bulk_loads.set(_bulk_loads.get() + (frame,))
+        try:
+            yield self
+        finally:
+            operations = frame[1]
+            frame[1] = None
+            _bulk_loads.reset(token)
+            self._resolve_bulk_load(operations)
+
+    @_writer
+    def compact(self):
+        """
+        Reduce the memory used by the objects in this service, typically once a large network has finished loading.
+
+        - Equal `name` and `description` strings are shared between objects rather than each object holding its own copy.
+        - Relationship lists, such as the terminals of conducting equipment, are replaced with tuples, which hold no spare capacity, with every
+          empty list replaced by the shared empty tuple.
+        - Relationships keyed by mRID, such as the terminals of connectivity nodes and the equipment of containers, are copied into new dictionaries
+          without the spare capacity left behind by removals, with empty dictionaries released where the relationship is created on first use.
+
+        Objects are fully usable once compacted, and a relationship list that is modified afterwards is converted back to a list. Objects added
+        after this call are not compacted until it is called again.
+        """
+        strings = dict()
+        for io in self._objects_by_mrid.values():
+            io.name = strings.setdefault(io.name, io.name)
+            io.description = strings.setdefault(io.description, io.description)
+            for slot, defaults_to_none in _collection_slots_of(type(io)):
+                collection = getattr(io, slot)
+                if type(collection) is list:
+                    setattr(io, slot, tuple(collection))
+                elif type(collection) is dict:
+                    setattr(io, slot, dict(collection) if collection or not defaults_to_none else None)
+
+    @_writer
     def remove(self, identified_object: IdentifiedObject) -> bool:
         """
         Disassociate an object from this service.
@@ -222,29 +356,285 @@ class BaseService(object, metaclass=ABCMeta):
         `identified_object` THe object to disassociate from the service.
         Raises `KeyError` if `identified_object` or its type was not present in the service.
         """
-        del self._objectsByType[identified_object.__class__][identified_object.mrid]
+        if self._pin_lock is None:
+            del self._objectsByType[identified_object.__class__][identified_object.mrid]
+        else:
+            with self._pin_lock:
+                if identified_object.__class__ not in self._objectsByType:
+                    raise KeyError(identified_object.__class__)
+                del self._unpinned_type_map(identified_object.__class__)[identified_object.mrid]
+        del self._objects_by_mrid[identified_object.mrid]
+        for index in self._indexes.values():
+            index.remove(identified_object)
         return True
 
+    @_writer
+    def discard_unresolved_references(self, from_objects: Iterable[IdentifiedObject]):
+        """
+        Drop the references still waiting to be resolved from any of `from_objects`, typically because they have been removed from this service and
+        should not be linked to objects added later.
+        `from_objects` The objects whose unresolved references should be dropped.
+        """
+        from_ids = {id(io) for io in from_objects}
+        for key in [key for key in self._unresolved_references_by_from if key[0] in from_ids]:
+            for to_mrid in self._unresolved_references_by_from.pop(key):
+                if to_mrid not in self._unresolved_references:
+                    continue
+                refs = [ref for ref in self._unresolved_references[to_mrid] if id(ref.from_ref) not in from_ids]
+                if refs:
+                    self._unresolved_references[to_mrid] = refs
+                else:
+                    del self._unresolved_references[to_mrid]
+
     def objects(self, obj_type: Optional[type] = None, exc_types: Optional[List[type]] = None) -> Generator[IdentifiedObject, None, None]:
         """
         Generator for the objects in this service of type `obj_type`.
         `obj_type` The type of object to yield. If this is a base class it will yield all subclasses.
+        `exc_types` Types to skip when `obj_type` is None.
         Returns Generator over
         """
+        if self._pin_lock is None:
+            for obj_map in self._type_maps(obj_type, exc_types):
+                yield from obj_map.values()
+            return
+
+        with self._pin_lock:
+            obj_maps = list(self._type_maps(obj_type, exc_types))
+            for obj_map in obj_maps:
+                self._pins[id(obj_map)] = self._pins.get(id(obj_map), 0) + 1
+        try:
+            for obj_map in obj_maps:
+                yield from obj_map.values()
+        finally:
+            with self._pin_lock:
+                for obj_map in obj_maps:
+                    count = self._pins.pop(id(obj_map)) - 1
+                    if count:
+                        self._pins[id(obj_map)] = count
+
+    def _type_maps(self, obj_type: Optional[type], exc_types: Optional[List[type]]) -> Generator[Dict[str, IdentifiedObject], None, None]:
         if obj_type is None:
             for typ, obj_map in self._objectsByType.items():
-                if exc_types:
-                    if typ in exc_types:
-                        continue
-                for obj in obj_map.values():
-                    yield obj
-            return
+                if not exc_types or typ not in exc_types:
+                    yield obj_map
         else:
-            try:
-                for obj in self._objectsByType[obj_type].values():
-                    yield obj
-            except KeyError:
-                for _type, object_map in self._objectsByType.items():
-                    if issubclass(_type, obj_type):
-                        for obj in object_map.values():
-                            yield obj
+            for _type in self._concrete_subtypes.get(obj_type, ()):
+                yield self._objectsByType[_type]
+
+    def _unpinned_type_map(self, obj_type: type) -> Dict[str, IdentifiedObject]:
+        """
+        Get the map of objects stored against exactly `obj_type` for modification, replacing it with a copy if a reader is iterating it.
+        Must be called holding `_pin_lock`.
+        """
+        obj_map = self._type_map(obj_type)
+        if id(obj_map) in self._pins:
+            obj_map = self._objectsByType[obj_type] = dict(obj_map)
+        return obj_map
+
+    def _bulk_load_operations(self) -> Optional[List[Union[IdentifiedObject, Tuple[BoundReferenceResolver, str, Optional[IdentifiedObject]]]]]:
+        """
+        Returns The objects added and references requested inside the `bulk_load` of this service open in the current context, in the order they
+        occurred, or None if there isn't one.
+        """
+        for service, operations in reversed(_bulk_loads.get()):
+            if service is self and operations is not None:
+                return operations
+        return None
+
+    @_writer
+    def _resolve_bulk_load(self, operations: List[Union[IdentifiedObject, Tuple[BoundReferenceResolver, str, Optional[IdentifiedObject]]]]):
+        """
+        Replay the operations recorded by `bulk_load` in order, making the same resolver calls as if they had been performed one at a time.
+
+        References to objects added later in the batch are held as lightweight entries rather than `UnresolvedReference`s, as they will be resolved
+        before the replay finishes. References cleaned up by a reverse resolver are marked as cancelled, with any in `_unresolved_references`
+        removed once at the end, rather than rewriting the pending list for every reference that is resolved. References to objects that were
+        missing when they were requested are looked up again, as they may have been added by a bulk load in another context since.
+        """
+        to_be_added = {op.mrid for op in operations if not isinstance(op, tuple)}
+
+        # [from_obj, resolver, active] for each reference to an object still to be added, by the mRID it is waiting on.
+        batch_pending: Dict[str, List[list]] = dict()
+        batch_by_resolver: Dict[str, Dict[ReferenceResolver, List[list]]] = dict()
+
+        # Keyed by id, holding the reference itself so the id can't be reused by a reference created during the replay.
+        cancelled: Dict[int, UnresolvedReference] = dict()
+        cancelled_mrids: Set[str] = set()
+        by_resolver: Dict[str, Dict[ReferenceResolver, List[UnresolvedReference]]] = dict()
+
+        def cancel_reverse_references(mrid: str, reverse_resolver: ReferenceResolver):
+            if mrid in self._unresolved_references:
+                groups = by_resolver.get(mrid)
+                if groups is None:
+                    groups = by_resolver[mrid] = dict()
+                    for r in self._unresolved_references[mrid]:
+                        groups.setdefault(r.resolver, []).append(r)
+                resolved = groups.pop(reverse_resolver, None)
+                if resolved:
+                    cancelled.update((id(r), r) for r in resolved)
+                    cancelled_mrids.add(mrid)
+                    self._forget_unresolved_references(resolved)
+
+            if mrid in batch_pending:
+                groups = batch_by_resolver.get(mrid)
+                if groups is None:
+                    groups = batch_by_resolver[mrid] = dict()
+                    for e in batch_pending[mrid]:
+                        groups.setdefault(e[1], []).append(e)
+                for e in groups.pop(reverse_resolver, ()):
+                    e[2] = False
+
+        for operation in operations:
+            if isinstance(operation, tuple):
+                bound_resolver, to_mrid, to = operation
+                from_ = bound_resolver.from_obj
+                resolver = bound_resolver.resolver
+                if to is None and to_mrid not in to_be_added:
+                    to = self.get(to_mrid, resolver.to_class, default=None)
+                if to is not None:
+                    resolver.resolve(from_, to)
+                    self._reindex_if_stored(from_)
+                    reverse_resolver = bound_resolver.reverse_resolver
+                    if reverse_resolver:
+                        reverse_resolver.resolve(to, from_)
+                        self._reindex_if_stored(to)
+                        cancel_reverse_references(from_.mrid, reverse_resolver)
+                elif to_mrid in to_be_added:
+                    entry = [from_, resolver, True]
+                    batch_pending.setdefault(to_mrid, []).append(entry)
+                    if to_mrid in batch_by_resolver:
+                        batch_by_resolver[to_mrid].setdefault(resolver, []).append(entry)
+                else:
+                    ref = UnresolvedReference(from_ref=from_, to_mrid=to_mrid, resolver=resolver)
+                    self._unresolved_references.setdefault(to_mrid, []).append(ref)
+                    self._unresolved_references_by_from.setdefault((id(from_), resolver), set()).add(to_mrid)
+                    if to_mrid in by_resolver:
+                        by_resolver[to_mrid].setdefault(resolver, []).append(ref)
+            else:
+                mrid = operation.mrid
+                to_be_added.discard(mrid)
+
+                # References from before the bulk load were deferred first, so are resolved first.
+                if mrid in self._unresolved_references:
+                    by_resolver.pop(mrid, None)
+                    unresolved_refs = [ref for ref in self._unresolved_references.pop(mrid) if id(ref) not in cancelled]
+                    for ref in unresolved_refs:
+                        ref.resolver.resolve(ref.from_ref, operation)
+                        self._reindex_if_stored(ref.from_ref)
+                    self._forget_unresolved_references(unresolved_refs)
+
+                entries = batch_pending.pop(mrid, None)
+                if entries:
+                    batch_by_resolver.pop(mrid, None)
+                    for from_, resolver, active in entries:
+                        if active:
+                            resolver.resolve(from_, operation)
+                            self._reindex_if_stored(from_)
+
+        for mrid in cancelled_mrids:
+            refs = self._unresolved_references.get(mrid)
+            if refs is not None:
+                remaining = [ref for ref in refs if id(ref) not in cancelled]
+                if remaining:
+                    self._unresolved_references[mrid] = remaining
+                else:
+                    del self._unresolved_references[mrid]
+
+    @_writer
+    def add_index(self, name: str, obj_type: type, key: Callable[[IdentifiedObject], Any]) -> AttributeIndex:
+        """
+        Register a secondary index over the objects of `obj_type` in this service, for use with `find` and `find_range`. The index is populated from the
+        objects already in the service, and maintained by `add`, `remove` and reference resolution from then on.
+
+        If an indexed attribute of an object is changed in any other way, call `reindex` with the object to update its key.
+
+        `name` The name of the index.
+        `obj_type` The type of object to index, including subclasses.
+        `key` Function returning the key to index an object by, or None to leave it out of the index. See `AttributeIndex` for the requirements of keys.
+        Returns The new `AttributeIndex`.
+        Raises `ValueError` if an index named `name` already exists.
+        """
+        if name in self._indexes:
+            raise ValueError(f"An index named {name} already exists.")
+
+        index = AttributeIndex(obj_type, key)
+        for obj in self.objects(obj_type):
+            index.add(obj)
+        self._indexes[name] = index
+        return index
+
+    @_writer
+    def remove_index(self, name: str):
+        """
+        Remove the secondary index `name`.
+        Raises `KeyError` if there is no index named `name`.
+        """
+        del self._indexes[name]
+
+    def find(self, index: str, key) -> Generator[IdentifiedObject, None, None]:
+        """
+        Generator for the objects with `key` in the secondary index named `index`. See `add_index`.
+        Raises `KeyError` if there is no index named `index`.
+        """
+        return self._indexes[index].find(key)
+
+    def find_range(self, index: str, min_key=None, max_key=None) -> Generator[IdentifiedObject, None, None]:
+        """
+        Generator for the objects with keys between `min_key` and `max_key` inclusive in the secondary index named `index`, in key order. See `add_index`.
+        `min_key` The lowest key to include. If None, there is no lower bound.
+        `max_key` The highest key to include. If None, there is no upper bound.
+        Raises `KeyError` if there is no index named `index`.
+        """
+        return self._indexes[index].find_range(min_key, max_key)
+
+    @_writer
+    def reindex(self, identified_object: IdentifiedObject):
+        """
+        Update the secondary indexes for `identified_object` after changing one of its indexed attributes.
+        """
+        self._reindex_if_stored(identified_object)
+
+    def _reindex_if_stored(self, identified_object: IdentifiedObject):
+        if self._indexes and self._objects_by_mrid.get(identified_object.mrid) is identified_object:
+            for index in self._indexes.values():
+                index.update(identified_object)
+
+    def _forget_unresolved_references(self, refs: Iterable[UnresolvedReference]):
+        """
+        Remove resolved references from `_unresolved_references_by_from`. The caller is responsible for removing them from `_unresolved_references`.
+        `refs` The references that have been resolved.
+        """
+        for ref in refs:
+            key = (id(ref.from_ref), ref.resolver)
+            to_mrids = self._unresolved_references_by_from.get(key)
+            if to_mrids is not None:
+                to_mrids.discard(ref.to_mrid)
+                if not to_mrids:
+                    del self._unresolved_references_by_from[key]
+
+    def _type_map(self, obj_type: type) -> Dict[str, IdentifiedObject]:
+        """
+        Get the map of objects stored against exactly `obj_type`, creating it if this is the first object of that type.
+        A newly seen type is registered against every class in its MRO so `objects` never needs to search the stored types.
+        `obj_type` The concrete type of the objects.
+        Returns The map of mRID to object for `obj_type`.
+        """
+        try:
+            return self._objectsByType[obj_type]
+        except KeyError:
+            obj_map = self._objectsByType[obj_type] = dict()
+            for cls in obj_type.__mro__:
+                self._concrete_subtypes.setdefault(cls, []).append(obj_type)
+            return obj_map
+
+
+def _collection_slots_of(obj_type: type) -> Tuple[Tuple[str, bool], ...]:
+    """
+    Returns The private attributes of `obj_type` that may hold relationship collections, each with whether it defaults to None.
+    """
+    slots = _collection_slots.get(obj_type)
+    if slots is None:
+        defaults = obj_type.__defaults__
+        slots = _collection_slots[obj_type] = tuple((name, name in defaults and defaults[name] is None)
+                                                    for name in fields(obj_type, True) if name.startswith("_"))
+    return slots
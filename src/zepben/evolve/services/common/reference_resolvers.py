@@ -75,6 +75,9 @@ class ReferenceResolver(object):
     def __neq__(self, other):
         return self.from_class is not other.from_class or self.to_class is not other.to_class or self.resolve is not other.resolve
 
+    def __hash__(self):
+        return hash((self.from_class, self.to_class, self.resolve))
+
 
 @dataclass(frozen=True, eq=False, slots=True)
 class BoundReferenceResolver(object):
@@ -7,12 +7,14 @@
 from __future__ import annotations
 import logging
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Generator
+from weakref import WeakSet
 
 from zepben.evolve.model.cim.iec61970.base.meas.measurement import Measurement
 from zepben.evolve.services.common.base_service import BaseService
 from zepben.evolve.model.cim.iec61970.base.core.connectivity_node import ConnectivityNode
 from zepben.evolve.model.cim.iec61970.base.wires.energy_source import EnergySource
+from zepben.evolve.model.network_scenario import NetworkScenario
 from zepben.evolve.services.network.tracing.phases.phasing import SetPhases
 from pathlib import Path
 
@@ -69,12 +71,10 @@ class NetworkService(BaseService):
     """
 
     name: str = "network"
-    _connectivity_nodes: Dict[str, ConnectivityNode] = dict()
     _auto_cn_index: int = 0
     _measurements: Dict[str, List[Measurement]] = []
-
-    def __init__(self):
-        self._objectsByType[ConnectivityNode] = self._connectivity_nodes
+    _scenarios: WeakSet = WeakSet()
+    """The scenarios forked from this network that are still in use."""
 
     def get_measurements(self, mrid: str, t: type) -> List[Measurement]:
         """
@@ -144,7 +144,7 @@ class NetworkService(BaseService):
 
     def _generate_cn_mrid(self):
         mrid = f"generated_cn_{self._auto_cn_index}"
-        while mrid in self._connectivity_nodes:
+        while mrid in self:
             self._auto_cn_index += 1
             mrid = f"generated_cn_{self._auto_cn_index}"
         return mrid
@@ -161,7 +161,7 @@ class NetworkService(BaseService):
         cn.remove_terminal(terminal)
         terminal.disconnect()
         if cn.num_terminals() == 0:
-            del self._connectivity_nodes[cn.mrid]
+            self.remove(cn)
 
     def disconnect_by_mrid(self, connectivity_node_mrid: str):
         """
@@ -170,19 +170,19 @@ class NetworkService(BaseService):
         `connectivity_node_mrid` The mRID of the `ConnectivityNode` to disconnect.
         Raises `KeyError` if there is no `ConnectivityNode` for `connectivity_node_mrid`
         """
-        cn = self._connectivity_nodes[connectivity_node_mrid]
+        cn = self.get(connectivity_node_mrid, ConnectivityNode)
         if cn is not None:
             for term in cn.terminals:
                 term.disconnect()
             cn.clear_terminals()
-            del self._connectivity_nodes[connectivity_node_mrid]
+            self.remove(cn)
 
     def get_primary_sources(self):
         """
         Get the primary source for this network. All directions are applied relative to this EnergySource
         Returns The primary EnergySource
         """
-        return [source for source in self._objectsByType[EnergySource].values() if source.has_phases()]
+        return [source for source in self.objects(EnergySource) if source.has_phases()]
 
     def add_connectivitynode(self, mrid: str):
         """
@@ -191,16 +191,32 @@ class NetworkService(BaseService):
         Returns A new ConnectivityNode with `mrid` if it doesn't already exist, otherwise the existing
                  ConnectivityNode represented by `mrid`
         """
-        if mrid not in self._connectivity_nodes:
-            self._connectivity_nodes[mrid] = ConnectivityNode(mrid=mrid)
-            return self._connectivity_nodes[mrid]
-        else:
-            return self._connectivity_nodes[mrid]
+        cn = self.get(mrid, ConnectivityNode, default=None)
+        if cn is None:
+            cn = ConnectivityNode(mrid=mrid)
+            self.add(cn)
+        return cn
 
     async def set_phases(self):
         set_phases = SetPhases()
         await set_phases.run(self)
 
+    def fork(self) -> NetworkScenario:
+        """
+        Create a copy-on-write branch of the operational state of this network for what-if analysis. Changes made while the scenario is active
+        (`with scenario:`) are only seen inside it. See `NetworkScenario` for the state that is branched.
+        Returns A new `NetworkScenario` with no changes from this network.
+        """
+        scenario = NetworkScenario(self)
+        self._scenarios.add(scenario)
+        return scenario
+
+    def scenarios(self) -> Generator[NetworkScenario, None, None]:
+        """
+        Generator for the scenarios forked from this network that are still in use.
+        """
+        yield from tuple(self._scenarios)
+
     def _index_measurement(self, measurement: Measurement, mrid: str) -> bool:
         if not mrid:
             return False
@@ -0,0 +1,237 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import List, Dict, Optional, Iterable, Union
+
+from dataclassy import dataclass
+
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.core.connectivity_node import ConnectivityNode
+from zepben.evolve.model.cim.iec61970.base.core.terminal import Terminal
+from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind
+from zepben.evolve.model.cim.iec61970.base.wires.switch import Switch
+from zepben.evolve.services.network.network import NetworkService
+
+__all__ = ["CompiledTopology", "compile_topology"]
+
+_ALL_PHASES = 0b1111
+
+
+@dataclass(slots=True)
+class CompiledTopology(object):
+    """
+    An integer indexed snapshot of the connectivity of a `zepben.evolve.services.network.network.NetworkService`, for running many traces over a
+    large network without walking the object graph. Create one with `compile_topology`.
+
+    Conducting equipment, terminals and connectivity nodes are numbered by their position in `equipment`, `terminals` and `connectivity_nodes`.
+    Connectivity is stored in compressed sparse row form:
+
+    - The terminals of equipment `e` are numbered `equipment_offsets[e]` to `equipment_offsets[e + 1] - 1`.
+    - The terminals connected to node `n` are `node_terminals[node_offsets[n]:node_offsets[n + 1]]`.
+    - `terminal_equipment` and `terminal_node` give the equipment and node of each terminal, or -1 if it has none.
+
+    Phases are stored as bitmasks of `SinglePhaseKind.bit_mask`, so phases are matched by core, with X and Y sharing the cores of A and B.
+    `terminal_phases` holds the nominal phases of each terminal, while `normally_open_phases` and `currently_open_phases` hold the open phases of
+    each piece of equipment, with every phase open for equipment that is not in service.
+
+    The snapshot does not follow changes to the network, apart from the open states, which can be re-read with `refresh_open_states`.
+    """
+
+    equipment: List[ConductingEquipment]
+    terminals: List[Terminal]
+    connectivity_nodes: List[ConnectivityNode]
+
+    equipment_offsets: array
+    terminal_equipment: array
+    terminal_node: array
+    terminal_phases: bytearray
+    node_offsets: array
+    node_terminals: array
+
+    normally_open_phases: bytearray
+    currently_open_phases: bytearray
+
+    _equipment_by_mrid: Dict[str, int]
+    _unphased: Optional[bytes] = None
+
+    def equipment_index(self, equipment: Union[ConductingEquipment, str]) -> int:
+        """
+        Get the index of a piece of equipment in this topology.
+        `equipment` The equipment, or its mRID.
+        Returns The index of the equipment in `equipment`.
+        Raises `KeyError` if the equipment was not compiled into this topology.
+        """
+        return self._equipment_by_mrid[equipment if isinstance(equipment, str) else equipment.mrid]
+
+    def refresh_open_states(self):
+        """
+        Re-read the normal and current open state of every piece of equipment, such as after operating switches or entering a
+        `zepben.evolve.model.network_scenario.NetworkScenario`.
+        """
+        for i, ce in enumerate(self.equipment):
+            self.normally_open_phases[i], self.currently_open_phases[i] = _open_phases(ce)
+
+    def refresh_open_state(self, equipment: Union[ConductingEquipment, str]) -> int:
+        """
+        Re-read the normal and current open state of a single piece of equipment, such as after operating a switch.
+        `equipment` The equipment, or its mRID.
+        Returns The index of the equipment in `equipment`.
+        Raises `KeyError` if the equipment was not compiled into this topology.
+        """
+        i = self.equipment_index(equipment)
+        self.normally_open_phases[i], self.currently_open_phases[i] = _open_phases(self.equipment[i])
+        return i
+
+    def trace(self,
+              start: ConductingEquipment,
+              open_phases: Optional[bytearray] = None,
+              phases: Optional[Iterable[SinglePhaseKind]] = None,
+              stop_at: Iterable[ConductingEquipment] = ()) -> List[ConductingEquipment]:
+        """
+        Find the equipment connected to `start`. See `trace_indices`.
+        `start` The equipment to start from.
+        `open_phases` `normally_open_phases` or `currently_open_phases` to stop at open equipment, or None to trace through it.
+        `phases` The phases to trace. If None, phases are ignored and all terminals are treated as connected.
+        `stop_at` Equipment that is included in the result but not traced beyond.
+        Returns The equipment reached, in breadth first order starting with `start`.
+        """
+        mask = None if phases is None else sum(phase.bit_mask for phase in set(phases))
+        indices = self.trace_indices(self.equipment_index(start), open_phases, mask, [self.equipment_index(ce) for ce in stop_at])
+        equipment = self.equipment
+        return [equipment[i] for i in indices]
+
+    def trace_indices(self,
+                      start: int,
+                      open_phases: Optional[bytearray] = None,
+                      phases: Optional[int] = None,
+                      stop_at: Iterable[int] = ()) -> List[int]:
+        """
+        Find the indices of the equipment connected to equipment `start`, travelling from each piece of equipment out through all of its terminals
+        to the other terminals on their connectivity nodes.
+
+        When tracing phases, only phases that are on both terminals of a connection are followed, and equipment is revisited if it is reached
+        on more phases later. Phases that are open on a piece of equipment are not traced through it, but the equipment itself is still reached.
+
+        `start` The index of the equipment to start from.
+        `open_phases` `normally_open_phases` or `currently_open_phases` to stop at open equipment, or None to trace through it.
+        `phases` A bitmask of the phases to trace. If None, phases are ignored and all terminals are treated as connected.
+        `stop_at` Indices of equipment that is included in the result but not traced beyond. This does not apply to `start`.
+        Returns The indices of the equipment reached, in breadth first order starting with `start`.
+        """
+        if phases is None:
+            if self._unphased is None:
+                self._unphased = bytes([_ALL_PHASES]) * len(self.terminals)
+            terminal_phases = self._unphased
+            phases = _ALL_PHASES
+        else:
+            terminal_phases = self.terminal_phases
+
+        equipment_offsets = self.equipment_offsets
+        terminal_equipment = self.terminal_equipment
+        terminal_node = self.terminal_node
+        node_offsets = self.node_offsets
+        node_terminals = self.node_terminals
+        stop_at = set(stop_at)
+        stop_at.discard(start)
+
+        reached = bytearray(len(self.equipment))
+        reached[start] = phases
+        order = [start]
+        queue = deque(((start, phases),))
+        while queue:
+            e, mask = queue.popleft()
+            if e in stop_at:
+                continue
+            if open_phases is not None:
+                mask &= ~open_phases[e]
+
+            for t in range(equipment_offsets[e], equipment_offsets[e + 1]):
+                out = mask & terminal_phases[t]
+                n = terminal_node[t]
+                if not out or n < 0:
+                    continue
+
+                for i in range(node_offsets[n], node_offsets[n + 1]):
+                    other = node_terminals[i]
+                    to_equipment = terminal_equipment[other]
+                    if other == t or to_equipment < 0:
+                        continue
+                    new = out & terminal_phases[other] & ~reached[to_equipment]
+                    if new:
+                        if not reached[to_equipment]:
+                            order.append(to_equipment)
+                        reached[to_equipment] |= new
+                        queue.append((to_equipment, new))
+        return order
+
+
+def compile_topology(network: NetworkService) -> CompiledTopology:
+    """
+    Compile the connectivity of the conducting equipment in `network` into a `CompiledTopology`.
+    `network` The network to compile.
+    Returns A `CompiledTopology` of the network as it is now.
+    """
+    equipment = list(network.objects(ConductingEquipment))
+    equipment_by_mrid = {ce.mrid: i for i, ce in enumerate(equipment)}
+
+    terminals = []
+    terminal_equipment = array("i")
+    equipment_offsets = array("i", [0])
+    for i, ce in enumerate(equipment):
+        for t in ce.terminals:
+            terminals.append(t)
+            terminal_equipment.append(i)
+        equipment_offsets.append(len(terminals))
+
+    seen = {id(t) for t in terminals}
+    for t in network.objects(Terminal):
+        if id(t) not in seen:
+            terminals.append(t)
+            terminal_equipment.append(-1)
+
+    connectivity_nodes = []
+    node_by_mrid = dict()
+    terminal_node = array("i")
+    terminal_phases = bytearray(len(terminals))
+    for i, t in enumerate(terminals):
+        cn = t.connectivity_node
+        if cn is None:
+            terminal_node.append(-1)
+        else:
+            n = node_by_mrid.get(cn.mrid)
+            if n is None:
+                n = node_by_mrid[cn.mrid] = len(connectivity_nodes)
+                connectivity_nodes.append(cn)
+            terminal_node.append(n)
+        terminal_phases[i] = sum(phase.bit_mask for phase in set(t.phases.single_phases))
+
+    node_offsets = array("i", bytes(4 * (len(connectivity_nodes) + 1)))
+    for n in terminal_node:
+        if n >= 0:
+            node_offsets[n + 1] += 1
+    for n in range(len(connectivity_nodes)):
+        node_offsets[n + 1] += node_offsets[n]
+
+    node_terminals = array("i", bytes(4 * node_offsets[-1]))
+    fill = node_offsets[:-1]
+    for t, n in enumerate(terminal_node):
+        if n >= 0:
+            node_terminals[fill[n]] = t
+            fill[n] += 1
+
+    topology = CompiledTopology(equipment, terminals, connectivity_nodes, equipment_offsets, terminal_equipment, terminal_node, terminal_phases,
+                                node_offsets, node_terminals, bytearray(len(equipment)), bytearray(len(equipment)), equipment_by_mrid)
+    topology.refresh_open_states()
+    return topology
+
+
+def _open_phases(ce: ConductingEquipment):
+    normal = _ALL_PHASES if not ce.normally_in_service else ce.get_normal_state() if isinstance(ce, Switch) else 0
+    current = _ALL_PHASES if not ce.in_service else ce.get_state() if isinstance(ce, Switch) else 0
+    return normal, current
@@ -10,9 +10,11 @@ from dataclassy import dataclass
 from operator import attrgetter
 
 from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.core.connectivity_node import ConnectivityNode
 from zepben.evolve.model.cim.iec61970.base.core.terminal import Terminal
+from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind
 from zepben.evolve.model.phases import NominalPhasePath
-from typing import List, Optional, Tuple, Set
+from typing import List, Optional, Tuple, Set, Iterable
 
 __all__ = ["ConnectivityResult", "get_connectivity", "terminal_compare", "get_connected_equipment"]
 
@@ -33,23 +35,23 @@ Terminal.__lt__ = terminal_compare
 def get_connectivity(terminal: Terminal, phases: Set[SinglePhaseKind] = None, exclude=None) -> List[ConnectivityResult]:
     """
     Get the connectivity between this terminal and all other terminals in its `ConnectivityNode`.
-    `cores` Core paths to trace between the terminals. Defaults to all cores.
+
+    The results are cached on the `ConnectivityNode` for each terminal and set of phases, so repeated traces over a network do not work out the same
+    connectivity again. The cache is cleared when terminals are connected to or disconnected from the node, and is not used after the phases of
+    any terminal on the node change. The `ConnectivityResult`s returned are shared between calls, and should not be modified.
+
+    `phases` Phases to trace between the terminals. Defaults to all phases of `terminal`.
     `exclude` `zepben.evolve.iec61970.base.core.terminal.Terminal`'s to exclude from the result. Will be skipped if encountered.
     Returns List of `ConnectivityResult`'s for this terminal.
     """
-    if exclude is None:
-        exclude = set()
-    if phases is None:
-        phases = terminal.phases.single_phases
-    trace_phases = phases.intersection(terminal.phases.single_phases)
-    cn = terminal.connectivity_node if terminal.connectivity_node else []
-    results = []
-    for term in cn:
-        if terminal is not term and term not in exclude:  # Don't include ourselves, or those specifically excluded.
-            cr = _terminal_connectivity(terminal, term, trace_phases)
-            if cr.nominal_phase_paths:
-                results.append(cr)
-    return results
+    cn = terminal.connectivity_node
+    if cn is None:
+        return []
+
+    results = _cached_connectivity(cn, terminal, phases)
+    if exclude:
+        return [cr for cr in results if cr.to_terminal not in exclude]  # Skip those specifically excluded.
+    return list(results)
 
 
 Terminal.connected_terminals = get_connectivity
@@ -68,6 +70,8 @@ def get_connected_equipment(cond_equip, exclude: Set = None):
     connected_equip = []
     for terminal in cond_equip._terminals:
         conn_node = terminal.connectivity_node
+        if conn_node is None:
+            continue
         for term in conn_node:
             if term.conducting_equipment in exclude:
                 continue
@@ -79,6 +83,39 @@ def get_connected_equipment(cond_equip, exclude: Set = None):
 ConductingEquipment.connected_equipment = get_connected_equipment
 
 
+def _cached_connectivity(cn: ConnectivityNode, terminal: Terminal, phases: Optional[Iterable[SinglePhaseKind]]) -> Tuple[ConnectivityResult, ...]:
+    """
+    Get the connectivity from `terminal` to the other terminals of `cn`, cached on `cn` by terminal and phases. The cache is cleared when terminals
+    are added to or removed from `cn`, and is checked against the phases of the terminals of `cn`, so changes to their phases are also seen.
+    """
+    if cn._terminals.get(terminal.mrid) is not terminal:
+        # The cache is keyed by terminal identity, so only use it for terminals that are held by the node.
+        return _node_connectivity(cn, terminal, phases)
+
+    signature = tuple(t.phases for t in cn)
+    cache = getattr(cn, "_connectivity", None)
+    if cache is None or cache[0] != signature:
+        cache = cn._connectivity = (signature, dict())
+
+    key = (id(terminal), None if phases is None else frozenset(phases))
+    results = cache[1].get(key)
+    if results is None:
+        results = cache[1][key] = _node_connectivity(cn, terminal, phases)
+    return results
+
+
+def _node_connectivity(cn: ConnectivityNode, terminal: Terminal, phases: Optional[Iterable[SinglePhaseKind]]) -> Tuple[ConnectivityResult, ...]:
+    terminal_phases = terminal.phases.single_phases
+    trace_phases = set(terminal_phases) if phases is None else set(phases).intersection(terminal_phases)
+    results = []
+    for term in cn:
+        if terminal is not term:  # Don't include ourselves.
+            cr = _terminal_connectivity(terminal, term, trace_phases)
+            if cr.nominal_phase_paths:
+                results.append(cr)
+    return tuple(results)
+
+
 def _terminal_connectivity(terminal: Terminal, connected_terminal: Terminal, phases: Set[SinglePhaseKind]) -> ConnectivityResult:
     nominal_phase_paths = [NominalPhasePath(phase, phase) for phase in phases if phase in connected_terminal.phases.single_phases]
 
@@ -0,0 +1,180 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from array import array
+from typing import List, Optional, Union
+
+from dataclassy import dataclass
+
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.wires.energy_source import EnergySource
+from zepben.evolve.services.network.network import NetworkService
+from zepben.evolve.services.network.tracing.compiled_topology import CompiledTopology, compile_topology
+
+__all__ = ["DownstreamIndex", "build_downstream_index"]
+
+# The IN and OUT bits of every phase of every core of a `zepben.evolve.model.phases.TracedPhases` status.
+_IN_BITS = 0x55555555
+_OUT_BITS = 0xAAAAAAAA
+
+
+def _cores(bits: int) -> int:
+    """A mask of the cores with any bit set in `bits`, matching `SinglePhaseKind.bit_mask`."""
+    return (bits & 0xff and 1) | (bits & 0xff00 and 2) | (bits & 0xff0000 and 4) | (bits & 0xff000000 and 8)
+
+
+@dataclass(slots=True)
+class DownstreamIndex(object):
+    """
+    The equipment fed by each energised source of a network, arranged as a tree by the equipment each piece of equipment is fed from, for answering
+    what is downstream of a piece of equipment without tracing. Create one with `build_downstream_index` after phases have been traced.
+
+    The equipment of each tree is numbered in depth first order, so the equipment downstream of a piece of equipment is the range of the order
+    between its `entry` and `exit`:
+
+    - `order` holds the indices in `topology` of the equipment reached from the sources, in depth first order.
+    - `entry` holds the position in `order` of each piece of equipment, or -1 if it was not reached.
+    - `exit` holds the position in `order` after the last piece of equipment downstream of each piece of equipment.
+    - `parent` holds the index of the equipment each piece of equipment is fed from, or -1 for the sources and equipment that was not reached.
+    - `usage_points` holds the number of usage points of the equipment in `order` before each position, with a final total.
+
+    Where equipment is fed from more than one piece of equipment, such as in a loop, it is only downstream of the first one it was reached from.
+    The index does not follow changes to the network, so build it again after re-tracing phases.
+    """
+
+    topology: CompiledTopology
+    order: array
+    entry: array
+    exit: array
+    parent: array
+    usage_points: array
+
+    def _index(self, equipment: Union[ConductingEquipment, int]) -> int:
+        return equipment if isinstance(equipment, int) else self.topology.equipment_index(equipment)
+
+    def downstream(self, equipment: Union[ConductingEquipment, int]) -> List[ConductingEquipment]:
+        """
+        Get the equipment downstream of `equipment`, in O(k) for k pieces of downstream equipment.
+        `equipment` The equipment, or its index in `topology`.
+        Returns The equipment fed through `equipment`, in depth first order, not including `equipment` itself.
+        """
+        e = self._index(equipment)
+        start = self.entry[e]
+        if start < 0:
+            return []
+        all_equipment = self.topology.equipment
+        return [all_equipment[i] for i in self.order[start + 1:self.exit[e]]]
+
+    def num_downstream(self, equipment: Union[ConductingEquipment, int]) -> int:
+        """
+        Get the number of pieces of equipment downstream of `equipment`, in O(1).
+        `equipment` The equipment, or its index in `topology`.
+        Returns The number of pieces of equipment fed through `equipment`, not including `equipment` itself.
+        """
+        e = self._index(equipment)
+        return self.exit[e] - self.entry[e] - 1 if self.entry[e] >= 0 else 0
+
+    def num_downstream_usage_points(self, equipment: Union[ConductingEquipment, int]) -> int:
+        """
+        Get the number of usage points, such as customers, downstream of `equipment`, in O(1).
+        `equipment` The equipment, or its index in `topology`.
+        Returns The number of usage points of the equipment fed through `equipment`, not including the usage points of `equipment` itself.
+        """
+        e = self._index(equipment)
+        start = self.entry[e]
+        return self.usage_points[self.exit[e]] - self.usage_points[start + 1] if start >= 0 else 0
+
+    def is_downstream(self, equipment: Union[ConductingEquipment, int], of: Union[ConductingEquipment, int]) -> bool:
+        """
+        Check if `equipment` is downstream of `of`, in O(1).
+        `equipment` The equipment to check, or its index in `topology`.
+        `of` The equipment it may be downstream of, or its index in `topology`.
+        Returns True if `equipment` is fed through `of`, otherwise False. Equipment is not downstream of itself.
+        """
+        e, of = self._index(equipment), self._index(of)
+        return self.entry[of] >= 0 and self.entry[of] < self.entry[e] < self.exit[of]
+
+    def feeding(self, equipment: Union[ConductingEquipment, int]) -> Optional[ConductingEquipment]:
+        """
+        Get the equipment `equipment` is fed from.
+        `equipment` The equipment, or its index in `topology`.
+        Returns The equipment `equipment` is directly downstream of, or None for sources and equipment that is not energised.
+        """
+        p = self.parent[self._index(equipment)]
+        return self.topology.equipment[p] if p >= 0 else None
+
+
+def build_downstream_index(network: NetworkService, normal: bool = True, topology: Optional[CompiledTopology] = None) -> DownstreamIndex:
+    """
+    Build a `DownstreamIndex` of `network` from its traced phases, following the same rules as `normal_downstream_trace` and
+    `current_downstream_trace` a piece of equipment at a time: equipment feeds the equipment connected to its terminals that have phases flowing out
+    of them on phases that are not open, and that have phases flowing in.
+
+    `network` The network to index, which must have already had its phases traced.
+    `normal` True to index the normal state of the network, False to index the current state.
+    `topology` A `CompiledTopology` of `network` to index over. If None, `network` is compiled first. Open states are read from the topology, so
+               call `CompiledTopology.refresh_open_states` on a reused topology after operating switches.
+    Returns A `DownstreamIndex` of the energised equipment of `network`.
+    """
+    if topology is None:
+        topology = compile_topology(network)
+
+    status_attr = "normal_status" if normal else "current_status"
+    open_phases = topology.normally_open_phases if normal else topology.currently_open_phases
+    statuses = [getattr(t.traced_phases, status_attr) for t in topology.terminals]
+    equipment_offsets = topology.equipment_offsets
+    terminal_equipment = topology.terminal_equipment
+    terminal_node = topology.terminal_node
+    node_offsets = topology.node_offsets
+    node_terminals = topology.node_terminals
+
+    num_equipment = len(topology.equipment)
+    entry = array("i", [-1]) * num_equipment
+    parent = array("i", [-1]) * num_equipment
+    reached = bytearray(num_equipment)
+    order = array("i")
+
+    sources = [e for e, ce in enumerate(topology.equipment) if isinstance(ce, EnergySource)]
+    for source in sources:
+        if reached[source]:
+            continue
+        reached[source] = 1
+        stack = [source]
+        while stack:
+            e = stack.pop()
+            entry[e] = len(order)
+            order.append(e)
+
+            closed = ~open_phases[e]
+            for t in range(equipment_offsets[e], equipment_offsets[e + 1]):
+                n = terminal_node[t]
+                if n < 0 or not _cores(statuses[t] & _OUT_BITS) & closed:
+                    continue
+                for i in range(node_offsets[n], node_offsets[n + 1]):
+                    other = node_terminals[i]
+                    to_equipment = terminal_equipment[other]
+                    if to_equipment >= 0 and not reached[to_equipment] and statuses[other] & _IN_BITS:
+                        reached[to_equipment] = 1
+                        parent[to_equipment] = e
+                        stack.append(to_equipment)
+
+    # Each piece of equipment is followed in `order` by everything below it, so its exit is its entry plus the size of the tree below it.
+    sizes = array("i", [1]) * num_equipment
+    for e in reversed(order):
+        if parent[e] >= 0:
+            sizes[parent[e]] += sizes[e]
+    exit_ = array("i", [-1]) * num_equipment
+    for e in order:
+        exit_[e] = entry[e] + sizes[e]
+
+    usage_points = array("i", [0])
+    total = 0
+    for e in order:
+        total += topology.equipment[e].num_usage_points()
+        usage_points.append(total)
+
+    return DownstreamIndex(topology, order, entry, exit_, parent, usage_points)
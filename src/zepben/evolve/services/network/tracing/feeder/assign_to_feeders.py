@@ -3,7 +3,7 @@
 #  This Source Code Form is subject to the terms of the Mozilla Public
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
-from typing import Set, Callable, Optional, Awaitable
+from typing import Set, Callable, Optional, List, Dict, Tuple, Iterable
 
 from dataclassy import dataclass
 from zepben.evolve import Equipment
@@ -12,8 +12,10 @@ from zepben.evolve.services.network.network import NetworkService
 from zepben.evolve.model.cim.iec61970.base.core.equipment_container import Feeder, EquipmentContainer
 from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
 from zepben.evolve.model.cim.iec61970.base.core.terminal import Terminal
+from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind
 from zepben.evolve.services.network.tracing.feeder.associated_terminal_trace import new_normal_trace, new_current_trace, get_associated_terminals
 from zepben.evolve.services.network.tracing.traversals.tracing import Traversal
+from zepben.evolve.services.network.tracing.util import normally_open, currently_open
 
 __all__ = ["AssignToFeeders"]
 
@@ -24,13 +26,13 @@ def configure_stop_conditions(traversal: Traversal, feeder_start_points: Set[Con
     traversal.add_stop_condition(reached_substation_transformer)
 
 
-def reached_equipment(ce: Set[ConductingEquipment]) -> Callable[[Terminal], Awaitable[bool]]:
-    async def r(t: Terminal) -> bool:
+def reached_equipment(ce: Set[ConductingEquipment]) -> Callable[[Terminal], bool]:
+    def r(t: Terminal) -> bool:
         return t.conducting_equipment in ce
     return r
 
 
-async def reached_substation_transformer(t: Terminal) -> bool:
+def reached_substation_transformer(t: Terminal) -> bool:
     return isinstance(t.conducting_equipment, PowerTransformer) and t.conducting_equipment.num_substations()
 
 
@@ -46,18 +48,78 @@ class AssignToFeeders(object):
         self.normal_traversal.add_step_action(self.process_normal)
         self.current_traversal.add_step_action(self.process_current)
 
-    async def run(self, network: NetworkService):
+    async def run(self, network: NetworkService, single_pass: bool = False):
+        """
+        Assign equipment to the feeders of `network`, tracing from the head terminal of each feeder out to the head of any other feeder or a
+        substation transformer.
+
+        `network` The network to assign equipment in.
+        `single_pass` True to trace all feeders at once with a single sweep of the network for each of the normal and current states, rather than
+                      running `normal_traversal` and `current_traversal` once per feeder. The feeders equipment is assigned to are the same, but
+                      the traversals, and any step actions or stop conditions added to them, are not used.
+        """
         feeder_start_points = set()
         for feeder in network.objects(Feeder):
             if feeder.normal_head_terminal:
                 if feeder.normal_head_terminal.conducting_equipment:
                     feeder_start_points.add(feeder.normal_head_terminal.conducting_equipment)
+
+        if single_pass:
+            feeders = [feeder for feeder in network.objects(Feeder) if feeder.normal_head_terminal]
+            stop_at = {id(ce) for ce in feeder_start_points}
+            for open_test, assign in ((normally_open, _assign_normal), (currently_open, _assign_current)):
+                for feeder, equipment in zip(feeders, _trace_all_feeders(feeders, stop_at, open_test)):
+                    for ce in equipment:
+                        assign(feeder, ce)
+            return
+
         configure_stop_conditions(self.normal_traversal, feeder_start_points)
         configure_stop_conditions(self.current_traversal, feeder_start_points)
 
         for feeder in network.objects(Feeder):
             await self.assign_to_feeder(feeder)
 
+    async def run_switches(self, network: NetworkService, switches: Iterable[ConductingEquipment], normal: bool = False) -> List[Feeder]:
+        """
+        Update the feeders of the equipment in `network` after the open state of `switches` has changed, without re-tracing every feeder. Only
+        the feeders assigned to the switches, or to the equipment connected to them, can change, so only these feeders have their equipment
+        removed and re-traced, giving the same feeders as running `run` again.
+
+        Any other conducting equipment whose in service state or connections have changed can also be passed in `switches`.
+
+        `network` The network `switches` belong to, which must have already been assigned to feeders with `run`.
+        `switches` The switches, or other conducting equipment, that have changed.
+        `normal` True to update the normal feeders after a change to the normal state, False to update the current feeders.
+        Returns The feeders that were re-traced.
+        """
+        if normal:
+            feeders_of, open_test = (lambda ce: ce.normal_feeders), normally_open
+            equipment_of, unassign, assign = (lambda f: f.equipment), _unassign_normal, _assign_normal
+        else:
+            feeders_of, open_test = (lambda ce: ce.current_feeders), currently_open
+            equipment_of, unassign, assign = (lambda f: f.current_equipment), _unassign_current, _assign_current
+
+        affected: Dict[str, Feeder] = dict()
+        for switch in switches:
+            affected.update((feeder.mrid, feeder) for feeder in feeders_of(switch))
+            for terminal in switch.terminals:
+                for other in _connected_terminals(terminal):
+                    if other.conducting_equipment is not None:
+                        affected.update((feeder.mrid, feeder) for feeder in feeders_of(other.conducting_equipment))
+
+        feeders = list(affected.values())
+        for feeder in feeders:
+            for ce in list(equipment_of(feeder)):
+                unassign(feeder, ce)
+
+        stop_at = {id(feeder.normal_head_terminal.conducting_equipment) for feeder in network.objects(Feeder)
+                   if feeder.normal_head_terminal and feeder.normal_head_terminal.conducting_equipment}
+        traced = [feeder for feeder in feeders if feeder.normal_head_terminal]
+        for feeder, equipment in zip(traced, _trace_all_feeders(traced, stop_at, open_test)):
+            for ce in equipment:
+                assign(feeder, ce)
+        return feeders
+
     async def assign_to_feeder(self, feeder: Feeder):
         self.active_feeder = feeder
         if not feeder.normal_head_terminal:
@@ -68,16 +130,18 @@ class AssignToFeeders(object):
 
     async def _traverse(self, traversal: Traversal, head_terminal: Terminal):
         traversal.reset()
+        # The trace starts from the terminals queued below, not from where the last feeder's trace started.
+        traversal.start_item = None
         traversal.tracker.visit(head_terminal)
         await traversal.apply_step_actions(head_terminal, False)
         traversal.process_queue.extend(get_associated_terminals(head_terminal))
 
         await traversal.trace()
 
-    async def process_normal(self, terminal: Terminal, is_stopping: bool):
+    def process_normal(self, terminal: Terminal, is_stopping: bool):
         self.process(terminal.conducting_equipment, terminal.conducting_equipment.add_container, self.active_feeder.add_equipment, is_stopping)
 
-    async def process_current(self, terminal: Terminal, is_stopping: bool):
+    def process_current(self, terminal: Terminal, is_stopping: bool):
         self.process(terminal.conducting_equipment, terminal.conducting_equipment.add_current_feeder, self.active_feeder.add_current_equipment, is_stopping)
 
     def process(self, ce: Optional[ConductingEquipment],
@@ -92,10 +156,81 @@ class AssignToFeeders(object):
             assign_equip_to_feeder(ce)
 
 
-
-
-
-
-
-
-
+def _assign_normal(feeder: Feeder, ce: ConductingEquipment):
+    ce.add_container(feeder)
+    feeder.add_equipment(ce)
+
+
+def _assign_current(feeder: Feeder, ce: ConductingEquipment):
+    ce.add_current_feeder(feeder)
+    feeder.add_current_equipment(ce)
+
+
+def _unassign_normal(feeder: Feeder, ce: Equipment):
+    ce.remove_containers(feeder)
+    feeder.remove_equipment(ce)
+
+
+def _unassign_current(feeder: Feeder, ce: Equipment):
+    ce.remove_current_feeder(feeder)
+    feeder.remove_current_equipment(ce)
+
+
+def _trace_all_feeders(feeders: List[Feeder],
+                       stop_at: Set[int],
+                       open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool]) -> List[List[ConductingEquipment]]:
+    """
+    Find the equipment of every feeder in one sweep, by flowing a mask of feeder indexes out from their head terminals. Each piece of equipment
+    is expanded once for each feeder that reaches it, following the same rules as the feeder traversals: equipment in `stop_at` and substation
+    transformers are not traced through, stopping transformers are not assigned, and equipment open on every phase of the terminal it is reached
+    through is not traced through.
+
+    `feeders` The feeders to trace, which must all have a head terminal.
+    `stop_at` The `id` of the head equipment of every feeder.
+    `open_test` The open test of the state being traced.
+    Returns The equipment reached from each feeder, in the order of `feeders`.
+    """
+    reached: Dict[int, int] = dict()
+    equipment: List[List[ConductingEquipment]] = [[] for _ in feeders]
+    to_process: List[Tuple[Terminal, int]] = []
+
+    for i, feeder in enumerate(feeders):
+        head = feeder.normal_head_terminal
+        ce = head.conducting_equipment
+        if ce is not None:
+            if not reached.get(id(ce), 0) & (1 << i):
+                reached[id(ce)] = reached.get(id(ce), 0) | (1 << i)
+                equipment[i].append(ce)
+        to_process.extend((t, 1 << i) for t in _connected_terminals(head))
+
+    while to_process:
+        terminal, feeder_mask = to_process.pop()
+        ce = terminal.conducting_equipment
+        if ce is None:
+            continue
+        previous = reached.get(id(ce), 0)
+        new = feeder_mask & ~previous
+        if not new:
+            continue
+        reached[id(ce)] = previous | new
+
+        stopping = id(ce) in stop_at or reached_substation_transformer(terminal)
+        if not (stopping and isinstance(ce, PowerTransformer)):
+            mask = new
+            while mask:
+                lowest = mask & -mask
+                equipment[lowest.bit_length() - 1].append(ce)
+                mask ^= lowest
+
+        if not stopping and any(not open_test(ce, phase) for phase in terminal.phases.single_phases):
+            for other in ce.terminals:
+                if other is not terminal:
+                    to_process.extend((t, new) for t in _connected_terminals(other))
+
+    return equipment
+
+
+def _connected_terminals(terminal: Terminal) -> List[Terminal]:
+    # The same as `get_associated_terminals`, without hashing terminals for its exclude set.
+    cn = terminal.connectivity_node
+    return [t for t in cn.terminals if t is not terminal] if cn is not None else []
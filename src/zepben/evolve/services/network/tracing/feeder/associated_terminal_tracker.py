@@ -26,6 +26,5 @@ class AssociatedTerminalTracker(Tracker):
         # We don't visit any terminal that does not have a valid conducting equipment reference.
         if terminal is not None:
             if terminal.conducting_equipment is not None:
-                self.visited.add(terminal.conducting_equipment)
-                return True
+                return super().visit(terminal.conducting_equipment)
         return False
@@ -8,12 +8,14 @@ from __future__ import annotations
 from dataclassy import dataclass
 
 
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
 from zepben.evolve.services.network.tracing.phases.phase_step import PhaseStep
 from zepben.evolve.services.network.tracing.traces import normal_downstream_trace, current_downstream_trace
-from typing import Callable, List, Optional, Dict
+from zepben.evolve.services.network.tracing.traversals.tracing import Traversal
+from typing import Callable, List, Optional, Dict, Iterable
 from enum import Enum
 
-__all__ = ["Status", "Result", "find_current", "find_normal"]
+__all__ = ["Status", "Result", "find_current", "find_normal", "find_all_current", "find_all_normal"]
 
 
 class Status(Enum):
@@ -41,10 +43,10 @@ async def _trace(traversal_supplier: Callable[[...], Traversal], from_: Conducti
     path_found = [to is None]
     with_usage_points = {}
 
-    async def stop_contains(phase_step):
+    def stop_contains(phase_step):
         return phase_step.conducting_equipment.mrid in extent_ids
 
-    async def step(phase_step, is_stopping):
+    def step(phase_step, is_stopping):
         if is_stopping:
             path_found[0] = True
 
@@ -62,10 +64,10 @@ async def _trace(traversal_supplier: Callable[[...], Traversal], from_: Conducti
             return Result(status=Status.NO_PATH)
         with_usage_points.clear()
         traversal.reset()
-        traversal.trace(PhaseStep(to, frozenset(next(to.terminals).phases.single_phases)), can_stop_on_start_item=False)
+        await traversal.trace(PhaseStep(to, frozenset(next(to.terminals).phases.single_phases)), can_stop_on_start_item=False)
 
     if path_found[0]:
-        return Result(conducting_equipment=with_usage_points)
+        return Result(equipment=with_usage_points)
     else:
         return Result(status=Status.NO_PATH)
 
@@ -79,7 +81,110 @@ async def _find(traversal_supplier: Callable[[...], Traversal], froms: List[Cond
         if t is not None and f.mrid == t.mrid:
             res.append(Result(equipment={f.mrid: f} if f.num_usage_points() != 0 else None))
         else:
-            res.append(_trace(traversal_supplier, f, t))
+            res.append(await _trace(traversal_supplier, f, t))
+    return res
+
+
+@dataclass(slots=True)
+class _DownstreamTree(object):
+    """
+    The equipment reached by a downstream trace from `root`, arranged as a tree by the step each piece of equipment was first reached from.
+    """
+    root: ConductingEquipment
+    reached_equipment: Dict[int, ConductingEquipment] = dict()
+    """The equipment reached, other than `root`, keyed by `id`."""
+    children: Dict[int, List[ConductingEquipment]] = dict()
+    """The equipment first reached from each piece of equipment, keyed by the `id` of the equipment they were reached from."""
+    with_usage_points: Dict[str, ConductingEquipment] = dict()
+    """The equipment reached that has usage points, in the order they were reached."""
+
+    def reached(self, ce: ConductingEquipment) -> bool:
+        return ce is self.root or id(ce) in self.reached_equipment
+
+    def below(self, ce: ConductingEquipment) -> Iterable[ConductingEquipment]:
+        """Get the equipment that was reached through `ce`, not including `ce` itself."""
+        stack = list(self.children.get(id(ce), ()))
+        while stack:
+            child = stack.pop()
+            yield child
+            stack.extend(self.children.get(id(child), ()))
+
+    def result(self, stop_at: ConductingEquipment) -> Result:
+        """Get the result of a trace from `root` that stops at `stop_at`, by leaving out the equipment that was reached through it."""
+        equipment = dict(self.with_usage_points)
+        for ce in self.below(stop_at):
+            equipment.pop(ce.mrid, None)
+        return Result(equipment=equipment)
+
+
+async def _trace_tree(traversal_supplier: Callable[[...], Traversal], root: ConductingEquipment) -> _DownstreamTree:
+    tree = _DownstreamTree(root)
+
+    def step(phase_step, _):
+        ce = phase_step.conducting_equipment
+        if ce is root or id(ce) in tree.reached_equipment:
+            return
+        tree.reached_equipment[id(ce)] = ce
+        tree.children.setdefault(id(phase_step.previous), []).append(ce)
+        if ce.num_usage_points() != 0:
+            tree.with_usage_points[ce.mrid] = ce
+
+    if root.num_usage_points() != 0:
+        tree.with_usage_points[root.mrid] = root
+
+    traversal = traversal_supplier()
+    traversal.add_stop_condition(lambda phase_step: phase_step.conducting_equipment is root)
+    traversal.add_step_action(step)
+    traversal.reset()
+    await traversal.trace(PhaseStep(root, frozenset(next(root.terminals).phases.single_phases)), can_stop_on_start_item=False)
+    return tree
+
+
+async def _find_all(traversal_supplier: Callable[[...], Traversal],
+                    froms: List[ConductingEquipment],
+                    tos: List[Optional[ConductingEquipment]]) -> List[Result]:
+    """
+    Find the paths between many pairs of equipment, sharing the traces between pairs. Each distinct `from_` is traced downstream once, and the
+    result for every pair starting from it is read from that trace. Pairs whose `to` was not downstream of `from_` are then looked up in the
+    same way with a single downstream trace from each distinct `to`.
+
+    The equipment of each result is the same as tracing the pair on its own with `_trace` when the downstream traces are radial. Where a
+    downstream trace reaches equipment by more than one path, equipment is treated as being reached through the first path it was traced on.
+    """
+    if len(froms) != len(tos):
+        return [Result(status=Status.MISMATCHED_FROM_TO)] * min(len(froms), len(tos))
+
+    trees: Dict[int, _DownstreamTree] = dict()
+
+    async def tree_from(ce: ConductingEquipment) -> _DownstreamTree:
+        tree = trees.get(id(ce))
+        if tree is None:
+            tree = trees[id(ce)] = await _trace_tree(traversal_supplier, ce)
+        return tree
+
+    res: List[Optional[Result]] = [None] * len(froms)
+    reverse = []
+    for i, (f, t) in enumerate(zip(froms, tos)):
+        if t is not None and f.mrid == t.mrid:
+            res[i] = Result(equipment={f.mrid: f} if f.num_usage_points() != 0 else None)
+        elif f.num_terminals() == 0:
+            res[i] = await _trace(traversal_supplier, f, t)
+        else:
+            tree = await tree_from(f)
+            if t is None:
+                res[i] = Result(equipment=dict(tree.with_usage_points))
+            elif tree.reached(t):
+                res[i] = tree.result(t)
+            else:
+                reverse.append(i)
+
+    for i in reverse:
+        f, t = froms[i], tos[i]
+        if t.num_terminals() == 0:
+            res[i] = Result(status=Status.NO_PATH)
+        else:
+            tree = await tree_from(t)
+            res[i] = tree.result(f) if tree.reached(f) else Result(status=Status.NO_PATH)
     return res
 
 
@@ -89,3 +194,23 @@ def find_normal(from_: ConductingEquipment, to: ConductingEquipment):
 
 def find_current(from_: ConductingEquipment, to: ConductingEquipment):
     return _find(current_downstream_trace, froms=[from_], tos=[to])
+
+
+def find_all_normal(froms: List[ConductingEquipment], tos: List[Optional[ConductingEquipment]]):
+    """
+    Find the normal paths between many pairs of equipment at once, sharing a single downstream trace between every pair with the same `from`
+    equipment, or the same `to` equipment when it is upstream of `from`. This is much faster than calling `find_normal` for each pair.
+
+    `froms` The equipment to find paths from.
+    `tos` The equipment to find a path to from the equipment at the same index of `froms`, or None to find all of the equipment downstream of it.
+    Returns A `Result` for each pair, in the order of `froms` and `tos`, or a `Result` with `Status.MISMATCHED_FROM_TO` for each pair if they are
+            different lengths.
+    """
+    return _find_all(normal_downstream_trace, froms, tos)
+
+
+def find_all_current(froms: List[ConductingEquipment], tos: List[Optional[ConductingEquipment]]):
+    """
+    Find the current paths between many pairs of equipment at once. See `find_all_normal`.
+    """
+    return _find_all(current_downstream_trace, froms, tos)
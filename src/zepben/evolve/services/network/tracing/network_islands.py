@@ -0,0 +1,251 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from array import array
+from typing import List, Optional, Dict, Iterable, Union
+
+from dataclassy import dataclass
+
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.wires.energy_source import EnergySource
+from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind
+from zepben.evolve.services.network.network import NetworkService
+from zepben.evolve.services.network.tracing.compiled_topology import CompiledTopology, compile_topology
+
+__all__ = ["Island", "NetworkIslands", "build_network_islands"]
+
+_CORES = (SinglePhaseKind.A, SinglePhaseKind.B, SinglePhaseKind.C, SinglePhaseKind.N)
+_NUM_CORES = len(_CORES)
+
+
+@dataclass(slots=True)
+class Island(object):
+    """A set of equipment connected to each other on one or more phases without passing through open equipment, found by `NetworkIslands`."""
+
+    equipment: List[ConductingEquipment]
+    """The equipment with a terminal in the island. Open equipment on the edge of more than one island is in each of them."""
+
+    sources: List[EnergySource]
+    """The `EnergySource`s in the island that are in service in the state the island was found for."""
+
+    phases: List[SinglePhaseKind]
+    """The phases the equipment is connected on, by core, so X and Y are given as A and B."""
+
+    @property
+    def energised(self) -> bool:
+        """True if the island contains an in service source, otherwise False."""
+        return bool(self.sources)
+
+
+@dataclass(slots=True)
+class NetworkIslands(object):
+    """
+    The islands of a network in its normal or current state, held as a union-find over each phase core of its terminals and connectivity nodes.
+    On each core, every terminal with that phase is joined to its connectivity node, and the terminals of each piece of equipment with that phase
+    are joined to each other unless the phase is open, as given by `Switch.is_normally_open` or `Switch.is_open`, or the equipment is not in service.
+    A switch that is only open on some phases therefore splits the islands of those phases, such as a single phase branch fed through it, while
+    leaving the islands of its other phases joined. Terminals without phases are not in any island.
+
+    Islands on different cores with the same terminals and connectivity nodes are given as a single `Island` of all of those phases. Create one with
+    `build_network_islands`, and keep it up to date as switches are operated with `update`.
+
+    Terminals are numbered as in `topology`, with connectivity node `n` numbered after them as `len(topology.terminals) + n`. Each core has its own
+    block of those numbers, so element `x` of core `c` is numbered `c * size + x`, where `size` is the number of terminals and connectivity nodes.
+    """
+
+    topology: CompiledTopology
+    normal: bool
+    _parent: array
+    _members: Dict[int, List[int]]
+
+    def islands(self) -> List[Island]:
+        """
+        Get every island of the network.
+        Returns An `Island` for each set of connected terminals and connectivity nodes, including terminals that are not connected to anything.
+        """
+        return self._islands(self._members)
+
+    def islands_of(self, equipment: Union[ConductingEquipment, str]) -> List[Island]:
+        """
+        Get the islands a piece of equipment is in.
+        `equipment` The equipment, or its mRID.
+        Returns The island of each of its terminals, which is one island for closed equipment and can be more for equipment that is open on any
+        of its phases.
+        """
+        return self._islands(self._roots_of(self.topology.equipment_index(equipment)))
+
+    def is_connected(self, equipment: Union[ConductingEquipment, str], other: Union[ConductingEquipment, str]) -> bool:
+        """
+        Check if two pieces of equipment are in the same island, in O(1) amortised.
+        `equipment` The equipment, or its mRID.
+        `other` The other equipment, or its mRID.
+        Returns True if a terminal of `equipment` is in the same island as a terminal of `other` on any phase, otherwise False.
+        """
+        return not self._roots_of(self.topology.equipment_index(equipment)).isdisjoint(self._roots_of(self.topology.equipment_index(other)))
+
+    def update(self, equipment: Union[ConductingEquipment, str]):
+        """
+        Update the islands after the open or in service state of a piece of equipment has changed. Phases that are closed join the islands of its
+        terminals. Phases that are open only find the islands of the terminals and connectivity nodes of the islands they were in again.
+
+        `equipment` The equipment that changed, or its mRID. Its open state is re-read into `topology` with `CompiledTopology.refresh_open_state`.
+        """
+        topology = self.topology
+        e = topology.refresh_open_state(equipment)
+        open_phases = (topology.normally_open_phases if self.normal else topology.currently_open_phases)[e]
+        size = self._size()
+
+        terminals = range(topology.equipment_offsets[e], topology.equipment_offsets[e + 1])
+        opened = set()
+        for core in range(_NUM_CORES):
+            bit = 1 << core
+            elements = [core * size + t for t in terminals if topology.terminal_phases[t] & bit]
+            if open_phases & bit:
+                opened.update(self._find(x) for x in elements)
+            else:
+                for x in elements[1:]:
+                    self._union(elements[0], x)
+
+        if opened:
+            self._rebuild([x for root in opened for x in self._members.pop(root)])
+
+    def _size(self) -> int:
+        return len(self.topology.terminals) + len(self.topology.connectivity_nodes)
+
+    def _roots_of(self, e: int) -> set:
+        topology = self.topology
+        size = self._size()
+        return {self._find(core * size + t)
+                for t in range(topology.equipment_offsets[e], topology.equipment_offsets[e + 1])
+                for core in range(_NUM_CORES) if topology.terminal_phases[t] & (1 << core)}
+
+    def _islands(self, roots: Iterable[int]) -> List[Island]:
+        size = self._size()
+        phases_by_elements: Dict[frozenset, int] = dict()
+        for root in roots:
+            elements = frozenset(x % size for x in self._members[root])
+            phases_by_elements[elements] = phases_by_elements.get(elements, 0) | (1 << (root // size))
+        return [self._island(elements, phases) for elements, phases in phases_by_elements.items()]
+
+    def _island(self, elements: Iterable[int], phases: int) -> Island:
+        topology = self.topology
+        num_terminals = len(topology.terminals)
+        seen = set()
+        equipment = []
+        for t in sorted(elements):
+            if t < num_terminals:
+                e = topology.terminal_equipment[t]
+                if e >= 0 and e not in seen:
+                    seen.add(e)
+                    equipment.append(topology.equipment[e])
+
+        open_phases = topology.normally_open_phases if self.normal else topology.currently_open_phases
+        sources = [ce for ce in equipment if isinstance(ce, EnergySource) and phases & ~open_phases[topology.equipment_index(ce)]]
+        return Island(equipment, sources, [phase for phase in _CORES if phases & phase.bit_mask])
+
+    def _find(self, x: int) -> int:
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def _union(self, x: int, y: int):
+        x, y = self._find(x), self._find(y)
+        if x == y:
+            return
+        members = self._members
+        if len(members[x]) < len(members[y]):
+            x, y = y, x
+        self._parent[y] = x
+        members[x].extend(members.pop(y))
+
+    def _rebuild(self, elements: Iterable[int]):
+        """
+        Split `elements`, which must be every member of one or more islands that have been removed from `_members`, into singletons and join them
+        again. Elements that are not on their core, such as a terminal without that phase, must not be included.
+        """
+        topology = self.topology
+        num_terminals = len(topology.terminals)
+        num_equipment = len(topology.equipment)
+        size = self._size()
+        terminal_node = topology.terminal_node
+        terminal_equipment = topology.terminal_equipment
+        open_phases = topology.normally_open_phases if self.normal else topology.currently_open_phases
+        parent = self._parent
+        members = self._members
+
+        elements = list(elements)
+        for x in elements:
+            parent[x] = x
+
+        # Join each terminal to its node, and to the first terminal of its equipment on the same core if the equipment is closed on it, before
+        # gathering the members of each island, so joining does not have to move member lists around. The terminals of equipment that is closed
+        # on a core are all in the same island, so they are either all in `elements` or none of them are. Each terminal is still a singleton
+        # when it is reached, so it is joined below the root of its node, keeping the trees shallow. Finds are inlined as this runs over every
+        # element when the islands are built.
+        anchors: Dict[int, int] = dict()
+        for x in elements:
+            core, t = divmod(x, size)
+            if t >= num_terminals:
+                continue
+
+            root = x
+            n = terminal_node[t]
+            if n >= 0:
+                root = x - t + num_terminals + n
+                while parent[root] != root:
+                    parent[root] = parent[parent[root]]
+                    root = parent[root]
+                parent[x] = root
+
+            e = terminal_equipment[t]
+            if e >= 0 and not open_phases[e] & (1 << core):
+                anchor = anchors.setdefault(core * num_equipment + e, x)
+                while parent[anchor] != anchor:
+                    parent[anchor] = parent[parent[anchor]]
+                    anchor = parent[anchor]
+                if anchor != root:
+                    parent[root] = anchor
+
+        for x in elements:
+            root = x
+            while parent[root] != root:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            island = members.get(root)
+            if island is None:
+                members[root] = [x]
+            else:
+                island.append(x)
+
+
+def build_network_islands(network: NetworkService, normal: bool = True, topology: Optional[CompiledTopology] = None) -> NetworkIslands:
+    """
+    Find the islands of `network`.
+
+    `network` The network to find the islands of.
+    `normal` True to find the islands of the normal state of the network, False for the current state.
+    `topology` A `CompiledTopology` of `network` to use. If None, `network` is compiled first. Open states are read from the topology, so call
+               `CompiledTopology.refresh_open_states` on a reused topology after operating switches.
+    Returns The `NetworkIslands` of `network`.
+    """
+    if topology is None:
+        topology = compile_topology(network)
+
+    # The phases of each terminal, followed by the phases of the terminals on each connectivity node.
+    phases = bytearray(topology.terminal_phases)
+    for n in range(len(topology.connectivity_nodes)):
+        node_phases = 0
+        for i in range(topology.node_offsets[n], topology.node_offsets[n + 1]):
+            node_phases |= topology.terminal_phases[topology.node_terminals[i]]
+        phases.append(node_phases)
+
+    size = len(phases)
+    islands = NetworkIslands(topology, normal, array("i", range(_NUM_CORES * size)), dict())
+    islands._rebuild(core * size + x for core in range(_NUM_CORES) for x in range(size) if phases[x] & (1 << core))
+    return islands
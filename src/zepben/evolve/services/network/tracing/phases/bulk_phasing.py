@@ -0,0 +1,322 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import List, Optional, Dict, Tuple, Set
+
+from zepben.evolve.exceptions import PhaseException, TracingException
+from zepben.evolve.model.cim.iec61970.base.wires.energy_source import EnergySource
+from zepben.evolve.model.cim.iec61970.base.wires.single_phase_kind import SinglePhaseKind, phasekind_by_id
+from zepben.evolve.model.cim.iec61970.base.wires.switch import Breaker
+from zepben.evolve.model.phasedirection import PhaseDirection
+from zepben.evolve.model.phases import PHASE_DIR_MAP
+from zepben.evolve.services.network.network import NetworkService
+from zepben.evolve.services.network.tracing.compiled_topology import CompiledTopology, compile_topology
+from zepben.evolve.services.network.tracing.connectivity import get_connectivity
+from zepben.evolve.services.network.tracing.phases.phasing import FeederProcessingStatus
+
+__all__ = ["BulkSetPhases"]
+
+logger = logging.getLogger("bulk_phasing.py")
+
+_IN = PhaseDirection.IN.value
+_OUT = PhaseDirection.OUT.value
+_BOTH = PhaseDirection.BOTH.value
+
+# The id of the phase and the direction held in each value of a core byte of a `TracedPhases` status, decoded as
+# `zepben.evolve.model.phases.phase` and `zepben.evolve.model.phases.direction` do.
+_BYTE_PHASE = [PHASE_DIR_MAP[b].id for b in range(256)]
+_BYTE_DIRECTION = [(b >> (2 * max(_BYTE_PHASE[b] - 1, 0))) & 0b11 for b in range(256)]
+
+# The IN bit of every phase of every core. Phases flowed between terminals are added to all of their cores at once with the masks below.
+_PHASE_BITS = 0x55555555
+
+
+def _phase_bits(status: int) -> int:
+    """The phase held by each core of `status`, as its IN bit."""
+    return (status | (status >> 1)) & _PHASE_BITS
+
+
+def _used_cores(bits: int) -> int:
+    """A mask of the bytes of every core with any bit set in `bits`."""
+    bits |= bits >> 4
+    bits |= bits >> 2
+    bits |= bits >> 1
+    return (bits & 0x01010101) * 0xff
+
+
+class BulkSetPhases(object):
+    """
+    Traces the normal and current phases of a network from the same energy sources and feeder circuit breakers as
+    `zepben.evolve.services.network.tracing.phases.phasing.SetPhases`, but holds the phase status of every terminal in a list of integers packed the
+    same way as `zepben.evolve.model.phases.TracedPhases`, and flows phases between them over a `CompiledTopology` rather than through traversals
+    and `PhaseStatus` objects. The statuses are written back to `Terminal.traced_phases` once tracing is complete.
+
+    The results only match `SetPhases` on radial networks, so it is not a replacement for it on networks with loops. `SetPhases` stops at terminals
+    it has already traced, while `BulkSetPhases` flows phases until nothing changes. Phases that flow around a loop come back out of it towards
+    the source, so the terminals feeding a loop are given both directions, where `SetPhases` only gives them the direction away from the source.
+    """
+
+    # Nothing here is awaited, but `run` is a coroutine to be called the same way as `SetPhases.run`.
+    async def run(self, network: NetworkService, topology: Optional[CompiledTopology] = None):
+        """
+        Trace the normal and current phases of `network` from its energy sources and feeder circuit breakers.
+
+        `network` The network to trace.
+        `topology` A `CompiledTopology` of `network` to trace over. If None, `network` is compiled first. Open states are read from the topology, so
+                   call `CompiledTopology.refresh_open_states` on a reused topology after operating switches.
+        Raises `TracingException` if `network` has no energy sources with phases, or `PhaseException` if phases cross.
+        """
+        start_terminals = [term for es in network.objects(EnergySource) if es.num_phases() > 0 for term in es.terminals]
+        if not start_terminals:
+            raise TracingException("No feeder sources were found, tracing cannot be performed.")
+        if topology is None:
+            topology = compile_topology(network)
+
+        feeder_cbs = [br for br in network.objects(Breaker) if br.is_substation_breaker()]
+        phasing = _BulkPhasing(topology)
+        phasing.run(start_terminals, feeder_cbs, topology.normally_open_phases, "normal_status")
+        phasing.run(start_terminals, feeder_cbs, topology.currently_open_phases, "current_status")
+
+
+class _BulkPhasing(object):
+    """
+    The statuses and connectivity of one `CompiledTopology`, shared between tracing its normal and current phases.
+
+    Sets of nominal phases are held as masks of `1 << SinglePhaseKind.id`. `nominal_phases` holds a `(phase mask, core, open mask)` tuple for each
+    nominal phase of each terminal, where the open mask is the `SinglePhaseKind.bit_mask` checked against `CompiledTopology` open phases.
+    Phases flowed between terminals on the same cores are merged into a status with bitwise operations over all of its cores at once, rather than
+    one phase at a time.
+    """
+
+    def __init__(self, topology: CompiledTopology):
+        self.topology = topology
+        self.terminal_index = {id(t): i for i, t in enumerate(topology.terminals)}
+
+        nominal_by_code = {}
+        for t in topology.terminals:
+            if t.phases not in nominal_by_code:
+                nominal_by_code[t.phases] = tuple((1 << phase.id, phase.mask_index, phase.bit_mask) for phase in t.phases.single_phases)
+        self.nominal_phases = [nominal_by_code[t.phases] for t in topology.terminals]
+        self.phase_masks = [sum(mask for mask, _, _ in nominal) for nominal in self.nominal_phases]
+        self.substation_breakers = bytearray(isinstance(ce, Breaker) and ce.is_substation_breaker() for ce in topology.equipment)
+        self.connectivity: Dict[Tuple[int, int], List[Tuple[int, List[Tuple[int, int]]]]] = dict()
+
+        self.status: List[int] = []
+        self.open_phases = bytearray()
+        self.queue = deque()
+
+    def run(self, start_terminals: List, feeder_cbs: List[Breaker], open_phases: bytearray, status_attr: str):
+        terminals = self.topology.terminals
+        self.status = status = [getattr(t.traced_phases, status_attr) for t in terminals]
+        original = list(status)
+        self.open_phases = open_phases
+
+        start = [self.terminal_index[id(t)] for t in start_terminals]
+        for t in start:
+            for mask, core, _ in self.nominal_phases[t]:
+                self._add(t, mask.bit_length() - 1, _OUT, core)
+
+        for t in start:
+            self._flow_out(t, sum(mask for mask, core, _ in self.nominal_phases[t] if self._direction(t, core) & _OUT))
+            self._drain()
+
+        self._run_feeder_cbs([self.topology.equipment_index(br) for br in feeder_cbs])
+
+        for i, t in enumerate(terminals):
+            if status[i] != original[i]:
+                setattr(t.traced_phases, status_attr, status[i])
+
+    def _phase(self, t: int, core: int) -> int:
+        return _BYTE_PHASE[(self.status[t] >> (8 * core)) & 0xff]
+
+    def _direction(self, t: int, core: int) -> int:
+        return _BYTE_DIRECTION[(self.status[t] >> (8 * core)) & 0xff]
+
+    def _add(self, t: int, phase: int, direction: int, core: int) -> bool:
+        """
+        Add the phase with id `phase` in `direction` to `core` of terminal `t`, as `TracedPhases.add_normal` does.
+        Returns True if the status changed.
+        """
+        if not phase:
+            return False
+        status = self.status[t]
+        byte = (status >> (8 * core)) & 0xff
+        if byte:
+            existing = _BYTE_PHASE[byte]
+            if existing and existing != phase:
+                terminal = self.topology.terminals[t]
+                ce = terminal.conducting_equipment
+                raise PhaseException(f"Attempted to apply more than one phase to {ce.mrid if ce else terminal.mrid} on core {core}. "
+                                     f"Attempted to apply phase {phasekind_by_id(phase)} to {phasekind_by_id(existing)}.")
+            if _BYTE_DIRECTION[byte] & direction == direction:
+                return False
+
+        self.status[t] = status | (direction << (2 * (phase - 1) + 8 * core))
+        return True
+
+    def _merge(self, t: int, bits: int) -> bool:
+        """
+        Add the phase and direction `bits` to the status of terminal `t`, as adding each of them with `TracedPhases.add_normal` does.
+        Returns True if the status changed.
+        """
+        status = self.status[t]
+        existing = _phase_bits(status)
+        added = _phase_bits(bits)
+        crossed = (existing ^ added) & _used_cores(existing) & _used_cores(added)
+        if crossed:
+            core = (crossed.bit_length() - 1) // 8
+            self._add(t, _BYTE_PHASE[(bits >> (8 * core)) & 0xff], _IN, core)
+
+        merged = status | bits
+        if merged == status:
+            return False
+        self.status[t] = merged
+        return True
+
+    def _cores(self, t: int, phases: int) -> int:
+        """A mask of the bytes of the cores of terminal `t` holding the `phases` mask."""
+        return sum(0xff << (8 * core) for mask, core, _ in self.nominal_phases[t] if mask & phases)
+
+    def _connected(self, t: int, phases: int) -> List[Tuple[int, int, Optional[List[Tuple[int, int]]]]]:
+        """
+        The terminals connected to terminal `t`, with the cores `phases` flow into them on, as `get_connectivity`. Terminals connected on the same
+        cores are given as `(terminal, core mask, None)`, while terminals connected through their X and Y phases are given as
+        `(terminal, 0, [(from core, to core)])`.
+        """
+        key = (t, phases)
+        connected = self.connectivity.get(key)
+        if connected is not None:
+            return connected
+
+        topology = self.topology
+        n = topology.terminal_node[t]
+        phases &= self.phase_masks[t]
+        connected = []
+        if n >= 0 and phases:
+            nominal = self.nominal_phases[t]
+            fallback = None
+            for other in topology.node_terminals[topology.node_offsets[n]:topology.node_offsets[n + 1]]:
+                if other == t:
+                    continue
+                shared = phases & self.phase_masks[other]
+                if shared:
+                    connected.append((other, sum(0xff << (8 * core) for mask, core, _ in nominal if mask & shared), None))
+                else:
+                    # Only terminals without a phase in common can be connected through their X and Y phases.
+                    if fallback is None:
+                        fallback = {id(cr.to_terminal): cr for cr in get_connectivity(topology.terminals[t], _phase_set(phases))}
+                    cr = fallback.get(id(topology.terminals[other]))
+                    if cr is not None:
+                        connected.append((other, 0, [(path.from_phase.mask_index, path.to_phase.mask_index) for path in cr.nominal_phase_paths]))
+
+        self.connectivity[key] = connected
+        return connected
+
+    def _flow_out(self, t: int, phases: int):
+        """Flow the `phases` mask out of terminal `t` into the terminals connected to it, queueing those that change."""
+        status = self.status[t]
+        for other, cores, paths in self._connected(t, phases):
+            if paths is None:
+                added = self._merge(other, _phase_bits(status & cores))
+            else:
+                added = False
+                for from_core, to_core in paths:
+                    if self._add(other, self._phase(t, from_core), _IN, to_core):
+                        added = True
+            if added:
+                self.queue.append(other)
+
+    def _flow_through(self, t: int, other: int, cores: int) -> bool:
+        """Flow the phases on the `cores` mask of terminal `t` through its equipment to terminal `other`. Returns True if `other` changed."""
+        return self._merge(other, _phase_bits(self.status[t] & cores) << 1)
+
+    def _step(self, t: int):
+        e = self.topology.terminal_equipment[t]
+        if e < 0 or self.substation_breakers[e]:
+            return
+
+        open_phases = self.open_phases[e]
+        phases = cores = 0
+        for mask, core, open_mask in self.nominal_phases[t]:
+            if not open_phases & open_mask and self._direction(t, core) & _IN:
+                phases |= mask
+                cores |= 0xff << (8 * core)
+        if not phases:
+            return
+
+        offsets = self.topology.equipment_offsets
+        for other in range(offsets[e], offsets[e + 1]):
+            if other != t and self._flow_through(t, other, cores):
+                self._flow_out(other, phases)
+
+    def _drain(self):
+        queue = self.queue
+        while queue:
+            self._step(queue.popleft())
+
+    def _run_feeder_cbs(self, feeder_cbs: List[int]):
+        pending = list(feeder_cbs)
+        while True:
+            delayed = []
+            for e in list(pending):
+                if self._run_feeder_cb(e, delayed) == FeederProcessingStatus.COMPLETE:
+                    pending.remove(e)
+
+            for t, phases in delayed:
+                self._flow_out(t, phases)
+                self._drain()
+            if not delayed:
+                return
+
+    def _run_feeder_cb(self, e: int, delayed: List[Tuple[int, int]]) -> FeederProcessingStatus:
+        offsets = self.topology.equipment_offsets
+        terminals = range(offsets[e], offsets[e + 1])
+        if len(terminals) not in (1, 2):
+            logger.warning(f"Ignoring feeder CB {str(self.topology.equipment[e])} with {len(terminals)} terminals, expected 1 or 2 terminals")
+            return FeederProcessingStatus.COMPLETE
+        if len(terminals) == 1:
+            return FeederProcessingStatus.COMPLETE
+
+        open_phases = self.open_phases[e]
+        by_status = []
+        for t in terminals:
+            in_phases = none_phases = to_flow = 0
+            for mask, core, open_mask in self.nominal_phases[t]:
+                direction = self._direction(t, core)
+                if direction == _IN:
+                    in_phases |= mask
+                    if not open_phases & open_mask:
+                        to_flow |= mask
+                elif direction == _BOTH:
+                    in_phases |= mask
+                elif not direction:
+                    none_phases |= mask
+            by_status.append((t, in_phases, none_phases, to_flow))
+
+        processed = 0
+        for (t, in_phases, _, to_flow), (other, _, other_none_phases, _) in ((by_status[0], by_status[1]), (by_status[1], by_status[0])):
+            if not in_phases:
+                continue
+            processed |= in_phases
+            # Don't flow phases that have already been processed from the other side.
+            phases = to_flow & other_none_phases
+            if self._flow_through(t, other, self._cores(t, phases)):
+                delayed.append((other, phases))
+
+        nominal = self.phase_masks[terminals[0]] | self.phase_masks[terminals[1]]
+        if processed == nominal:
+            return FeederProcessingStatus.COMPLETE
+        elif processed:
+            return FeederProcessingStatus.PARTIAL
+        else:
+            return FeederProcessingStatus.NONE
+
+
+def _phase_set(phases: int) -> Set[SinglePhaseKind]:
+    return {phase for phase in SinglePhaseKind if phases & (1 << phase.id)}
@@ -40,7 +40,7 @@ class PhaseStep(object):
     def __ne__(self, other):
         if self is other:
             return False
-        return self.equipment is not other.conducting_equipment or self.phases != other.phases
+        return self.conducting_equipment is not other.conducting_equipment or self.phases != other.phases
 
     def __lt__(self, other):
         """
@@ -51,4 +51,5 @@ class PhaseStep(object):
         return len(self.phases) > len(other.phases)
 
     def __hash__(self):
-        return hash((self.conducting_equipment, self.phases))
+        # Equipment is compared by identity, so hash it by identity too rather than by its fields.
+        return hash((id(self.conducting_equipment), self.phases))
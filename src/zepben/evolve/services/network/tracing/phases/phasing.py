@@ -29,8 +29,9 @@ from zepben.evolve.services.network.tracing.traversals.queue import PriorityQueu
 from zepben.evolve.services.network.tracing.traversals.tracing import Traversal
 from zepben.evolve.services.network.tracing.phases.phase_status import PhaseStatus
 from zepben.evolve.services.network.tracing.traversals.branch_recursive_tracing import BranchRecursiveTraversal
+from zepben.evolve.services.network.tracing.traversals.tracker import BitsetTracker
 from zepben.evolve.services.network.tracing.util import normally_open, currently_open
-from typing import Set, Callable, List, Iterable, Optional
+from typing import Set, Callable, List, Iterable, Optional, Dict
 
 __all__ = ["FeederProcessingStatus", "SetPhases", "FeederCbTerminalPhasesByStatus", "DelayedFeederTrace",
            "set_phases_and_queue_next", "set_current_phases_and_queue_next", "set_normal_phases_and_queue_next"]
@@ -62,10 +63,12 @@ class SetPhases(object):
     def __init__(self):
         self.normal_traversal = BranchRecursiveTraversal(queue_next=set_normal_phases_and_queue_next,
                                                          process_queue=PriorityQueue(),
-                                                         branch_queue=PriorityQueue())
+                                                         branch_queue=PriorityQueue(),
+                                                         tracker=BitsetTracker())
         self.current_traversal = BranchRecursiveTraversal(queue_next=set_current_phases_and_queue_next,
                                                           process_queue=PriorityQueue(),
-                                                          branch_queue=PriorityQueue())
+                                                          branch_queue=PriorityQueue(),
+                                                          tracker=BitsetTracker())
 
     async def run(self, network: NetworkService):
         # terminals = await _apply_phases_from_feeder_cbs(network)
@@ -104,6 +107,22 @@ class SetPhases(object):
 
         await self.run_complete(ce.terminals, breakers)
 
+    async def run_switch(self, network: NetworkService, switch: ConductingEquipment, normal: bool = False) -> List[Terminal]:
+        """
+        Update the traced phases after the open state of `switch` has changed, without re-tracing the whole network. The phases of every terminal
+        fed through `switch` are removed and then flowed in again from the terminals around them, giving the same phases as running `run` again.
+        If the switch is part of a loop, the island of `network` containing the switch is re-traced from its sources instead.
+
+        `network` The network `switch` belongs to, which must have already been traced with `run`.
+        `switch` The switch, or other conducting equipment, whose open or in service state has changed.
+        `normal` True to update the normal phases after a change to the normal state, False to update the current phases.
+        Returns The terminals that were re-traced.
+        """
+        if normal:
+            return await _rerun_switch(network, switch, self.normal_traversal, normally_open, normal_phases, "normal_status")
+        else:
+            return await _rerun_switch(network, switch, self.current_traversal, currently_open, current_phases, "current_status")
+
 
 async def find_es_breaker_terminal(es):
     """
@@ -117,7 +136,7 @@ async def find_es_breaker_terminal(es):
     """
     out_terminals = set()
 
-    async def stop_on_sub_breaker(term, exc=None):
+    def stop_on_sub_breaker(term, exc=None):
         if out_terminals:  # stop as soon as we find a substation breaker.
             return True
         try:
@@ -223,12 +242,19 @@ async def run_set_phasing(start_terminals: List[Terminal],
     for terminal in start_terminals:
         await _run_terminal(terminal, traversal, phase_selector)
 
+    await _run_feeder_cbs(process_feeder_cbs, traversal, open_test, phase_selector)
+
+
+async def _run_feeder_cbs(process_feeder_cbs: Iterable[Breaker],
+                          traversal: BranchRecursiveTraversal,
+                          open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
+                          phase_selector: Callable[[Terminal, Optional[SinglePhaseKind]], PhaseStatus]):
     # We take a copy of the feeder CB's as we will modify the list while processing them.
     process_feeder_cbs = copy.copy(process_feeder_cbs)
     keep_processing = True
     while keep_processing:
         delayed_feeder_traces = []
-        for feeder_cb in process_feeder_cbs:
+        for feeder_cb in list(process_feeder_cbs):
             status = _run_feeder_breaker(feeder_cb, traversal, open_test, phase_selector, delayed_feeder_traces)
             if status == FeederProcessingStatus.COMPLETE:
                 process_feeder_cbs.remove(feeder_cb)
@@ -246,11 +272,160 @@ async def _run_terminal(start: Terminal, traversal: BranchRecursiveTraversal, ph
 async def _run_from_out_terminal(traversal: BranchRecursiveTraversal, out_terminal: Terminal, phases_to_flow: Set[SinglePhaseKind],
                                  phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus]):
     traversal.reset()
+    # The trace starts from the terminals queued below, not from where the last trace started.
+    traversal.start_item = None
     traversal.tracker.visit(out_terminal)
     _flow_out_to_connected_terminals_and_queue(traversal, out_terminal, phases_to_flow, phase_selector)
     await traversal.trace()
 
 
+async def _rerun_switch(network: NetworkService,
+                       switch: ConductingEquipment,
+                       traversal: BranchRecursiveTraversal,
+                       open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
+                       phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus],
+                       status_attr: str) -> List[Terminal]:
+    region = _fed_through(switch, phase_selector)
+    if not any(_has_loop(t, phase_selector) for t in region):
+        in_region = {id(t) for t in region}
+        first_seen = {}
+
+        def watched_phase_selector(terminal: Terminal, phase: SinglePhaseKind) -> PhaseStatus:
+            if id(terminal) not in in_region and id(terminal) not in first_seen:
+                first_seen[id(terminal)] = (terminal, getattr(terminal.traced_phases, status_attr))
+            return phase_selector(terminal, phase)
+
+        queue_next = traversal.queue_next
+        traversal.queue_next = lambda terminal, t, _: set_phases_and_queue_next(terminal, t, open_test, watched_phase_selector)
+        try:
+            await _reflow_region(switch, region, traversal, open_test, watched_phase_selector, status_attr)
+        finally:
+            traversal.queue_next = queue_next
+
+        # Phases only flow back into terminals that were already energised when the region is part of a loop, in which case the result depends
+        # on the order everything is traced in, so re-trace the whole island in the same order as a full run.
+        if not any(status and getattr(t.traced_phases, status_attr) != status for t, status in first_seen.values()):
+            return region + [t for t, status in first_seen.values() if not status and getattr(t.traced_phases, status_attr)]
+
+    return await _rerun_island(network, switch, traversal, open_test, phase_selector, status_attr)
+
+
+async def _reflow_region(switch: ConductingEquipment,
+                         region: List[Terminal],
+                         traversal: BranchRecursiveTraversal,
+                         open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
+                         phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus],
+                         status_attr: str):
+    in_region = {id(t) for t in region}
+    for terminal in region:
+        setattr(terminal.traced_phases, status_attr, 0)
+
+    sources = []
+    boundary_out_terminals = {}
+    boundary_through_flows = []
+    for terminal in region:
+        ce = terminal.conducting_equipment
+        if isinstance(ce, EnergySource) and ce.num_phases() > 0:
+            for phase in terminal.phases.single_phases:
+                phase_selector(terminal, phase).add(phase, PhaseDirection.OUT)
+            sources.append(terminal)
+        if ce is not None:
+            boundary_through_flows.extend((other, terminal) for other in ce.terminals if id(other) not in in_region)
+        if terminal.connectivity_node is not None:
+            boundary_out_terminals.update((id(other), other) for other in terminal.connectivity_node.terminals if id(other) not in in_region)
+
+    for terminal in sources:
+        await _run_terminal(terminal, traversal, phase_selector)
+    for terminal in boundary_out_terminals.values():
+        await _run_terminal(terminal, traversal, phase_selector)
+    for in_terminal, out_terminal in boundary_through_flows + [(i, o) for i in switch.terminals for o in switch.terminals if i is not o]:
+        phases_to_flow = _get_phases_to_flow(in_terminal, open_test, phase_selector)
+        if _flow_through_equipment(traversal, in_terminal, out_terminal, phases_to_flow, phase_selector):
+            await _run_from_out_terminal(traversal, out_terminal, phases_to_flow, phase_selector)
+
+    feeder_cbs = {id(t.conducting_equipment): t.conducting_equipment for t in region if isinstance(t.conducting_equipment, Breaker)}
+    await _run_feeder_cbs([br for br in feeder_cbs.values() if br.is_substation_breaker()], traversal, open_test, phase_selector)
+
+
+async def _rerun_island(network: NetworkService,
+                        switch: ConductingEquipment,
+                        traversal: BranchRecursiveTraversal,
+                        open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
+                        phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus],
+                        status_attr: str) -> List[Terminal]:
+    island = _island(switch, open_test)
+    terminals = [t for ce in island.values() for t in ce.terminals]
+    for terminal in terminals:
+        setattr(terminal.traced_phases, status_attr, 0)
+
+    start_terminals = []
+    for es in network.objects(EnergySource):
+        if id(es) in island and es.num_phases() > 0:
+            for terminal in es.terminals:
+                for phase in terminal.phases.single_phases:
+                    phase_selector(terminal, phase).add(phase, PhaseDirection.OUT)
+                start_terminals.append(terminal)
+
+    feeder_cbs = [br for br in network.objects(Breaker) if id(br) in island and br.is_substation_breaker()]
+    await run_set_phasing(start_terminals, feeder_cbs, traversal, open_test, phase_selector)
+    return terminals
+
+
+def _fed_through(switch: ConductingEquipment, phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus]) -> List[Terminal]:
+    """
+    Find the terminals whose phases may have been flowed through `switch`, by following the traced directions out of `switch`. Phases flow through
+    conducting equipment from a terminal with an IN direction to its other terminals with an OUT direction, and through a connectivity node from a
+    terminal with an OUT direction to the other terminals with an IN direction.
+    """
+    def has_direction(terminal: Terminal, direction: PhaseDirection) -> bool:
+        return any(phase_selector(terminal, phase).direction().has(direction) for phase in terminal.phases.single_phases)
+
+    region = {}
+    to_process = [t for t in switch.terminals if has_direction(t, PhaseDirection.OUT)]
+    while to_process:
+        terminal = to_process.pop()
+        if id(terminal) in region:
+            continue
+        region[id(terminal)] = terminal
+
+        if terminal.conducting_equipment is not None and has_direction(terminal, PhaseDirection.IN):
+            to_process.extend(t for t in terminal.conducting_equipment.terminals if t is not terminal and has_direction(t, PhaseDirection.OUT))
+        if terminal.connectivity_node is not None and has_direction(terminal, PhaseDirection.OUT):
+            to_process.extend(t for t in terminal.connectivity_node.terminals if t is not terminal and has_direction(t, PhaseDirection.IN))
+    return list(region.values())
+
+
+def _has_loop(terminal: Terminal, phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus]) -> bool:
+    return any(phase_selector(terminal, phase).direction() == PhaseDirection.BOTH for phase in terminal.phases.single_phases)
+
+
+def _island(switch: ConductingEquipment, open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool]) -> Dict[int, ConductingEquipment]:
+    """
+    Find the equipment connected to `switch`, stopping at equipment that is open on all of its phases. `switch` itself is always traced through.
+    Returns The equipment found, keyed by `id`.
+    """
+    island = {id(switch): switch}
+    to_process = [switch]
+    while to_process:
+        ce = to_process.pop()
+        if ce is not switch and _fully_open(ce, open_test):
+            continue
+        for terminal in ce.terminals:
+            if terminal.connectivity_node is None:
+                continue
+            for other in terminal.connectivity_node.terminals:
+                other_ce = other.conducting_equipment
+                if other_ce is not None and id(other_ce) not in island:
+                    island[id(other_ce)] = other_ce
+                    to_process.append(other_ce)
+    return island
+
+
+def _fully_open(ce: ConductingEquipment, open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool]) -> bool:
+    phases = {phase for terminal in ce.terminals for phase in terminal.phases.single_phases}
+    return bool(phases) and all(open_test(ce, phase) for phase in phases)
+
+
 def _flow_out_to_connected_terminals_and_queue(traversal: BranchRecursiveTraversal, out_terminal: Terminal, phases_to_flow: Set[SinglePhaseKind],
                                                phase_selector: Callable[[Terminal, SinglePhaseKind], PhaseStatus]):
     connectivity_results = get_connectivity(out_terminal, phases_to_flow)
@@ -355,7 +530,7 @@ def _flow_through_feeder_cb_and_queue(in_terminal: FeederCbTerminalPhasesByStatu
 
             # Remove any phases that have already been processed from the other side
             if phase not in out_terminal.none_phases:
-                phases_to_flow.remove(phase)
+                phases_to_flow.discard(phase)
 
     if _flow_through_equipment(traversal, in_terminal.terminal, out_terminal.terminal, phases_to_flow, phase_selector):
         delayed_traces.append(DelayedFeederTrace(out_terminal.terminal, phases_to_flow))
@@ -27,8 +27,7 @@ def conducting_equipment_queue_next(conducting_equipment: Optional[ConductingEqu
         exclude = []
 
     if conducting_equipment:
-        crs = get_connected_equipment(conducting_equipment, exclude)
-        return [cr.to_equip for cr in crs if cr.to_equip and cr.to_equip not in exclude]
+        return [ce for ce in get_connected_equipment(conducting_equipment, exclude) if ce and ce not in exclude]
     return []
 
 
@@ -0,0 +1,191 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from array import array
+from heapq import heappush, heappop
+from math import hypot, inf
+from typing import Callable, List, Optional, Dict, Iterable, Tuple, Set
+
+from dataclassy import dataclass
+
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.wires.aclinesegment import Conductor, AcLineSegment
+from zepben.evolve.services.network.tracing.compiled_topology import CompiledTopology
+
+__all__ = ["ElectricalPath", "length_weight", "impedance_weight", "shortest_path", "shortest_paths"]
+
+
+@dataclass(slots=True)
+class ElectricalPath(object):
+    """A path between two pieces of equipment found by `shortest_path` or `shortest_paths`."""
+
+    equipment: List[ConductingEquipment]
+    """The equipment on the path, in order, starting with the equipment the path is from and ending with the equipment it is to."""
+
+    cost: float
+    """The total weight of the equipment on the path."""
+
+
+def length_weight(ce: ConductingEquipment) -> float:
+    """Weight `Conductor`s by their length, and all other equipment as 0."""
+    return (ce.length or 0.0) if isinstance(ce, Conductor) else 0.0
+
+
+def impedance_weight(ce: ConductingEquipment) -> float:
+    """
+    Weight `AcLineSegment`s by the magnitude of their positive sequence series impedance, worked out from their length and
+    `AcLineSegment.per_length_sequence_impedance`, and all other equipment as 0.
+    """
+    if not isinstance(ce, AcLineSegment) or ce.per_length_sequence_impedance is None:
+        return 0.0
+    plsi = ce.per_length_sequence_impedance
+    return (ce.length or 0.0) * hypot(plsi.r or 0.0, plsi.x or 0.0)
+
+
+def shortest_path(topology: CompiledTopology,
+                  from_: ConductingEquipment,
+                  to: ConductingEquipment,
+                  weight: Callable[[ConductingEquipment], float] = length_weight,
+                  normal: bool = True) -> Optional[ElectricalPath]:
+    """
+    Find the path between two pieces of equipment with the lowest total weight. See `shortest_paths`.
+
+    `topology` A `CompiledTopology` of the network `from_` and `to` belong to.
+    `from_` The equipment to find the path from.
+    `to` The equipment to find the path to.
+    `weight` The weight of each piece of equipment, such as `length_weight` or `impedance_weight`.
+    `normal` True to find paths through the normal state of the network, False to use the current state.
+    Returns The path with the lowest total weight, or None if `to` can't be reached from `from_`.
+    """
+    return shortest_paths(topology, [from_], [to], weight, normal)[0][0]
+
+
+def shortest_paths(topology: CompiledTopology,
+                   froms: Iterable[ConductingEquipment],
+                   tos: Iterable[ConductingEquipment],
+                   weight: Callable[[ConductingEquipment], float] = length_weight,
+                   normal: bool = True) -> List[List[Optional[ElectricalPath]]]:
+    """
+    Find the path with the lowest total weight from each of `froms` to each of `tos`, with a single search out from each distinct piece of
+    equipment in `froms` that stops once all of `tos` have been reached.
+
+    Paths step from each piece of equipment out through its terminals to the other terminals on their connectivity nodes that share a phase with
+    them. Equipment that is open on all of its phases, or is not in service, in the state being searched can be at either end of a path, but
+    paths do not pass through it. Phases are not followed along the path, so a path may pass through equipment that is only closed on some phases.
+
+    The weight of a path is the sum of `weight` of every piece of equipment on it, including both ends. `weight` is only called for equipment that
+    is reached, and only once for each piece of equipment.
+
+    `topology` A `CompiledTopology` of the network the equipment belongs to. Open states are read from the topology, so call
+               `CompiledTopology.refresh_open_states` on a reused topology after operating switches.
+    `froms` The equipment to find paths from.
+    `tos` The equipment to find paths to.
+    `weight` The weight of each piece of equipment, such as `length_weight` or `impedance_weight`.
+    `normal` True to find paths through the normal state of the network, False to use the current state.
+    Returns The paths, where the path from `froms[i]` to `tos[j]` is at `[i][j]`, or None where there is no path.
+    Raises `ValueError` if `weight` gives a negative weight.
+    """
+    froms = [topology.equipment_index(ce) for ce in froms]
+    tos = [topology.equipment_index(ce) for ce in tos]
+    open_phases = topology.normally_open_phases if normal else topology.currently_open_phases
+
+    weights: List[Optional[float]] = [None] * len(topology.equipment)
+
+    def weight_of(e: int) -> float:
+        w = weights[e]
+        if w is None:
+            w = weights[e] = weight(topology.equipment[e])
+            if w < 0:
+                raise ValueError(f"Equipment {topology.equipment[e]} has a negative weight of {w}, which shortest paths do not support.")
+        return w
+
+    searches: Dict[int, Tuple[List[float], array]] = dict()
+    paths = []
+    for from_ in froms:
+        if from_ not in searches:
+            searches[from_] = _search(topology, from_, set(tos), open_phases, weights, weight_of)
+        cost, parent = searches[from_]
+        paths.append([_path(topology, to, cost, parent) for to in tos])
+    return paths
+
+
+def _search(topology: CompiledTopology,
+            start: int,
+            targets: Set[int],
+            open_phases: bytearray,
+            weights: List[Optional[float]],
+            weight_of: Callable[[int], float]) -> Tuple[List[float], array]:
+    """
+    Dijkstra's algorithm over the equipment of `topology` from `start`, stopping once every one of `targets` has been settled. `weights` holds the
+    weights already worked out by `weight_of`, which is only called for the rest.
+    Returns The cost of each piece of equipment, which is only final for equipment that was settled, and the equipment before each piece of
+    equipment that was reached.
+    """
+    equipment_offsets = topology.equipment_offsets
+    terminal_equipment = topology.terminal_equipment
+    terminal_node = topology.terminal_node
+    terminal_phases = topology.terminal_phases
+    node_offsets = topology.node_offsets
+    node_terminals = topology.node_terminals
+
+    cost = [inf] * len(topology.equipment)
+    parent = array("i", [-1]) * len(topology.equipment)
+    settled = bytearray(len(topology.equipment))
+    cost[start] = weight_of(start)
+    remaining = len(targets)
+    heap = [(cost[start], start)]
+    while heap and remaining:
+        c, e = heappop(heap)
+        if settled[e]:
+            continue
+        settled[e] = 1
+        if e in targets:
+            remaining -= 1
+        if e != start and open_phases[e] and not _closed_phases(topology, e, open_phases[e]):
+            continue
+
+        for t in range(equipment_offsets[e], equipment_offsets[e + 1]):
+            n = terminal_node[t]
+            phases = terminal_phases[t]
+            if n < 0 or not phases:
+                continue
+            for i in range(node_offsets[n], node_offsets[n + 1]):
+                other = node_terminals[i]
+                to = terminal_equipment[other]
+                if other == t or to < 0 or settled[to] or not phases & terminal_phases[other]:
+                    continue
+                w = weights[to]
+                to_cost = c + (w if w is not None else weight_of(to))
+                if to_cost < cost[to]:
+                    cost[to] = to_cost
+                    parent[to] = e
+                    heappush(heap, (to_cost, to))
+
+    # Equipment that was reached but not settled may not have its lowest cost, so is treated as not reached.
+    for e, is_settled in enumerate(settled):
+        if not is_settled:
+            cost[e] = inf
+    return cost, parent
+
+
+def _closed_phases(topology: CompiledTopology, e: int, open_phases: int) -> int:
+    closed = 0
+    for t in range(topology.equipment_offsets[e], topology.equipment_offsets[e + 1]):
+        closed |= topology.terminal_phases[t]
+    return closed & ~open_phases
+
+
+def _path(topology: CompiledTopology, to: int, cost: List[float], parent: array) -> Optional[ElectricalPath]:
+    if cost[to] == inf:
+        return None
+    path = []
+    e = to
+    while e >= 0:
+        path.append(topology.equipment[e])
+        e = parent[e]
+    path.reverse()
+    return ElectricalPath(path, cost[to])
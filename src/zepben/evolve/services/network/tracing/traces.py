@@ -16,21 +16,23 @@ from zepben.evolve.services.network.tracing.connectivity import get_connectivity
 from zepben.evolve.services.network.tracing.queuing_functions import conducting_equipment_queue_next
 from zepben.evolve.services.network.tracing.util import currently_open, normally_open
 from zepben.evolve.services.network.tracing.traversals.tracing import Traversal
+from zepben.evolve.services.network.tracing.traversals.tracker import BaseTracker, Tracker, BitsetTracker
 from zepben.evolve.services.network.tracing.traversals.queue import depth_first, Queue, PriorityQueue
 
 __all__ = ["normal_downstream_trace", "create_basic_depth_trace", "connected_equipment_trace", "current_downstream_trace",
-           "assign_equipment_containers_to_feeders"]
+           "normal_upstream_trace", "current_upstream_trace", "assign_equipment_containers_to_feeders"]
 
 
 T = TypeVar("T")
 
 
 def connected_equipment_trace():
-    return create_basic_depth_trace(conducting_equipment_queue_next)
+    # Equipment is tracked with a `BitsetTracker` rather than hashed, as hashing model objects is slow.
+    return create_basic_depth_trace(conducting_equipment_queue_next, BitsetTracker())
 
 
-def create_basic_depth_trace(queue_next: Callable[[T, Set[T]], Iterable[T]]):
-    return Traversal(queue_next, depth_first())
+def create_basic_depth_trace(queue_next: Callable[[T, Set[T]], Iterable[T]], tracker: BaseTracker = None):
+    return Traversal(queue_next, depth_first(), tracker=tracker if tracker is not None else Tracker())
 
 
 def current_downstream_trace(queue: Queue = None, **kwargs):
@@ -40,6 +42,8 @@ def current_downstream_trace(queue: Queue = None, **kwargs):
     `kwargs` Args to be passed to `zepben.evolve.Traversal`
     Returns A `zepben.evolve.traversals.Traversal`
     """
+    if queue is None:
+        queue = PriorityQueue()
     return Traversal(queue_next=_create_downstream_queue_next(currently_open, current_phases), process_queue=queue, **kwargs)
 
 
@@ -55,17 +59,15 @@ def _create_downstream_queue_next(open_test: Callable[[ConductingEquipment, Opti
         connected_terms = []
         if not phase_step:
             return connected_terms
-        out_phases = set()
         for term in phase_step.conducting_equipment.terminals:
+            out_phases = set()
             _get_phases_with_direction(open_test, active_phases, term, phase_step.phases, PhaseDirection.OUT, out_phases)
 
             if out_phases:
                 crs = get_connectivity(term, out_phases)
                 for cr in crs:
                     if cr.to_equip is not None:
-                        if cr.to_equip in visited:
-                            continue
-                        connected_terms.append(PhaseStep(cr.to_equip, out_phases, cr.from_equip))
+                        connected_terms.append(PhaseStep(cr.to_equip, frozenset(cr.to_nominal_phases), cr.from_equip))
         return connected_terms
     return qn
 
@@ -83,6 +85,65 @@ def normal_downstream_trace(queue: Queue = None, **kwargs):
     return Traversal(queue_next=_create_downstream_queue_next(normally_open, normal_phases), process_queue=queue, **kwargs)
 
 
+def normal_upstream_trace(queue: Queue = None, **kwargs):
+    """
+    Create an upstream trace over nominal phases, which steps from each piece of equipment to the equipment feeding it, following the phases
+    flowing in to its terminals back to the connected terminals they flow out of.
+
+    `queue` Queue to use for this trace. Defaults to a `zepben.evolve.traversals.queue.PriorityQueue`
+    `kwargs` Args to be passed to `zepben.evolve.Traversal`
+    Returns A `zepben.evolve.traversals.Traversal`
+    """
+    if queue is None:
+        queue = PriorityQueue()
+    return Traversal(queue_next=_create_upstream_queue_next(normally_open, normal_phases), process_queue=queue, **kwargs)
+
+
+def current_upstream_trace(queue: Queue = None, **kwargs):
+    """
+    Create an upstream trace over current phases. See `normal_upstream_trace`.
+
+    `queue` Queue to use for this trace. Defaults to a `zepben.evolve.traversals.queue.PriorityQueue`
+    `kwargs` Args to be passed to `zepben.evolve.Traversal`
+    Returns A `zepben.evolve.traversals.Traversal`
+    """
+    if queue is None:
+        queue = PriorityQueue()
+    return Traversal(queue_next=_create_upstream_queue_next(currently_open, current_phases), process_queue=queue, **kwargs)
+
+
+def _create_upstream_queue_next(open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
+                                active_phases: Callable[[Terminal, SinglePhaseKind], PhaseStatus]):
+    """
+    Creates a queue_next function that steps upstream, against the direction of the phases traced with `active_phases`.
+    `open_test` Function that takes a ConductingEquipment and a phase and returns whether the phase on the equipment is open (True) or closed (False).
+                Phases are only followed back to equipment that is closed on them.
+    `active_phases` A `zepben.evolve.phase_status.PhaseStatus`
+    Returns A queue_next function for use with `zepben.evolve.BaseTraversal` classes
+    """
+    def never_open(_ce, _phase):
+        return False
+
+    def qn(phase_step, visited):
+        connected_terms = []
+        if not phase_step:
+            return connected_terms
+        for term in phase_step.conducting_equipment.terminals:
+            in_phases = set()
+            _get_phases_with_direction(never_open, active_phases, term, phase_step.phases, PhaseDirection.IN, in_phases)
+
+            if in_phases:
+                for cr in get_connectivity(term, in_phases):
+                    if cr.to_equip is not None:
+                        up_phases = frozenset(npp.to_phase for npp in cr.nominal_phase_paths
+                                              if not open_test(cr.to_equip, npp.to_phase)
+                                              and active_phases(cr.to_terminal, npp.to_phase).direction().has(PhaseDirection.OUT))
+                        if up_phases:
+                            connected_terms.append(PhaseStep(cr.to_equip, up_phases, cr.from_equip))
+        return connected_terms
+    return qn
+
+
 def _get_phases_with_direction(open_test: Callable[[ConductingEquipment, Optional[SinglePhaseKind]], bool],
                                active_phases: Callable[[Terminal, SinglePhaseKind], PhaseStatus],
                                terminal: Terminal,
@@ -4,6 +4,8 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+from inspect import isawaitable
+
 from zepben.evolve.services.network.tracing.traversals.queue import Queue
 from zepben.evolve.services.network.tracing.traversals.tracing import BaseTraversal
 from zepben.evolve.services.network.tracing.traversals.tracker import Tracker
@@ -35,6 +37,9 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
     on_branch_start: Optional[Callable[[T], None]] = None
     """A function to call at the start of each branches processing"""
 
+    _parent_visits_merged: bool = False
+    """Whether the items visited by the parents of this branch have been merged into its tracker."""
+
     def __lt__(self, other):
         """
         This Traversal is Less than `other` if the starting item is less than other's starting item.
@@ -56,6 +61,9 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
         `item` The item to check
         Returns True if the item has been visited once.
         """
+        if self._parent_visits_merged:
+            return self.tracker.has_visited(item)
+
         parent = self.parent
         while parent is not None:
             if parent.tracker.has_visited(item):
@@ -70,6 +78,9 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
         `item` Item to visit
         Returns True if we visit the item. False if this traversal or any parent has previously visited this item.
         """
+        if self._parent_visits_merged:
+            return self.tracker.visit(item)
+
         parent = self.parent
         while parent is not None:
             if parent.tracker.has_visited(item):
@@ -95,6 +106,7 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
         self.process_queue.queue.clear()
         self.branch_queue.queue.clear()
         self.tracker.clear()
+        self._parent_visits_merged = False
 
     def create_branch(self):
         """
@@ -115,10 +127,12 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
 
     async def _run_trace(self, can_stop_on_start_item: bool = True):
         """
-        Run's the trace. Stop conditions and step_actions are called with await, so you can utilise asyncio when performing a trace if your step actions or
-        conditions are IO intensive. Stop conditions and step actions will always be called for each item in the order provided.
+        Run's the trace. Stop conditions and step_actions that are coroutine functions are called with await, so you can utilise asyncio when performing a
+        trace if your step actions or conditions are IO intensive. Stop conditions and step actions will always be called for each item in the order provided.
         `can_stop_on_start_item` Whether the trace can stop on the start_item. Actions will still be applied to the start_item.
         """
+        self._merge_parent_visits()
+
         # Unroll first iteration of loop to handle can_stop_on_start_item = True
         if self.start_item is None:
             try:
@@ -128,20 +142,52 @@ class BranchRecursiveTraversal(BaseTraversal[T]):
                 await self.traverse_branches()
                 return
 
+        process_queue = self.process_queue
+        queue_next = self.queue_next
+        # Callbacks are only awaited when they return an awaitable, so plain functions don't pay for a coroutine on every step.
+        matches_stop_condition = self._matches_stop_condition_sync
+        apply_step_actions = self._apply_step_actions_sync
+
         self.tracker.visit(self.start_item)
         # If we can't stop on the start item we don't run any stop conditions. if this causes a problem for you,
         # work around it by running the stop conditions for the start item prior to running the trace.
-        stopping = can_stop_on_start_item and await self.matches_stop_condition(self.start_item)
-        await self.apply_step_actions(self.start_item, stopping)
+        stopping = can_stop_on_start_item and matches_stop_condition(self.start_item)
+        if isawaitable(stopping):
+            stopping = await stopping
+        pending = apply_step_actions(self.start_item, stopping)
+        if pending is not None:
+            await pending
         if not stopping:
-            self.queue_next(self.start_item, self, self.tracker.visited)
+            queue_next(self.start_item, self, self.tracker.visited)
 
-        while not self.process_queue.empty():
-            current = self.process_queue.get()
+        while not process_queue.empty():
+            current = process_queue.get()
             if self.visit(current):
-                stopping = await self.matches_stop_condition(current)
-                await self.apply_step_actions(current, stopping)
+                stopping = matches_stop_condition(current)
+                if stopping.__class__ is not bool and isawaitable(stopping):
+                    stopping = await stopping
+                pending = apply_step_actions(current, stopping)
+                if pending is not None:
+                    await pending
                 if not stopping:
-                    self.queue_next(current, self, self.tracker.visited)
+                    queue_next(current, self, self.tracker.visited)
 
         await self.traverse_branches()
+
+    def _merge_parent_visits(self):
+        """
+        Merge the items visited by the parents of this branch into its tracker, so visiting an item does not have to check every parent. Parents have
+        finished their own items by the time their branches are traced, so their trackers no longer change. If the tracker does not support
+        `zepben.evolve.traversals.tracker.BaseTracker.update`, the parents are checked on each visit instead.
+        """
+        parent = self.parent
+        if parent is None or self._parent_visits_merged:
+            return
+        if getattr(parent, "parent", None) is not None and not getattr(parent, "_parent_visits_merged", False):
+            return
+
+        try:
+            self.tracker.update(self.parent.tracker)
+        except NotImplementedError:
+            return
+        self._parent_visits_merged = True
@@ -150,8 +150,8 @@ class LifoQueue(Queue[T]):
 class PriorityQueue(Queue[T]):
     """Used for custom `Traversal`s"""
 
-    def __init__(self):
-        super().__init__([])
+    def __init__(self, queue=None):
+        super().__init__([] if queue is None else queue)
 
     def __len__(self):
         return len(self.queue)
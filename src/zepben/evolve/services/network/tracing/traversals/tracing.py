@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 from abc import abstractmethod
+from inspect import isawaitable
 
 from dataclassy import dataclass
 
@@ -13,7 +14,7 @@ from dataclassy import dataclass
 from zepben.evolve.services.network.tracing.traversals.queue import FifoQueue, LifoQueue, PriorityQueue, Queue
 from zepben.evolve.exceptions import TracingException
 from zepben.evolve.services.network.tracing.traversals.tracker import Tracker
-from typing import List, Callable, Awaitable, TypeVar, Generic, Set, Iterable
+from typing import List, Callable, Awaitable, TypeVar, Generic, Set, Iterable, Union, Optional
 from enum import Enum
 
 __all__ = ["SearchType", "create_queue", "BaseTraversal", "Traversal"]
@@ -39,7 +40,9 @@ def create_queue(search_type):
 class BaseTraversal(Generic[T]):
     """
     A basic traversal implementation that can be used to traverse any type of item.
-    This class is asyncio compatible. Stop condition and step action callbacks are called with await.
+    This class is asyncio compatible. Stop conditions and step actions may be either plain functions or coroutine functions, and any awaitable they
+    return is awaited. Callbacks that return plain values are called without awaiting on each step, which is considerably faster for callbacks that
+    do no IO.
 
     A stop condition is a callback function that must return a boolean indicating whether the Tracer should stop
     processing the current branch. Tracing will only stop when either:
@@ -56,10 +59,10 @@ class BaseTraversal(Generic[T]):
     start_item: T = None
     """The starting item for this `BaseTraversal`"""
 
-    stop_conditions: List[Callable[[T], Awaitable[bool]]] = []
+    stop_conditions: List[Callable[[T], Union[bool, Awaitable[bool]]]] = []
     """A list of callback functions, to be called in order with the current item."""
 
-    step_actions: List[Callable[[T, bool], Awaitable[None]]] = []
+    step_actions: List[Callable[[T, bool], Union[None, Awaitable[None]]]] = []
     """A list of callback functions, to be called on each item."""
 
     _has_run: bool = False
@@ -73,17 +76,41 @@ class BaseTraversal(Generic[T]):
         Checks all the stop conditions for the passed in item and returns true if any match.
         This calls all registered stop conditions even if one has already returned true to make sure everything is
         notified about this item.
-        Each stop condition will be awaited and thus must be an async function.
+        Stop conditions that are coroutine functions will be awaited.
 
         `item` The item to pass to the stop conditions.
         Returns True if any of the stop conditions return True.
         """
         stop = False
         for cond in self.stop_conditions:
-            stop = stop or await cond(item)
+            if not stop:
+                result = cond(item)
+                stop = (await result) if isawaitable(result) else result
         return stop
 
-    def add_stop_condition(self, cond: Callable[[T], Awaitable[bool]]):
+    def _matches_stop_condition_sync(self, item: T) -> Union[bool, Awaitable[bool]]:
+        """
+        The same as `matches_stop_condition` without a coroutine for each item.
+        Returns True if any of the stop conditions return True, or an awaitable of it once a stop condition returns an awaitable.
+        """
+        stop = False
+        for i, cond in enumerate(self.stop_conditions):
+            if not stop:
+                stop = cond(item)
+                # Booleans are checked for first, as `isawaitable` is slow for the values most stop conditions return.
+                if stop.__class__ is not bool and isawaitable(stop):
+                    return self._finish_stop_conditions(item, stop, i + 1)
+        return stop
+
+    async def _finish_stop_conditions(self, item: T, pending: Awaitable[bool], start: int) -> bool:
+        stop = await pending
+        for cond in self.stop_conditions[start:]:
+            if not stop:
+                result = cond(item)
+                stop = (await result) if isawaitable(result) else result
+        return stop
+
+    def add_stop_condition(self, cond: Callable[[T], Union[bool, Awaitable[bool]]]):
         """
         Add a callback to check whether the current item in the traversal is a stop point.
         If any of the registered stop conditions return true, the traversal will not call the callback to queue more items.
@@ -94,7 +121,7 @@ class BaseTraversal(Generic[T]):
         """
         self.stop_conditions.append(cond)
 
-    def add_step_action(self, action: Callable[[T, bool], Awaitable[None]]) -> BaseTraversal[T]:
+    def add_step_action(self, action: Callable[[T, bool], Union[None, Awaitable[None]]]) -> BaseTraversal[T]:
         """
         Add a callback which is called for every item in the traversal (including the starting item).
                                                                                                              
@@ -123,12 +150,32 @@ class BaseTraversal(Generic[T]):
     async def apply_step_actions(self, item: T, is_stopping: bool):
         """
         Calls all the step actions with the passed in item.
-        Each action will be awaited.
+        Actions that are coroutine functions will be awaited.
         `item` The item to pass to the step actions.
         `is_stopping` Indicates if the trace will stop on this step.
         """
         for action in self.step_actions:
-            await action(item, is_stopping)
+            result = action(item, is_stopping)
+            if isawaitable(result):
+                await result
+
+    def _apply_step_actions_sync(self, item: T, is_stopping: bool) -> Optional[Awaitable[None]]:
+        """
+        The same as `apply_step_actions` without a coroutine for each item.
+        Returns None, or an awaitable that applies the rest of the step actions once a step action returns an awaitable.
+        """
+        for i, action in enumerate(self.step_actions):
+            result = action(item, is_stopping)
+            if result is not None and isawaitable(result):
+                return self._finish_step_actions(item, is_stopping, result, i + 1)
+        return None
+
+    async def _finish_step_actions(self, item: T, is_stopping: bool, pending: Awaitable[None], start: int):
+        await pending
+        for action in self.step_actions[start:]:
+            result = action(item, is_stopping)
+            if isawaitable(result):
+                await result
 
     def _reset_run_flag(self):
         if self._running:
@@ -201,7 +248,7 @@ class Traversal(BaseTraversal):
 
     async def _run_trace(self, can_stop_on_start_item: bool = True):
         """
-        Run's the trace. Stop conditions and step_actions are called with await, so you can utilise asyncio when
+        Run's the trace. Stop conditions and step_actions that are coroutine functions are called with await, so you can utilise asyncio when
         performing a trace if your step actions or conditions are IO intensive. Stop conditions and
         step actions will always be called for each item in the order provided.
         `can_stop_on_start_item` Whether the trace can stop on the start_item. Actions will still be applied to
@@ -213,23 +260,38 @@ class Traversal(BaseTraversal):
             except IndexError:
                 raise TracingException("Starting item wasn't specified and the process queue is empty. Cannot start the trace.")
 
-        self.tracker.visit(self.start_item)
+        tracker = self.tracker
+        process_queue = self.process_queue
+        queue_next = self.queue_next
+        # Callbacks are only awaited when they return an awaitable, so plain functions don't pay for a coroutine on every step.
+        matches_stop_condition = self._matches_stop_condition_sync
+        apply_step_actions = self._apply_step_actions_sync
+
+        tracker.visit(self.start_item)
         # If we can't stop on the start item we don't run any stop conditions. if this causes a problem for you,
         # you should run the stop conditions for the start item prior to running the traversal.
-        stopping = can_stop_on_start_item and await self.matches_stop_condition(self.start_item)
-        await self.apply_step_actions(self.start_item, stopping)
+        stopping = can_stop_on_start_item and matches_stop_condition(self.start_item)
+        if isawaitable(stopping):
+            stopping = await stopping
+        pending = apply_step_actions(self.start_item, stopping)
+        if pending is not None:
+            await pending
         if not stopping:
-            for x in self.queue_next(self.start_item, self.tracker.visited):
-                self.process_queue.put(x)
-
-        while not self.process_queue.empty():
-            current = self.process_queue.get()
-            if self.tracker.visit(current):
-                stopping = await self.matches_stop_condition(current)
-                await self.apply_step_actions(current, stopping)
+            for x in queue_next(self.start_item, tracker.visited):
+                process_queue.put(x)
+
+        while not process_queue.empty():
+            current = process_queue.get()
+            if tracker.visit(current):
+                stopping = matches_stop_condition(current)
+                if stopping.__class__ is not bool and isawaitable(stopping):
+                    stopping = await stopping
+                pending = apply_step_actions(current, stopping)
+                if pending is not None:
+                    await pending
                 if not stopping:
-                    for x in self.queue_next(current, self.tracker.visited):
-                        self.process_queue.put(x)
+                    for x in queue_next(current, tracker.visited):
+                        process_queue.put(x)
 
     def reset(self):
         self._reset_run_flag()
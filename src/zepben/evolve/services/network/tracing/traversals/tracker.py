@@ -4,11 +4,13 @@
 #  License, v. 2.0. If a copy of the MPL was not distributed with this
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+from __future__ import annotations
+
 from abc import abstractmethod
 
-__all__ = ["BaseTracker", "Tracker"]
+__all__ = ["BaseTracker", "Tracker", "DenseIds", "BitsetTracker"]
 
-from typing import Set
+from typing import Set, Dict, Callable, Any, List
 
 from dataclassy import dataclass
 
@@ -48,6 +50,13 @@ class BaseTracker(object):
         """
         raise NotImplementedError()
 
+    def update(self, other):
+        """
+        Visit every item visited by `other`. Trackers that do not support this raise `NotImplementedError`.
+        `other` A tracker of the same type as this tracker.
+        """
+        raise NotImplementedError()
+
 
 class Tracker(BaseTracker):
     """
@@ -81,5 +90,122 @@ class Tracker(BaseTracker):
         """
         self.visited.clear()
 
+    def update(self, other: Tracker):
+        """
+        Visit every item visited by `other`.
+        `other` A tracker of the same type as this tracker.
+        """
+        self.visited.update(other.visited)
+
     def copy(self):
-        return Tracker(visited=self.visited.copy())
+        return type(self)(visited=self.visited.copy())
+
+
+class DenseIds(object):
+    """
+    Assigns dense integer ids, starting from 0, to objects such as terminals and equipment in the order they are first seen. Objects are identified
+    by identity rather than by mRID or equality, so separate objects sharing an mRID, such as the same terminal in two services, get separate ids.
+    The objects are held until the `DenseIds` is discarded, so their identities are not reused by other objects.
+    """
+
+    def __init__(self):
+        self._ids: Dict[int, int] = dict()
+        self._objects: List[Any] = []
+
+    def __call__(self, obj) -> int:
+        """
+        `obj` The object to get the id of.
+        Returns The id of `obj`, assigning the next id if it has not been seen before.
+        """
+        ids = self._ids
+        i = ids.get(id(obj))
+        if i is None:
+            i = ids[id(obj)] = len(self._objects)
+            self._objects.append(obj)
+        return i
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class BitsetTracker(BaseTracker):
+    """
+    A tracker that stores visited items as bits in a `bytearray`, indexed by a dense integer id for each item. Clearing and copying the tracker only
+    touches one bit per possible item, rather than holding a reference to every visited item.
+
+    By default items are given ids by identity with a `DenseIds`, so values that are equal but separate objects, such as large integers, are tracked
+    separately. Pass a `key` to track other items. Copies share the id function, so the same item has the same id in every copy.
+    """
+
+    key: Callable[[Any], int] = None
+    """A function returning a dense, non-negative integer id for each item. Defaults to a new `DenseIds`."""
+
+    _bits: bytearray = bytearray()
+
+    def __init__(self):
+        if self.key is None:
+            self.key = DenseIds()
+
+    @property
+    def visited(self) -> BitsetTracker:
+        """
+        The visited items, for passing to queue functions that check whether items have been visited with `in`. This is the tracker itself.
+        """
+        return self
+
+    def __contains__(self, item) -> bool:
+        return self.has_visited(item)
+
+    def __len__(self):
+        return sum(bin(b).count("1") for b in self._bits)
+
+    def has_visited(self, item) -> bool:
+        """
+        Check if the tracker has already seen an item.
+        `item` The item to check if it has been visited.
+        Returns true if the item has been visited, otherwise false.
+        """
+        i = self.key(item)
+        byte = i >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (i & 7)))
+
+    def visit(self, item) -> bool:
+        """
+        Visit an item. Item will not be visited if it has previously been visited.
+        `item` The item to visit.
+        Returns True if visit succeeds. False otherwise.
+        """
+        i = self.key(item)
+        byte = i >> 3
+        bit = 1 << (i & 7)
+        bits = self._bits
+        if byte >= len(bits):
+            bits.extend(bytes(max(byte + 1 - len(bits), len(bits))))
+        elif bits[byte] & bit:
+            return False
+        bits[byte] |= bit
+        return True
+
+    def clear(self):
+        """
+        Clear the tracker, removing all visited items.
+        """
+        self._bits = bytearray(len(self._bits))
+
+    def update(self, other: BitsetTracker):
+        """
+        Visit every item visited by `other`.
+        `other` A tracker sharing the `key` of this tracker, such as a copy of it.
+        Raises `ValueError` if `other` has a different `key`.
+        """
+        if other.key is not self.key:
+            raise ValueError("Can only update a BitsetTracker from a tracker with the same key.")
+
+        size = len(other._bits)
+        if size > len(self._bits):
+            self._bits.extend(bytes(size - len(self._bits)))
+        merged = int.from_bytes(self._bits[:size], "little") | int.from_bytes(other._bits, "little")
+        self._bits[:size] = merged.to_bytes(size, "little")
+
+    def copy(self) -> BitsetTracker:
+        return type(self)(key=self.key, _bits=bytearray(self._bits))
@@ -0,0 +1,192 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple, Set, Iterable
+
+from dataclassy import dataclass
+
+from zepben.evolve.model.cim.iec61970.base.core.conducting_equipment import ConductingEquipment
+from zepben.evolve.model.cim.iec61970.base.core.equipment_container import Feeder
+from zepben.evolve.model.cim.iec61970.base.core.terminal import Terminal
+from zepben.evolve.model.cim.iec61970.base.wires.switch import Breaker, Fuse, Recloser
+from zepben.evolve.services.network.network import NetworkService
+
+__all__ = ["UpstreamDeviceIndex", "build_upstream_device_index"]
+
+# The IN and OUT bits of every phase of every core of a `zepben.evolve.model.phases.TracedPhases` status.
+_IN_BITS = 0x55555555
+_OUT_BITS = 0xAAAAAAAA
+
+# The positions of each kind of device in the tuples of `UpstreamDeviceIndex._nearest`.
+_BREAKER, _FUSE, _RECLOSER, _FEEDER_HEAD, _PROTECTIVE = range(5)
+_NONE = (None,) * 5
+
+_Nearest = Tuple[Optional[ConductingEquipment], ...]
+
+
+@dataclass(slots=True)
+class UpstreamDeviceIndex(object):
+    """
+    The nearest `Breaker`, `Fuse`, `Recloser` and feeder head upstream of each piece of equipment in a network, read from its traced phases. Create
+    one with `build_upstream_device_index`, and keep it up to date after re-tracing phases with `refresh`.
+
+    Each piece of equipment is fed from the first piece of equipment found with phases flowing out of a terminal connected to a terminal of the
+    equipment with phases flowing in. The devices upstream of equipment are those found by following these feeds back towards the sources, which
+    is the same as following a `normal_upstream_trace` or `current_upstream_trace` on radial networks. Equipment is not upstream of itself.
+    """
+
+    normal: bool
+    """True if this indexes the normal state of the network, False for the current state."""
+
+    feeder_heads: Set[str]
+    """The mRIDs of the equipment at the head of each feeder."""
+
+    _feeds: Dict[str, Optional[ConductingEquipment]] = dict()
+    _fed: Dict[str, Dict[str, ConductingEquipment]] = dict()
+    _nearest: Dict[str, _Nearest] = dict()
+
+    def nearest_breaker(self, ce: ConductingEquipment) -> Optional[Breaker]:
+        """Get the nearest `Breaker` upstream of `ce`, or None if there isn't one."""
+        return self._nearest.get(ce.mrid, _NONE)[_BREAKER]
+
+    def nearest_fuse(self, ce: ConductingEquipment) -> Optional[Fuse]:
+        """Get the nearest `Fuse` upstream of `ce`, or None if there isn't one."""
+        return self._nearest.get(ce.mrid, _NONE)[_FUSE]
+
+    def nearest_recloser(self, ce: ConductingEquipment) -> Optional[Recloser]:
+        """Get the nearest `Recloser` upstream of `ce`, or None if there isn't one."""
+        return self._nearest.get(ce.mrid, _NONE)[_RECLOSER]
+
+    def nearest_feeder_head(self, ce: ConductingEquipment) -> Optional[ConductingEquipment]:
+        """Get the nearest equipment at the head of a feeder upstream of `ce`, or None if there isn't one."""
+        return self._nearest.get(ce.mrid, _NONE)[_FEEDER_HEAD]
+
+    def nearest_protective_device(self, ce: ConductingEquipment) -> Optional[ConductingEquipment]:
+        """
+        Get the nearest protective device, being a `Breaker`, `Fuse` or `Recloser`, upstream of `ce`.
+        Returns The closest of `nearest_breaker`, `nearest_fuse` and `nearest_recloser`, or None if there are none.
+        """
+        return self._nearest.get(ce.mrid, _NONE)[_PROTECTIVE]
+
+    def feeder_of(self, ce: ConductingEquipment) -> Optional[ConductingEquipment]:
+        """Get the equipment `ce` is fed from, or None for sources and equipment that is not energised."""
+        return self._feeds.get(ce.mrid)
+
+    def refresh(self, changed: Iterable[Terminal]):
+        """
+        Update the index after the phases of `changed` have been re-traced, such as with the terminals returned by
+        `zepben.evolve.services.network.tracing.phases.phasing.SetPhases.run_switch`. Only the equipment of the changed terminals, the equipment
+        connected to them, and the equipment fed through any of these are updated.
+
+        `changed` The terminals whose traced phases have changed.
+        """
+        equipment: Dict[str, ConductingEquipment] = dict()
+        for t in changed:
+            for other in (t, *(t.connectivity_node or ())):
+                if other.conducting_equipment is not None:
+                    equipment[other.conducting_equipment.mrid] = other.conducting_equipment
+
+        for ce in equipment.values():
+            self._set_feed(ce, _find_feed(ce, self._status_attr))
+
+        stale = list(equipment.values())
+        affected = dict()
+        while stale:
+            ce = stale.pop()
+            if ce.mrid not in affected:
+                affected[ce.mrid] = ce
+                self._nearest.pop(ce.mrid, None)
+                stale.extend(self._fed.get(ce.mrid, dict()).values())
+        for ce in affected.values():
+            self._update_nearest(ce)
+
+    @property
+    def _status_attr(self) -> str:
+        return "normal_status" if self.normal else "current_status"
+
+    def _set_feed(self, ce: ConductingEquipment, feed: Optional[ConductingEquipment]):
+        previous = self._feeds.get(ce.mrid)
+        if previous is feed:
+            return
+        if previous is not None:
+            fed = self._fed[previous.mrid]
+            del fed[ce.mrid]
+            if not fed:
+                del self._fed[previous.mrid]
+        if feed is None:
+            self._feeds.pop(ce.mrid, None)
+        else:
+            self._feeds[ce.mrid] = feed
+            self._fed.setdefault(feed.mrid, dict())[ce.mrid] = ce
+
+    def _update_nearest(self, ce: ConductingEquipment):
+        """Work out the nearest devices of `ce` and every piece of equipment between it and the nearest equipment that is already up to date."""
+        chain = []
+        on_chain = set()
+        current = ce
+        nearest = _NONE
+        while current is not None:
+            known = self._nearest.get(current.mrid)
+            if known is not None:
+                nearest = self._through(current, known)
+                break
+            if current.mrid in on_chain:
+                # Equipment fed around a loop of feeds, which only happens when phases flow both ways, is treated as having nothing upstream.
+                break
+            on_chain.add(current.mrid)
+            chain.append(current)
+            current = self._feeds.get(current.mrid)
+
+        for ce in reversed(chain):
+            self._nearest[ce.mrid] = nearest
+            nearest = self._through(ce, nearest)
+
+    def _through(self, ce: ConductingEquipment, nearest: _Nearest) -> _Nearest:
+        """The nearest devices upstream of equipment fed from `ce`, where `nearest` are the nearest devices upstream of `ce`."""
+        protective = isinstance(ce, (Breaker, Fuse, Recloser))
+        if not protective and ce.mrid not in self.feeder_heads:
+            return nearest
+        return (
+            ce if isinstance(ce, Breaker) else nearest[_BREAKER],
+            ce if isinstance(ce, Fuse) else nearest[_FUSE],
+            ce if isinstance(ce, Recloser) else nearest[_RECLOSER],
+            ce if ce.mrid in self.feeder_heads else nearest[_FEEDER_HEAD],
+            ce if protective else nearest[_PROTECTIVE],
+        )
+
+
+def build_upstream_device_index(network: NetworkService, normal: bool = True) -> UpstreamDeviceIndex:
+    """
+    Build an `UpstreamDeviceIndex` of `network` from its traced phases.
+
+    `network` The network to index, which must have already had its phases traced.
+    `normal` True to index the normal state of the network, False to index the current state.
+    Returns An `UpstreamDeviceIndex` of every piece of conducting equipment in `network`.
+    """
+    feeder_heads = {f.normal_head_terminal.conducting_equipment.mrid for f in network.objects(Feeder)
+                    if f.normal_head_terminal is not None and f.normal_head_terminal.conducting_equipment is not None}
+    index = UpstreamDeviceIndex(normal, feeder_heads)
+
+    status_attr = index._status_attr
+    equipment = list(network.objects(ConductingEquipment))
+    for ce in equipment:
+        index._set_feed(ce, _find_feed(ce, status_attr))
+    for ce in equipment:
+        index._update_nearest(ce)
+    return index
+
+
+def _find_feed(ce: ConductingEquipment, status_attr: str) -> Optional[ConductingEquipment]:
+    for t in ce.terminals:
+        cn = t.connectivity_node
+        if cn is None or not getattr(t.traced_phases, status_attr) & _IN_BITS:
+            continue
+        for other in cn.terminals:
+            feed = other.conducting_equipment
+            if other is not t and feed is not None and feed is not ce and getattr(other.traced_phases, status_attr) & _OUT_BITS:
+                return feed
+    return None
@@ -63,7 +63,7 @@ async def phase_log(cond_equip):
 async def _phase_log_trace(cond_equip):
     log_msg = []
 
-    async def log(e, exc):
+    def log(e, exc):
         equip_msgs = []
         for term in e.terminals:
             e_msg = f"{e.mrid}-T{term.sequence_number}:"
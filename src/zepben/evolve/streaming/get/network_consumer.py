@@ -134,11 +134,12 @@ class NetworkConsumerClient(CimConsumerClient):
         async def y():
             results = dict()
             failed = set()
-            async for io, mrid in self._process_identified_objects(service, mrids):
-                if io:
-                    results[io.mrid] = io
-                else:
-                    failed.add(mrid)
+            with service.bulk_load():
+                async for io, mrid in self._process_identified_objects(service, mrids):
+                    if io:
+                        results[io.mrid] = io
+                    else:
+                        failed.add(mrid)
             return MultiObjectResult(results, failed)
 
         return await self.try_rpc(y)
@@ -0,0 +1,220 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from __future__ import annotations
+
+from asyncio import Lock
+from collections import OrderedDict
+from typing import Dict, Set, Optional, Generator, List, Container
+from weakref import ReferenceType
+
+from dataclassy import dataclass, fields
+
+from zepben.evolve import NetworkService, Feeder, IdentifiedObject
+from zepben.evolve.streaming.get.hierarchy.data import NetworkHierarchy
+from zepben.evolve.streaming.get.network_consumer import NetworkConsumerClient
+
+__all__ = ["FeederPartitionedNetwork"]
+
+
+@dataclass(slots=True)
+class _Partition(object):
+    feeder: Feeder
+    mrids: Set[str]
+    """The objects loaded for the feeder, and the objects loaded for other feeders that they reference."""
+
+
+class FeederPartitionedNetwork(object):
+    """
+    A `NetworkService` that only holds the feeders that are being used, fetching each feeder with `NetworkConsumerClient.get_feeder` the first
+    time it is requested rather than retrieving the whole network up front.
+
+    All feeders are loaded into the one `service`, so objects on the boundary between feeders, such as their substation and the connectivity
+    nodes between them, are shared rather than duplicated. Each object is tracked against the feeders that loaded or reference it, and is only
+    removed when the last of them is evicted.
+
+    If `max_objects` is set, the least recently requested feeders are evicted once the service holds more objects than this after loading a
+    feeder. The feeder that was just requested is never evicted. Objects added to `service` directly are never evicted.
+    """
+
+    client: NetworkConsumerClient
+    service: NetworkService
+    max_objects: Optional[int]
+
+    def __init__(self, client: NetworkConsumerClient, service: NetworkService = None, max_objects: Optional[int] = None):
+        """
+        `client` The client used to fetch feeders and the network hierarchy.
+        `service` The service to load the feeders into. A new service is created if this is None.
+        `max_objects` The number of objects the service may hold before the least recently requested feeders are evicted, or None for no limit.
+        """
+        self.client = client
+        self.service = NetworkService() if service is None else service
+        self.max_objects = max_objects
+        self._partitions: Dict[str, _Partition] = OrderedDict()
+        self._users: Dict[str, Set[str]] = dict()
+        self._hierarchy: Optional[NetworkHierarchy] = None
+        self._load_lock: Optional[Lock] = None
+
+    async def get_network_hierarchy(self) -> NetworkHierarchy:
+        """
+        Returns The `NetworkHierarchy`, fetched on the first call.
+        Raises The exception from the client if the hierarchy could not be retrieved.
+        """
+        if self._hierarchy is None:
+            self._hierarchy = (await self.client.get_network_hierarchy()).throw_on_error().result
+        return self._hierarchy
+
+    async def get_feeder(self, mrid: str) -> Optional[Feeder]:
+        """
+        Get the feeder with `mrid`, loading its equipment, terminals, connectivity nodes, locations and assets into `service` if it is not
+        already loaded.
+        `mrid` The mRID of the feeder.
+        Returns The `Feeder`, or None if the server has no feeder with `mrid`.
+        Raises The exception from the client if the feeder could not be retrieved.
+        """
+        partition = self._partitions.get(mrid)
+        if partition is None:
+            if self._load_lock is None:
+                self._load_lock = Lock()
+            async with self._load_lock:
+                partition = self._partitions.get(mrid)
+                if partition is None:
+                    partition = await self._load(mrid)
+                    if partition is None:
+                        return None
+                    self._evict_over_budget(keep=mrid)
+
+        self._partitions.move_to_end(mrid)
+        return partition.feeder
+
+    def is_loaded(self, mrid: str) -> bool:
+        """
+        Returns True if the feeder with `mrid` is currently loaded, False otherwise.
+        """
+        return mrid in self._partitions
+
+    def loaded_feeders(self) -> Generator[Feeder, None, None]:
+        """
+        Generator for the loaded feeders, from the least to the most recently requested.
+        """
+        for partition in tuple(self._partitions.values()):
+            yield partition.feeder
+
+    def evict(self, mrid: str) -> bool:
+        """
+        Remove the feeder with `mrid` from `service`, along with every object that is not used by another loaded feeder. Objects of other feeders
+        that remain in `service` have their references to the removed objects cleared, both on the objects and in the scenarios forked from
+        `service`, and are reindexed in its secondary indexes.
+        `mrid` The mRID of the feeder.
+        Returns True if the feeder was loaded, False otherwise.
+        """
+        partition = self._partitions.pop(mrid, None)
+        if partition is None:
+            return False
+
+        removed = []
+        for obj_mrid in partition.mrids:
+            users = self._users.get(obj_mrid)
+            if users is None:
+                continue
+            users.discard(mrid)
+            if not users:
+                del self._users[obj_mrid]
+                io = self.service.get(obj_mrid, default=None)
+                if io is not None:
+                    removed.append(io)
+
+        removed_ids = {id(io) for io in removed}
+        survivors = {id(ref): ref for io in removed for ref in _references(io) if id(ref) not in removed_ids}
+        for survivor in survivors.values():
+            _clear_references(survivor, removed_ids)
+        for io in removed:
+            self.service.remove(io)
+        for survivor in survivors.values():
+            self.service.reindex(survivor)
+
+        for scenario in self.service.scenarios():
+            for obj, changes in scenario.changed_objects():
+                if id(obj) in removed_ids:
+                    scenario.discard_changes(obj)
+                else:
+                    for name, value in tuple(changes.items()):
+                        changes[name] = _without(value, removed_ids)
+
+        self.service.discard_unresolved_references(removed)
+        return True
+
+    async def _load(self, mrid: str) -> Optional[_Partition]:
+        result = (await self.client.get_feeder(self.service, mrid)).throw_on_error().result
+        if result is None:
+            return None
+
+        feeder = result.value[mrid]
+        mrids = set()
+        for io in result.value.values():
+            mrids.add(io.mrid)
+            for ref in _references(io):
+                if ref.mrid in self._users:
+                    mrids.add(ref.mrid)
+        for obj_mrid in mrids:
+            self._users.setdefault(obj_mrid, set()).add(mrid)
+
+        partition = self._partitions[mrid] = _Partition(feeder, mrids)
+        return partition
+
+    def _evict_over_budget(self, keep: str):
+        if self.max_objects is None:
+            return
+
+        for mrid in [mrid for mrid in self._partitions if mrid != keep]:
+            if self.service.len_of() <= self.max_objects:
+                return
+            self.evict(mrid)
+
+
+def _references(io: IdentifiedObject) -> Generator[IdentifiedObject, None, None]:
+    """
+    Generator for the objects `io` holds a direct reference to, including through its relationship collections and weak references.
+    """
+    for name in fields(type(io), True):
+        value = getattr(io, name)
+        if isinstance(value, ReferenceType):
+            value = value()
+        if isinstance(value, IdentifiedObject):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            yield from (v for v in value if isinstance(v, IdentifiedObject))
+        elif isinstance(value, dict):
+            yield from (v for v in value.values() if isinstance(v, IdentifiedObject))
+
+
+def _clear_references(io: IdentifiedObject, removed_ids: Container[int]):
+    """
+    Clear any reference `io` holds to an object with an id in `removed_ids`, without going through its methods so the other end of the
+    relationship is left untouched.
+    """
+    for name in fields(type(io), True):
+        value = getattr(io, name)
+        remaining = _without(value, removed_ids)
+        if remaining is not value:
+            setattr(io, name, remaining)
+
+
+def _without(value, removed_ids: Container[int]):
+    """
+    Returns `value` with any reference to an object with an id in `removed_ids` cleared, or `value` itself if it holds no such reference. Single
+    references are cleared to None, and relationship collections are copied without them.
+    """
+    if isinstance(value, (IdentifiedObject, ReferenceType)):
+        if id(value() if isinstance(value, ReferenceType) else value) in removed_ids:
+            return None
+    elif isinstance(value, (list, tuple)):
+        if any(id(v) in removed_ids for v in value):
+            remaining: List = [v for v in value if id(v) not in removed_ids]
+            return type(value)(remaining)
+    elif isinstance(value, dict):
+        if any(id(v) in removed_ids for v in value.values()):
+            return {k: v for k, v in value.items() if id(v) not in removed_ids}
+    return value
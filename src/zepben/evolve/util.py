@@ -8,7 +8,7 @@ from __future__ import annotations
 import re
 import os
 from collections.abc import Sized
-from typing import Set, List, Optional, Iterable, Callable, Any, TypeVar, Generator
+from typing import Set, List, Optional, Iterable, Callable, Any, TypeVar, Generator, Dict
 from uuid import UUID
 
 T = TypeVar('T')
@@ -33,13 +33,15 @@ def get_by_mrid(collection: Optional[Iterable[IdentifiedObject]], mrid: str) ->
     """
     Get an `zepben.evolve.cim.iec61970.base.core.identified_object.IdentifiedObject` from `collection` based on
     its mRID.
-    `collection` The collection to operate on
+    `collection` The collection to operate on. Collections keyed by mRID are looked up directly rather than searched.
     `mrid` The mRID of the `IdentifiedObject` to lookup in the collection
     Returns The `IdentifiedObject`
     Raises `KeyError` if `mrid` was not found in the collection.
     """
     if not collection:
         raise KeyError(mrid)
+    if isinstance(collection, dict):
+        return collection[mrid]
     for io in collection:
         if io.mrid == mrid:
             return io
@@ -69,6 +71,8 @@ def safe_remove(collection: Optional[List], obj: IdentifiedObject):
     Raises `ValueError` if `obj` is not in the collection.
     Returns The collection if successfully removed or None if after removal the collection was empty.
     """
+    if isinstance(collection, tuple):
+        collection = list(collection)
     if collection is not None:
         collection.remove(obj)
         if not collection:
@@ -78,6 +82,31 @@ def safe_remove(collection: Optional[List], obj: IdentifiedObject):
         raise ValueError(obj)
 
 
+def mutable_list(collection: Optional[Iterable[T]]) -> List[T]:
+    """
+    Get a collection as a list that can be modified in place. Collections may be tuples after being compacted by
+    `zepben.evolve.services.common.base_service.BaseService.compact`.
+    `collection` The collection to convert.
+    Returns `collection` if it is already a list, a new empty list if it is None, otherwise a new list of its items.
+    """
+    if collection is None:
+        return list()
+    return collection if isinstance(collection, list) else list(collection)
+
+
+def safe_remove_by_id(collection: Optional[Dict[str, IdentifiedObject]], obj: Optional[IdentifiedObject]) -> Optional[Dict[str, IdentifiedObject]]:
+    """
+    Remove an IdentifiedObject from a collection keyed by mRID safely.
+    Raises `ValueError` if `obj` is not in the collection.
+    Returns The collection if successfully removed or None if after removal the collection was empty.
+    """
+    if not collection or obj is None or obj.mrid not in collection:
+        raise ValueError(obj)
+
+    del collection[obj.mrid]
+    return collection if collection else None
+
+
 def nlen(sized: Optional[Sized]) -> int:
     """
     Get the len of a nullable sized type.
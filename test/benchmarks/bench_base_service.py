@@ -0,0 +1,249 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmarks for loading and querying a `BaseService` holding a large number of objects spread over many CIM types.
+
+Run from the repository root with:
+    python -m test.benchmarks.bench_base_service [--size N]
+
+Benchmarks for tracing, phasing and assigning feeders over large networks are in `bench_tracing`, `bench_phasing` and `bench_feeders`.
+"""
+import argparse
+import inspect
+import sys
+from collections import defaultdict
+from typing import List, Type, Set
+
+from dataclassy import fields
+
+import zepben.evolve as evolve
+from zepben.evolve import IdentifiedObject, NetworkService, ConductingEquipment, Equipment, Feeder, Junction, AcLineSegment, Terminal, Substation, \
+    BaseVoltage, ConnectivityNode, OperationalRestriction
+from zepben.evolve.services.common import resolver
+
+from test.benchmarks.util import timed
+
+
+def concrete_types() -> List[Type[IdentifiedObject]]:
+    """Every `IdentifiedObject` type exported by the SDK that can be constructed from just an mRID."""
+    types = []
+    for cls in vars(evolve).values():
+        if inspect.isclass(cls) and issubclass(cls, IdentifiedObject):
+            try:
+                cls("benchmark")
+                types.append(cls)
+            except Exception:
+                pass
+    return types
+
+
+def create_objects(size: int, types: List[Type[IdentifiedObject]]) -> List[IdentifiedObject]:
+    return [types[i % len(types)](f"obj{i}") for i in range(size)]
+
+
+def bench_load(objects: List[IdentifiedObject]) -> NetworkService:
+    service = NetworkService()
+
+    def load():
+        for obj in objects:
+            service.add(obj)
+
+    timed("add", len(objects), load)
+    return service
+
+
+def bench_lookup(service: NetworkService, objects: List[IdentifiedObject]):
+    mrids = [obj.mrid for obj in objects]
+
+    def get_all():
+        for mrid in mrids:
+            service.get(mrid)
+
+    def contains_all():
+        for mrid in mrids:
+            _ = mrid in service
+
+    def get_all_as_base_class():
+        for mrid in mrids:
+            service.get(mrid, IdentifiedObject)
+
+    timed("get (untyped)", len(mrids), get_all)
+    timed("get (IdentifiedObject)", len(mrids), get_all_as_base_class)
+    timed("__contains__", len(mrids), contains_all)
+
+
+def bench_objects_by_base_class(service: NetworkService, repeats: int = 10_000):
+    """Many small `objects()` calls on abstract classes, as analytics loops tend to do."""
+    def iterate():
+        for _ in range(repeats):
+            next(service.objects(ConductingEquipment), None)
+            next(service.objects(Equipment), None)
+
+    timed("objects(<abstract>) first item", repeats * 2, iterate)
+    count = sum(1 for _ in service.objects(ConductingEquipment))
+    timed("objects(ConductingEquipment) full", count, lambda: sum(1 for _ in service.objects(ConductingEquipment)))
+
+
+def bench_unresolved_reference_mrids(num_feeders: int = 200, refs_per_feeder: int = 500):
+    """Pending feeder equipment lookups, as done by `NetworkConsumerClient` for each fetched feeder."""
+    service = NetworkService()
+    feeders = [Feeder(f"feeder{i}") for i in range(num_feeders)]
+    for feeder in feeders:
+        service.add(feeder)
+        for i in range(refs_per_feeder):
+            service.resolve_or_defer_reference(resolver.ec_equipment(feeder), f"{feeder.mrid}-eq{i}")
+
+    timed("get_unresolved_reference_mrids", num_feeders,
+          lambda: [list(service.get_unresolved_reference_mrids(resolver.ec_equipment(f))) for f in feeders])
+
+
+def create_network_pbs(num_feeders: int, equipment_per_feeder: int) -> list:
+    """Protobuf objects for a network of radial feeders, with the feeders and connectivity nodes after the equipment waiting on them."""
+    ns = NetworkService()
+    bv = BaseVoltage("bv")
+    sub = Substation("sub")
+    ns.add(bv)
+    ns.add(sub)
+    for f in range(num_feeders):
+        feeder = Feeder(f"f{f}", name=f"Feeder {f}", normal_energizing_substation=sub)
+        sub.add_feeder(feeder)
+        previous = None
+        for i in range(equipment_per_feeder):
+            if i % 2:
+                ce = AcLineSegment(f"f{f}-ce{i}", name=f"Span {i}", description="11kV overhead", base_voltage=bv)
+            else:
+                ce = Junction(f"f{f}-ce{i}", name=f"Pole {i}", description="Pole", base_voltage=bv)
+            for sn in (1, 2):
+                t = Terminal(f"{ce.mrid}-t{sn}", name=f"Terminal {sn}", conducting_equipment=ce, sequence_number=sn)
+                ce.add_terminal(t)
+                ns.add(t)
+            ce.add_container(feeder)
+            feeder.add_equipment(ce)
+            ns.add(ce)
+            if previous:
+                ns.connect_terminals(previous.get_terminal_by_sn(2), ce.get_terminal_by_sn(1))
+            previous = ce
+        ns.add(feeder)
+    return [io.to_pb() for io in ns.objects() if not isinstance(io, ConnectivityNode)] + [cn.to_pb() for cn in ns.objects(ConnectivityNode)]
+
+
+def bench_network_load(num_feeders: int = 20, equipment_per_feeder: int = 2_000):
+    """Loading a full network from protobuf, one object at a time and with `bulk_load`."""
+    pbs = create_network_pbs(num_feeders, equipment_per_feeder)
+
+    def one_by_one():
+        service = NetworkService()
+        for pb in pbs:
+            service.add_from_pb(pb)
+        return service
+
+    def bulk():
+        service = NetworkService()
+        with service.bulk_load():
+            for pb in pbs:
+                service.add_from_pb(pb)
+        return service
+
+    timed("network load (one by one)", len(pbs), one_by_one)
+    timed("network load (bulk_load)", len(pbs), bulk)
+
+
+def object_size(io: IdentifiedObject, seen: Set[int]) -> int:
+    """
+    The bytes used by `io`, its strings and its relationship collections, but not the objects it references. Strings shared between objects are
+    only counted the first time they are seen.
+    """
+    size = sys.getsizeof(io)
+    if hasattr(io, "__dict__"):
+        size += sys.getsizeof(io.__dict__)
+    for name in fields(type(io), True):
+        value = getattr(io, name)
+        if isinstance(value, (list, tuple, dict)):
+            size += sys.getsizeof(value)
+        elif isinstance(value, str) and id(value) not in seen:
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+    return size
+
+
+def bytes_per_object(service: NetworkService):
+    seen = set()
+    totals = defaultdict(lambda: [0, 0])
+    for io in service.objects():
+        total = totals[type(io).__name__]
+        total[0] += object_size(io, seen)
+        total[1] += 1
+    return {name: size / count for name, (size, count) in totals.items()}
+
+
+def bench_memory(num_feeders: int = 20, equipment_per_feeder: int = 2_000):
+    """Bytes per object of a network loaded from protobuf, before and after `compact`."""
+    service = NetworkService()
+    with service.bulk_load():
+        for pb in create_network_pbs(num_feeders, equipment_per_feeder):
+            service.add_from_pb(pb)
+
+    before = bytes_per_object(service)
+    timed("compact", service.len_of(), service.compact)
+    after = bytes_per_object(service)
+
+    print(f"{'bytes per object':<24} {'before':>10} {'after':>10}")
+    for name in sorted(before):
+        print(f"{name:<24} {before[name]:>10.0f} {after[name]:>10.0f}")
+
+
+def bench_relationship_collections(size: int = 20_000):
+    """Building large relationship collections, each add checking for an existing object with the same mRID."""
+    junctions = [Junction(f"j{i}") for i in range(size)]
+    terminals = [Terminal(f"t{i}") for i in range(size)]
+
+    def add_equipment():
+        restriction = OperationalRestriction("restriction")
+        for j in junctions:
+            restriction.add_equipment(j)
+
+    def add_terminals():
+        cn = ConnectivityNode("cn")
+        for t in terminals:
+            cn.add_terminal(t)
+
+    timed("OperationalRestriction.add_equipment", size, add_equipment)
+    timed("ConnectivityNode.add_terminal", size, add_terminals)
+
+
+def bench_secondary_index(service: NetworkService, lookups: int = 1_000):
+    """Equality and range lookups through a secondary index, compared to scanning `objects()`."""
+    timed("add_index", service.len_of(), lambda: service.add_index("bench_name", IdentifiedObject, lambda io: io.mrid[-3:]))
+    keys = [f"{i:03}" for i in range(lookups)]
+
+    timed("find (index)", lookups, lambda: [list(service.find("bench_name", key)) for key in keys])
+    timed("find (scan)", 10, lambda: [[io for io in service.objects() if io.mrid[-3:] == key] for key in keys[:10]])
+    timed("find_range (index)", lookups, lambda: [list(service.find_range("bench_name", key, key)) for key in keys])
+    service.remove_index("bench_name")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000, help="Number of objects to load into the service.")
+    args = parser.parse_args()
+
+    types = concrete_types()
+    print(f"Creating {args.size:,} objects over {len(types)} types...")
+    objects = create_objects(args.size, types)
+
+    service = bench_load(objects)
+    bench_lookup(service, objects)
+    bench_objects_by_base_class(service)
+    bench_secondary_index(service)
+    bench_unresolved_reference_mrids()
+    bench_network_load()
+    bench_memory()
+    bench_relationship_collections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmarks for assigning the equipment of large networks to feeders.
+
+Run from the repository root with:
+    python -m test.benchmarks.bench_feeders
+"""
+import asyncio
+
+from zepben.evolve import NetworkService, ConductingEquipment, Feeder, AcLineSegment, Terminal, Substation, Breaker, AssignToFeeders
+
+from test.benchmarks.util import timed
+
+
+def create_tied_feeders(num_feeders: int, feeder_length: int) -> NetworkService:
+    """`num_feeders` feeders of `feeder_length` lines from a head breaker, with the end of each feeder tied to the next by a normally open switch."""
+    ns = NetworkService()
+
+    def add(ce: ConductingEquipment, previous: ConductingEquipment = None):
+        for sn in (1, 2):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+        ns.add(ce)
+        if previous:
+            ns.connect_terminals(previous.get_terminal_by_sn(2), ce.get_terminal_by_sn(1))
+        return ce
+
+    substation = Substation("sub")
+    ns.add(substation)
+    previous_end = None
+    for i in range(num_feeders):
+        head = add(Breaker(f"f{i}-cb"))
+        feeder = Feeder(f"f{i}", normal_head_terminal=head.get_terminal_by_sn(2), normal_energizing_substation=substation)
+        ns.add(feeder)
+        end = head
+        for j in range(feeder_length):
+            end = add(AcLineSegment(f"f{i}-c{j}"), end)
+        if previous_end:
+            add(Breaker(f"f{i}-tie"), previous_end).set_normally_open(True)
+            ns.connect_terminals(ns.get(f"f{i}-tie").get_terminal_by_sn(2), end.get_terminal_by_sn(2))
+        previous_end = end
+    return ns
+
+
+def bench_assign_to_feeders(num_feeders: int = 2_000, feeder_length: int = 50):
+    """Assigning equipment to feeders with a trace per feeder, compared to a single pass over all feeders."""
+    for single_pass in (False, True):
+        ns = create_tied_feeders(num_feeders, feeder_length)
+        timed(f"AssignToFeeders.run (single_pass={single_pass})", num_feeders,
+              lambda: asyncio.get_event_loop().run_until_complete(AssignToFeeders().run(ns, single_pass=single_pass)))
+
+
+def bench_incremental_feeder_assignment(num_feeders: int = 2_000, feeder_length: int = 50, operations: int = 100):
+    """Updating the current feeders after closing and re-opening tie switches, compared to assigning every feeder again."""
+    ns = create_tied_feeders(num_feeders, feeder_length)
+    assign_to_feeders = AssignToFeeders()
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(assign_to_feeders.run(ns, single_pass=True))
+    ties = [ns.get(f"f{i}-tie") for i in range(1, operations + 1)]
+
+    def operate(is_open: bool):
+        for tie in ties:
+            tie.set_open(is_open)
+            loop.run_until_complete(assign_to_feeders.run_switches(ns, [tie]))
+
+    timed("AssignToFeeders.run_switches (close)", operations, lambda: operate(False))
+    timed("AssignToFeeders.run_switches (open)", operations, lambda: operate(True))
+    timed("AssignToFeeders.run (single_pass=True)", 1, lambda: loop.run_until_complete(AssignToFeeders().run(ns, single_pass=True)))
+
+
+def main():
+    bench_assign_to_feeders()
+    bench_incremental_feeder_assignment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmarks for tracing the phases of large networks.
+
+Run from the repository root with:
+    python -m test.benchmarks.bench_phasing
+"""
+import asyncio
+
+from zepben.evolve import NetworkService, ConductingEquipment, Junction, AcLineSegment, Terminal, Breaker, PhaseCode, compile_topology, \
+    EnergySource, EnergySourcePhase, SetPhases, BulkSetPhases
+
+from test.benchmarks.util import timed
+
+
+def create_switched_feeder(num_spurs: int, spur_length: int) -> NetworkService:
+    """A source feeding a trunk of junctions, with a switch at the start of a spur of `spur_length` lines off each junction."""
+    ns = NetworkService()
+
+    def add(ce: ConductingEquipment, previous: ConductingEquipment = None, previous_sn: int = 2):
+        for sn in range(1, {Junction: 4, EnergySource: 2}.get(type(ce), 3)):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+        ns.add(ce)
+        if previous:
+            ns.connect_terminals(previous.get_terminal_by_sn(previous_sn), ce.get_terminal_by_sn(1))
+        return ce
+
+    source = EnergySource("source")
+    for phase in PhaseCode.ABC.single_phases:
+        esp = EnergySourcePhase(energy_source=source, phase=phase)
+        source.add_phase(esp)
+        ns.add(esp)
+    trunk = add(source)
+    for i in range(num_spurs):
+        trunk = add(Junction(f"j{i}"), trunk, 1 if i == 0 else 2)
+        previous = add(Breaker(f"sw{i}"), trunk, 3)
+        for j in range(spur_length):
+            previous = add(AcLineSegment(f"c{i}-{j}"), previous)
+    return ns
+
+
+def bench_incremental_phasing(num_spurs: int = 100, spur_length: int = 1_000):
+    """Re-phasing a feeder with `SetPhases.run` after operating a switch, compared to `SetPhases.run_switch`."""
+    ns = create_switched_feeder(num_spurs, spur_length)
+    set_phases = SetPhases()
+    num_terminals = ns.len_of(Terminal)
+    timed("SetPhases.run", num_terminals, lambda: asyncio.get_event_loop().run_until_complete(set_phases.run(ns)))
+
+    switch = ns.get(f"sw{num_spurs // 2}")
+    for is_open in (True, False):
+        switch.set_open(is_open)
+        timed(f"SetPhases.run_switch ({'open' if is_open else 'close'})", 2 * spur_length + 1,
+              lambda: asyncio.get_event_loop().run_until_complete(set_phases.run_switch(ns, switch)))
+
+
+def bench_bulk_phasing(num_spurs: int = 100, spur_length: int = 1_000):
+    """Tracing the phases of a feeder with `SetPhases`, compared to `BulkSetPhases`."""
+    ns = create_switched_feeder(num_spurs, spur_length)
+    num_terminals = ns.len_of(Terminal)
+    timed("SetPhases.run", num_terminals, lambda: asyncio.get_event_loop().run_until_complete(SetPhases().run(ns)))
+
+    for t in ns.objects(Terminal):
+        t.traced_phases.normal_status = 0
+        t.traced_phases.current_status = 0
+    topology = timed("compile_topology", num_terminals, lambda: compile_topology(ns))
+    timed("BulkSetPhases.run", num_terminals, lambda: asyncio.get_event_loop().run_until_complete(BulkSetPhases().run(ns, topology)))
+
+
+def main():
+    bench_incremental_phasing()
+    bench_bulk_phasing()
+
+
+if __name__ == "__main__":
+    main()
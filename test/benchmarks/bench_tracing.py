@@ -0,0 +1,315 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Benchmarks for tracing large networks, with traversals and over a `CompiledTopology`.
+
+Run from the repository root with:
+    python -m test.benchmarks.bench_tracing
+"""
+import asyncio
+import sys
+
+from zepben.evolve import NetworkService, ConductingEquipment, Junction, AcLineSegment, Terminal, Breaker, PhaseCode, compile_topology, \
+    connected_equipment_trace, Traversal, FifoQueue, LifoQueue, Tracker, BitsetTracker, BranchRecursiveTraversal, EnergySource, EnergySourcePhase, \
+    BulkSetPhases, EnergyConsumer, UsagePoint, find_normal, find_all_normal, get_connectivity, normal_downstream_trace, PhaseStep, \
+    build_downstream_index, normal_upstream_trace, build_upstream_device_index, PerLengthSequenceImpedance, shortest_path, shortest_paths, \
+    impedance_weight, build_network_islands
+
+from test.benchmarks.bench_feeders import create_tied_feeders
+from test.benchmarks.util import timed
+
+
+def create_radial_network(num_equipment: int) -> NetworkService:
+    """A single radial run of `num_equipment` two terminal pieces of equipment, with a normally open breaker half way along."""
+    ns = NetworkService()
+    previous = None
+    for i in range(num_equipment):
+        if i == num_equipment // 2:
+            ce = Breaker(f"ce{i}")
+            ce.set_normally_open(True)
+        elif i % 2:
+            ce = AcLineSegment(f"ce{i}")
+        else:
+            ce = Junction(f"ce{i}")
+        for sn in (1, 2):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+        ns.add(ce)
+        if previous:
+            ns.connect_terminals(previous.get_terminal_by_sn(2), ce.get_terminal_by_sn(1))
+        previous = ce
+    return ns
+
+
+def bench_compiled_topology(num_equipment: int = 500_000):
+    """Tracing the whole of a radial network with `connected_equipment_trace`, compared to a `CompiledTopology` of it."""
+    ns = create_radial_network(num_equipment)
+    start = ns.get("ce0")
+
+    async def object_trace():
+        await connected_equipment_trace().trace(start)
+
+    timed("connected_equipment_trace", num_equipment, lambda: asyncio.get_event_loop().run_until_complete(object_trace()))
+    topology = timed("compile_topology", ns.len_of(Terminal), lambda: compile_topology(ns))
+    timed("CompiledTopology.trace", num_equipment, lambda: topology.trace(start))
+    timed("CompiledTopology.trace (phased)", num_equipment, lambda: topology.trace(start, phases=PhaseCode.ABC.single_phases))
+    timed("CompiledTopology.trace (open)", num_equipment // 2, lambda: topology.trace(start, topology.normally_open_phases))
+
+
+def bench_traversal_callbacks(size: int = 200_000):
+    """A `Traversal` along a chain of integers with a stop condition and step action, as plain functions and as coroutine functions."""
+    def queue_next(i, _):
+        return (i + 1,) if i < size else ()
+
+    def run(stop_condition, step_action):
+        t = Traversal(queue_next=queue_next, start_item=0, process_queue=FifoQueue(), stop_conditions=[stop_condition], step_actions=[step_action])
+        asyncio.get_event_loop().run_until_complete(t.trace())
+
+    def stop(i):
+        return i < 0
+
+    def step(i, is_stopping):
+        pass
+
+    async def async_stop(i):
+        return i < 0
+
+    async def async_step(i, is_stopping):
+        pass
+
+    timed("Traversal (async callbacks)", size, lambda: run(async_stop, async_step))
+    timed("Traversal (sync callbacks)", size, lambda: run(stop, step))
+
+
+def bench_trackers(size: int = 200_000, set_size: int = 2_000, copies: int = 100):
+    """
+    Visiting, checking, copying and clearing terminals with a `Tracker` and a `BitsetTracker`. The `Tracker` only visits `set_size` terminals, as
+    model objects all hash alike and its cost grows with the square of the number of items.
+    """
+    for tracker, num in ((Tracker(), set_size), (BitsetTracker(), set_size), (BitsetTracker(), size)):
+        terminals = [Terminal(f"t{i}") for i in range(num)]
+        name = f"{type(tracker).__name__} ({num:,})"
+        timed(f"{name}.visit", num, lambda: [tracker.visit(t) for t in terminals])
+        timed(f"{name}.has_visited", num, lambda: [tracker.has_visited(t) for t in terminals])
+        timed(f"{name}.copy", copies, lambda: [tracker.copy() for _ in range(copies)])
+        print(f"{name} bytes: {sys.getsizeof(tracker.visited if isinstance(tracker, Tracker) else tracker._bits):,}")
+        timed(f"{name}.clear", copies, lambda: [tracker.clear() for _ in range(copies)])
+
+
+def bench_deep_branches(depths=(50, 100, 200), items_per_branch: int = 50):
+    """
+    A `BranchRecursiveTraversal` over a feeder where every branch starts another branch, so branches are nested `depth` deep. The unmerged run uses a
+    tracker that can't be updated, so each visit checks every parent branch.
+    """
+    class UnmergedTracker(BitsetTracker):
+        def update(self, other):
+            raise NotImplementedError()
+
+    def queue_next(item, traversal, _):
+        if item % items_per_branch == 0 and item < depth * items_per_branch:
+            branch = traversal.create_branch()
+            branch.start_item = item + 1
+            traversal.branch_queue.put(branch)
+        elif item % items_per_branch:
+            traversal.process_queue.put(item + 1)
+
+    def run(tracker):
+        t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next, process_queue=LifoQueue(), branch_queue=LifoQueue(), tracker=tracker)
+        asyncio.get_event_loop().run_until_complete(t.trace())
+
+    for depth in depths:
+        num_items = depth * items_per_branch
+        timed(f"branches {depth} deep (merged)", num_items, lambda: run(BitsetTracker(key=int)))
+        timed(f"branches {depth} deep (parent walk)", num_items, lambda: run(UnmergedTracker(key=int)))
+
+
+def create_metered_feeder(num_meters: int) -> NetworkService:
+    """A source feeding a trunk of `num_meters` lines, with a service line to a metered energy consumer off the end of each."""
+    ns = NetworkService()
+
+    def add(ce: ConductingEquipment, num_terminals: int = 2, previous: ConductingEquipment = None):
+        for sn in range(1, num_terminals + 1):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+        ns.add(ce)
+        if previous:
+            # Connect by node mRID, as the trunk lines have both the next trunk line and a service line connected to their far end.
+            last = previous.get_terminal_by_sn(previous.num_terminals())
+            ns.connect_by_mrid(last, f"{last.mrid}-cn")
+            ns.connect_by_mrid(ce.get_terminal_by_sn(1), f"{last.mrid}-cn")
+        return ce
+
+    source = EnergySource("source")
+    for phase in PhaseCode.ABC.single_phases:
+        esp = EnergySourcePhase(energy_source=source, phase=phase)
+        source.add_phase(esp)
+        ns.add(esp)
+    trunk = add(source, 1)
+    for i in range(num_meters):
+        trunk = add(AcLineSegment(f"c{i}"), previous=trunk)
+        consumer = add(EnergyConsumer(f"ec{i}"), 1, add(AcLineSegment(f"s{i}"), previous=trunk))
+        usage_point = UsagePoint(f"up{i}", equipment=[consumer])
+        consumer.add_usage_point(usage_point)
+        ns.add(usage_point)
+    return ns
+
+
+def bench_find_paths(num_meters: int = 2_000, single_pairs: int = 50):
+    """Finding the paths from every meter to the source of a feeder with `find_all_normal`, compared to `find_normal` for each meter."""
+    ns = create_metered_feeder(num_meters)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(BulkSetPhases().run(ns))
+    source = ns.get("source")
+    meters = [ns.get(f"ec{i}") for i in range(num_meters)]
+
+    timed("find_normal", single_pairs, lambda: [loop.run_until_complete(find_normal(meter, source)) for meter in meters[:single_pairs]])
+    timed("find_all_normal", num_meters, lambda: loop.run_until_complete(find_all_normal(meters, [source] * num_meters)))
+
+
+def bench_connectivity_cache(num_meters: int = 2_000):
+    """Getting the connectivity of every terminal before and after it has been cached on the connectivity nodes, and a trace that uses it."""
+    ns = create_metered_feeder(num_meters)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(BulkSetPhases().run(ns))
+    terminals = list(ns.objects(Terminal))
+
+    start = PhaseStep(ns.get("source"), frozenset(PhaseCode.ABC.single_phases))
+    for run in ("first", "cached"):
+        timed(f"normal_downstream_trace ({run})", len(terminals),
+              lambda: loop.run_until_complete(normal_downstream_trace().trace(start, can_stop_on_start_item=False)))
+
+    for run in ("first", "cached"):
+        timed(f"get_connectivity ({run})", len(terminals), lambda: [get_connectivity(t) for t in terminals])
+
+
+def bench_downstream_index(num_meters: int = 2_000, traces: int = 20, queries: int = 2_000):
+    """Finding the equipment downstream of trunk lines with `normal_downstream_trace`, compared to a `DownstreamIndex`."""
+    ns = create_metered_feeder(num_meters)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(BulkSetPhases().run(ns))
+    lines = [ns.get(f"c{i * num_meters // queries}") for i in range(queries)]
+
+    def trace(ce):
+        traversal = normal_downstream_trace()
+        loop.run_until_complete(traversal.trace(PhaseStep(ce, frozenset(PhaseCode.ABC.single_phases)), can_stop_on_start_item=False))
+
+    timed("normal_downstream_trace", traces, lambda: [trace(ce) for ce in lines[::queries // traces]])
+    index = timed("build_downstream_index", ns.len_of(ConductingEquipment), lambda: build_downstream_index(ns))
+    timed("DownstreamIndex.downstream", queries, lambda: [index.downstream(ce) for ce in lines])
+    timed("DownstreamIndex.num_downstream_usage_points", queries, lambda: [index.num_downstream_usage_points(ce) for ce in lines])
+    timed("DownstreamIndex.is_downstream", queries, lambda: [index.is_downstream(ce, lines[0]) for ce in lines])
+
+
+def bench_upstream_device_index(num_meters: int = 2_000, traces: int = 20, queries: int = 2_000):
+    """Finding the equipment upstream of meters with `normal_upstream_trace`, compared to an `UpstreamDeviceIndex`."""
+    ns = create_metered_feeder(num_meters)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(BulkSetPhases().run(ns))
+    consumers = [ns.get(f"ec{i * num_meters // queries}") for i in range(queries)]
+
+    def trace(ce):
+        traversal = normal_upstream_trace()
+        loop.run_until_complete(traversal.trace(PhaseStep(ce, frozenset(PhaseCode.ABC.single_phases)), can_stop_on_start_item=False))
+
+    timed("normal_upstream_trace", traces, lambda: [trace(ce) for ce in consumers[::queries // traces]])
+    index = timed("build_upstream_device_index", ns.len_of(ConductingEquipment), lambda: build_upstream_device_index(ns))
+    timed("UpstreamDeviceIndex.nearest_protective_device", queries, lambda: [index.nearest_protective_device(ce) for ce in consumers])
+    changed = [t for ce in consumers[:traces] for t in ce.terminals]
+    timed("UpstreamDeviceIndex.refresh", traces, lambda: index.refresh(changed))
+
+
+def create_meshed_network(size: int) -> NetworkService:
+    """A `size` by `size` grid of buses joined by lines of varying length and impedance, with every tenth connection a normally open breaker."""
+    ns = NetworkService()
+    impedances = [PerLengthSequenceImpedance(f"plsi{i}", r=0.05 * (i + 1), x=0.1 * (i + 1)) for i in range(4)]
+    for plsi in impedances:
+        ns.add(plsi)
+
+    def connect(ce: ConductingEquipment, *nodes: str):
+        for sn, node in enumerate(nodes, 1):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+            ns.connect_by_mrid(t, node)
+        ns.add(ce)
+
+    edges = [((r, c), (r, c + 1)) for r in range(size) for c in range(size - 1)] + \
+            [((r, c), (r + 1, c)) for r in range(size - 1) for c in range(size)]
+    for i, ((r1, c1), (r2, c2)) in enumerate(edges):
+        if i % 10 == 0:
+            cb = Breaker(f"cb{i}")
+            cb.set_normally_open(True)
+            connect(cb, f"n{r1}-{c1}", f"n{r2}-{c2}")
+        else:
+            acls = AcLineSegment(f"c{i}", length=100.0 + (i * 37) % 900, per_length_sequence_impedance=impedances[i % 4])
+            connect(acls, f"n{r1}-{c1}", f"n{r2}-{c2}")
+    return ns
+
+
+def bench_shortest_paths(size: int = 150, sources: int = 10, targets: int = 100, single_pairs: int = 20):
+    """Lowest impedance paths across a meshed network with `shortest_path` one pair at a time, compared to a batch with `shortest_paths`."""
+    ns = create_meshed_network(size)
+    topology = timed("compile_topology", ns.len_of(ConductingEquipment), lambda: compile_topology(ns))
+    lines = [ce for ce in topology.equipment if isinstance(ce, AcLineSegment)]
+    froms = lines[:sources]
+    tos = lines[-targets:]
+
+    timed("shortest_path", single_pairs, lambda: [shortest_path(topology, froms[i % sources], tos[i], impedance_weight) for i in range(single_pairs)])
+    timed("shortest_paths", sources * targets, lambda: shortest_paths(topology, froms, tos, impedance_weight))
+
+
+def bench_network_islands(num_feeders: int = 2_000, feeder_length: int = 50, operations: int = 100):
+    """Finding islands with a `connected_equipment_trace` per island, compared to `NetworkIslands` and updating it as tie switches are operated."""
+    ns = create_tied_feeders(num_feeders, feeder_length)
+    for i in range(num_feeders):
+        ns.get(f"f{i}-cb").set_normally_open(True)
+    loop = asyncio.get_event_loop()
+
+    def is_open(ce):
+        return isinstance(ce, Breaker) and ce.is_normally_open()
+
+    def trace_islands():
+        seen = set()
+        for ce in ns.objects(ConductingEquipment):
+            if ce.mrid not in seen and not is_open(ce):
+                traversal = connected_equipment_trace()
+                traversal.add_stop_condition(is_open)
+                traversal.add_step_action(lambda equipment, _: seen.add(equipment.mrid))
+                loop.run_until_complete(traversal.trace(ce))
+
+    timed("connected_equipment_trace", num_feeders, trace_islands)
+    topology = compile_topology(ns)
+    islands = timed("build_network_islands", ns.len_of(Terminal), lambda: build_network_islands(ns, topology=topology))
+    timed("NetworkIslands.islands", num_feeders, islands.islands)
+    ties = [ns.get(f"f{i}-tie") for i in range(1, operations + 1)]
+
+    def operate(is_open: bool):
+        for tie in ties:
+            tie.set_normally_open(is_open)
+            islands.update(tie)
+
+    timed("NetworkIslands.update (close)", operations, lambda: operate(False))
+    timed("NetworkIslands.update (open)", operations, lambda: operate(True))
+
+
+def main():
+    bench_compiled_topology()
+    bench_traversal_callbacks()
+    bench_trackers()
+    bench_deep_branches()
+    bench_find_paths()
+    bench_connectivity_cache()
+    bench_downstream_index()
+    bench_upstream_device_index()
+    bench_shortest_paths()
+    bench_network_islands()
+
+
+if __name__ == "__main__":
+    main()
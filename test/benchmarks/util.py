@@ -0,0 +1,16 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Helpers shared by the benchmarks."""
+from time import perf_counter
+
+
+def timed(description: str, size: int, fn):
+    start = perf_counter()
+    result = fn()
+    elapsed = perf_counter() - start
+    print(f"{description:<40} {elapsed:>8.3f}s {size / elapsed:>14,.0f} ops/s")
+    return result
@@ -0,0 +1,493 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import asyncio
+import sys
+from contextlib import nullcontext
+from random import Random
+from threading import Thread
+
+import pytest
+
+from zepben.evolve import IdentifiedObject, NetworkService, Breaker, Junction, AcLineSegment, ConnectivityNode, Terminal, Switch, ConductingEquipment, Conductor, Equipment, \
+    Feeder, Substation, BaseVoltage, PerLengthSequenceImpedance, Location, EnergyConsumer, Customer, \
+    assign_equipment_containers_to_feeders
+from zepben.evolve.services.common import resolver
+from zepben.evolve.services.common.reference_resolvers import ReferenceResolver, BoundReferenceResolver
+
+
+def _create_feeder_network() -> NetworkService:
+    ns = NetworkService()
+    bv = BaseVoltage("bv")
+    plsi = PerLengthSequenceImpedance("plsi")
+    sub = Substation("sub")
+    feeder = Feeder("feeder", normal_energizing_substation=sub)
+    sub.add_feeder(feeder)
+    for io in (bv, plsi, sub, feeder):
+        ns.add(io)
+
+    previous = None
+    for i, ce in enumerate([Breaker("cb"), AcLineSegment("c1", per_length_sequence_impedance=plsi), Junction("j"), AcLineSegment("c2")]):
+        ce.base_voltage = bv
+        ce.location = Location(f"loc{i}")
+        ns.add(ce.location)
+        for sn in (1, 2):
+            t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+            ce.add_terminal(t)
+            ns.add(t)
+        ce.add_container(feeder)
+        feeder.add_equipment(ce)
+        ns.add(ce)
+        if previous:
+            ns.connect_terminals(previous.get_terminal_by_sn(2), ce.get_terminal_by_sn(1))
+        previous = ce
+
+    feeder.normal_head_terminal = ns.get("cb-t2")
+    return ns
+
+
+class TestBaseService(object):
+
+    def test_add_get_and_contains(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        junction = Junction("j1")
+
+        assert ns.add(breaker)
+        assert ns.add(junction)
+
+        assert "b1" in ns
+        assert "j1" in ns
+        assert "missing" not in ns
+        assert ns.get("b1") is breaker
+        assert ns["j1"] is junction
+        assert ns.get("missing", default=None) is None
+        with pytest.raises(KeyError):
+            ns.get("missing")
+
+    def test_mrids_are_unique_across_types(self):
+        ns = NetworkService()
+        breaker = Breaker("shared")
+
+        assert ns.add(breaker)
+        assert not ns.add(breaker)
+        assert not ns.add(Junction("shared"))
+        assert not ns.add(AcLineSegment("shared"))
+        assert ns.get("shared") is breaker
+        assert ns.len_of() == 1
+
+    def test_remove_keeps_index_in_sync(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        ns.add(breaker)
+
+        assert ns.remove(breaker)
+        assert "b1" not in ns
+        assert ns.get("b1", default=None) is None
+
+        # The mRID can be reused by another type once removed.
+        junction = Junction("b1")
+        assert ns.add(junction)
+        assert ns.get("b1") is junction
+
+    def test_connectivity_nodes_are_indexed(self):
+        ns = NetworkService()
+        t1 = Terminal("t1")
+        t2 = Terminal("t2")
+        ns.add(t1)
+        ns.add(t2)
+
+        assert ns.connect_by_mrid(t1, "cn1")
+        assert "cn1" in ns
+        assert isinstance(ns.get("cn1"), ConnectivityNode)
+
+        ns.connect_by_mrid(t2, "cn1")
+        ns.disconnect(t1)
+        assert "cn1" in ns
+        ns.disconnect(t2)
+        assert "cn1" not in ns
+
+    def test_typed_get_and_objects_by_base_class(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        junction = Junction("j1")
+        acls = AcLineSegment("acls1")
+        ns.add(breaker)
+        ns.add(junction)
+
+        assert ns.get("b1", Breaker) is breaker
+        assert ns.get("b1", Switch) is breaker
+        assert ns.get("b1", ConductingEquipment) is breaker
+        assert ns.get("b1", Junction, default=None) is None
+        with pytest.raises(KeyError):
+            ns.get("b1", AcLineSegment)
+
+        assert set(ns.objects(ConductingEquipment)) == {breaker, junction}
+        assert list(ns.objects(Switch)) == [breaker]
+        assert list(ns.objects(Conductor)) == []
+
+        # Types first seen after a base class has been queried are picked up.
+        ns.add(acls)
+        assert set(ns.objects(ConductingEquipment)) == {breaker, junction, acls}
+        assert list(ns.objects(Conductor)) == [acls]
+        assert ns.get("acls1", Equipment) is acls
+
+    def test_unresolved_reference_mrids_by_source(self):
+        ns = NetworkService()
+        feeder = Feeder("f1")
+        other_feeder = Feeder("f2")
+        ns.add(feeder)
+        ns.add(other_feeder)
+
+        assert not ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "b1")
+        assert not ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "j1")
+        assert not ns.resolve_or_defer_reference(resolver.ec_equipment(other_feeder), "j1")
+        assert not ns.resolve_or_defer_reference(resolver.current_equipment(feeder), "acls1")
+
+        assert set(ns.get_unresolved_reference_mrids(resolver.ec_equipment(feeder))) == {"b1", "j1"}
+        assert set(ns.get_unresolved_reference_mrids([resolver.ec_equipment(feeder), resolver.current_equipment(feeder)])) == {"b1", "j1", "acls1"}
+        assert list(ns.get_unresolved_reference_mrids(resolver.ec_equipment(other_feeder))) == ["j1"]
+
+        # Adding the referenced object resolves it for every source.
+        junction = Junction("j1")
+        ns.add(junction)
+        assert feeder.get_equipment("j1") is junction
+        assert other_feeder.get_equipment("j1") is junction
+        assert list(ns.get_unresolved_reference_mrids(resolver.ec_equipment(feeder))) == ["b1"]
+        assert list(ns.get_unresolved_reference_mrids(resolver.ec_equipment(other_feeder))) == []
+
+        # Resolving from the other side cleans up the reverse reference.
+        breaker = Breaker("b1")
+        assert ns.resolve_or_defer_reference(resolver.containers(breaker), "f1")
+        assert feeder.get_equipment("b1") is breaker
+        assert list(ns.get_unresolved_reference_mrids(resolver.ec_equipment(feeder))) == []
+        assert list(ns.get_unresolved_reference_mrids(resolver.current_equipment(feeder))) == ["acls1"]
+        assert ns.num_unresolved_references() == 1
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_bulk_load_matches_adding_one_by_one(self, seed):
+        pbs = [io.to_pb() for io in _create_feeder_network().objects()]
+        random = Random(seed)
+        random.shuffle(pbs)
+        # Leave some objects out so there are references that stay unresolved.
+        pbs = pbs[:-3]
+
+        one_by_one = NetworkService()
+        for pb in pbs:
+            one_by_one.add_from_pb(pb)
+
+        bulk = NetworkService()
+        with bulk.bulk_load():
+            for pb in pbs:
+                bulk.add_from_pb(pb)
+
+        def state(ns: NetworkService):
+            objects = {io.mrid: io.to_pb() for io in ns.objects()}
+            refs = {(ref.from_ref.mrid, ref.to_mrid, ref.resolver) for _, refs in ns.unresolved_references() for ref in refs}
+            return objects, refs
+
+        assert state(bulk) == state(one_by_one)
+        assert set(bulk.unresolved_mrids()) == set(one_by_one.unresolved_mrids())
+        assert bulk.has_unresolved_references()
+
+    def test_bulk_load_calls_resolvers_like_adding_one_by_one(self):
+        def load(bulk: bool):
+            calls = []
+            j_to_b = ReferenceResolver(Junction, Breaker, lambda j, b: calls.append((j.mrid, b.mrid)))
+            b_to_j = ReferenceResolver(Breaker, Junction, lambda b, j: calls.append((b.mrid, j.mrid)))
+
+            ns = NetworkService()
+            j1, j2, b = Junction("j1"), Junction("j2"), Breaker("b")
+            with ns.bulk_load() if bulk else nullcontext():
+                ns.resolve_or_defer_reference(BoundReferenceResolver(j1, j_to_b, b_to_j), "b")
+                ns.add(j1)
+                ns.resolve_or_defer_reference(BoundReferenceResolver(j2, j_to_b, b_to_j), "b")
+                ns.add(j2)
+                # Resolving both junctions from the breaker side also resolves them in reverse, cleaning up their pending references.
+                ns.resolve_or_defer_reference(BoundReferenceResolver(b, b_to_j, j_to_b), "j1")
+                ns.resolve_or_defer_reference(BoundReferenceResolver(b, b_to_j, j_to_b), "j2")
+                ns.resolve_or_defer_reference(BoundReferenceResolver(b, b_to_j, j_to_b), "j3")
+                ns.add(b)
+            return calls, list(ns.unresolved_mrids())
+
+        assert load(True) == load(False)
+        assert load(True) == ([("b", "j1"), ("j1", "b"), ("b", "j2"), ("j2", "b")], ["j3"])
+
+    @pytest.mark.asyncio
+    async def test_overlapping_bulk_loads(self):
+        ns = NetworkService()
+        first_done = asyncio.Event()
+        second_added = asyncio.Event()
+
+        async def first():
+            feeder = Feeder("f1")
+            with ns.bulk_load():
+                ns.add(feeder)
+                ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "b1")
+                ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "j1")
+                await second_added.wait()
+
+            # Resolved as soon as this bulk load exits, even though the other one is still open.
+            assert feeder.get_equipment("j1") is ns.get("j1")
+            assert list(ns.get_unresolved_reference_mrids(resolver.ec_equipment(feeder))) == ["b1"]
+            first_done.set()
+
+        async def second():
+            with ns.bulk_load():
+                ns.add(Junction("j1"))
+                second_added.set()
+                await first_done.wait()
+                ns.add(Breaker("b1"))
+
+        await asyncio.gather(first(), second())
+        assert ns.get("f1").get_equipment("b1") is ns.get("b1")
+        assert not ns.has_unresolved_references()
+
+    def test_nested_bulk_loads_resolve_when_the_outermost_exits(self):
+        ns = NetworkService()
+        feeder = Feeder("f1")
+        with ns.bulk_load():
+            with ns.bulk_load():
+                ns.add(feeder)
+                ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "b1")
+            assert not ns.has_unresolved_references()
+            ns.add(Breaker("b1"))
+        assert feeder.get_equipment("b1") is ns.get("b1")
+
+    def test_add_all(self):
+        ns = NetworkService()
+        feeder = Feeder("f1")
+        breaker = Breaker("b1")
+        ns.add(feeder)
+        ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "b1")
+
+        assert ns.add_all([breaker, Junction("j1")])
+        assert feeder.get_equipment("b1") is breaker
+        assert not ns.has_unresolved_references()
+        assert not ns.add_all([Junction("j2"), Junction("j1")])
+        assert "j2" in ns
+
+    def test_len_of_and_num_unresolved_references(self):
+        ns = NetworkService()
+        assert ns.len_of() == 0
+        assert ns.len_of(Breaker) == 0
+
+        ns.add(Breaker("b1"))
+        ns.add(Breaker("b2"))
+        ns.add(Junction("j1"))
+        ns.add(AcLineSegment("acls1"))
+        feeder = Feeder("f1")
+        ns.add(feeder)
+
+        assert ns.len_of() == 5
+        assert ns.len_of(Breaker) == 2
+        assert ns.len_of(Switch) == 2
+        assert ns.len_of(ConductingEquipment) == 4
+        assert ns.len_of(Conductor) == 1
+
+        ns.remove(ns.get("b2"))
+        assert ns.len_of() == 4
+        assert ns.len_of(ConductingEquipment) == 3
+
+        assert ns.num_unresolved_references() == 0
+        ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "missing1")
+        ns.resolve_or_defer_reference(resolver.current_equipment(feeder), "missing1")
+        ns.resolve_or_defer_reference(resolver.ec_equipment(feeder), "missing2")
+        assert ns.num_unresolved_references() == 2
+
+        ns.add(Junction("missing1"))
+        assert ns.num_unresolved_references() == 1
+
+    def test_len_of_types_not_in_the_service(self):
+        ns = NetworkService()
+        ns.add(Breaker("b1"))
+
+        # Types with no objects in the service, including types it can never hold, have a len of 0 rather than raising a KeyError.
+        assert ns.len_of(Junction) == 0
+        assert ns.len_of(Customer) == 0
+        assert ns.len_of(int) == 0
+
+        # Types are counted with their subclasses, so abstract types can be counted.
+        assert ns.len_of(Switch) == 1
+        assert ns.len_of(IdentifiedObject) == 1
+
+    def test_secondary_indexes(self):
+        ns = NetworkService()
+        ec1 = EnergyConsumer("ec1", name="house", customer_count=1)
+        ec2 = EnergyConsumer("ec2", name="shops", customer_count=20)
+        ns.add(ec1)
+        ns.add(ec2)
+
+        # Indexes are populated from objects already in the service.
+        ns.add_index("name", IdentifiedObject, lambda io: io.name or None)
+        ns.add_index("customers", EnergyConsumer, lambda ec: ec.customer_count)
+        with pytest.raises(ValueError):
+            ns.add_index("name", IdentifiedObject, lambda io: io.name)
+
+        breaker = Breaker("b1", name="house")
+        ns.add(breaker)
+        ec3 = EnergyConsumer("ec3", customer_count=5)
+        ns.add(ec3)
+        ns.add(Junction("j1"))
+
+        assert set(ns.find("name", "house")) == {ec1, breaker}
+        assert list(ns.find("name", "missing")) == []
+        assert list(ns.find_range("customers", 2, 20)) == [ec3, ec2]
+        assert list(ns.find_range("customers", max_key=5)) == [ec1, ec3]
+        assert list(ns.find_range("customers", min_key=6)) == [ec2]
+
+        ns.remove(ec3)
+        assert list(ns.find_range("customers")) == [ec1, ec2]
+
+        ec1.customer_count = 50
+        ns.reindex(ec1)
+        assert list(ns.find_range("customers", min_key=21)) == [ec1]
+
+        ns.remove_index("name")
+        with pytest.raises(KeyError):
+            list(ns.find("name", "house"))
+
+    def test_secondary_indexes_follow_reference_resolution(self):
+        ns = NetworkService()
+        ns.add_index("base_voltage", ConductingEquipment, lambda ce: ce.base_voltage.mrid if ce.base_voltage else None)
+
+        junction = Junction("j1")
+        ns.resolve_or_defer_reference(resolver.ce_base_voltage(junction), "bv1")
+        ns.add(junction)
+        assert list(ns.find("base_voltage", "bv1")) == []
+
+        bv = BaseVoltage("bv1")
+        ns.add(bv)
+        assert list(ns.find("base_voltage", "bv1")) == [junction]
+
+        breaker = Breaker("b1")
+        with ns.bulk_load():
+            ns.resolve_or_defer_reference(resolver.ce_base_voltage(breaker), "bv1")
+            ns.add(breaker)
+        assert set(ns.find("base_voltage", "bv1")) == {junction, breaker}
+
+    def test_concurrent_access_iterates_a_snapshot(self):
+        ns = NetworkService()
+        ns.enable_concurrent_access()
+        j1, j2, j3 = Junction("j1"), Junction("j2"), Junction("j3")
+        ns.add(j1)
+        ns.add(j2)
+
+        objects = ns.objects(Junction)
+        assert next(objects) is j1
+        ns.add(j3)
+        ns.remove(j1)
+        assert list(objects) == [j2]
+
+        assert ns.get("j3") is j3
+        assert "j1" not in ns
+        assert list(ns.objects(Junction)) == [j2, j3]
+
+        # Abandoned generators release their snapshot when closed.
+        objects = ns.objects()
+        next(objects)
+        objects.close()
+        assert not ns._pins
+
+    def test_concurrent_access_from_threads(self):
+        ns = NetworkService()
+        ns.enable_concurrent_access()
+        errors = []
+
+        def write():
+            try:
+                for i in range(2000):
+                    ns.add(Junction(f"j{i}"))
+                    if i % 3 == 0:
+                        ns.remove(ns.get(f"j{i // 2}"))
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                for _ in range(200):
+                    mrids = [io.mrid for io in ns.objects(ConductingEquipment)]
+                    assert len(mrids) == len(set(mrids))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [Thread(target=write)] + [Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        assert ns.len_of(Junction) == sum(1 for _ in ns.objects(Junction))
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(False, False)], indirect=True)
+    async def test_compacted_network_can_be_traced(self, feeder_start_point_to_open_point_network):
+        network = feeder_start_point_to_open_point_network
+        network.compact()
+        await assign_equipment_containers_to_feeders().run(network)
+
+        assert {eq.mrid for eq in network.get("f").current_equipment} == {"fsp", "c1", "op", "c2"}
+
+    def test_compact(self):
+        ns = _create_feeder_network()
+        for i, t in enumerate(ns.objects(Terminal)):
+            t.name = "".join(["term", "inal"])
+            t.description = f"desc{i % 2}"
+
+        ns.compact()
+
+        names = {id(t.name) for t in ns.objects(Terminal)}
+        descriptions = {id(t.description) for t in ns.objects(Terminal)}
+        assert len(names) == 1
+        assert len(descriptions) == 2
+
+        c1: AcLineSegment = ns.get("c1")
+        feeder: Feeder = ns.get("feeder")
+        assert c1._terminals == (ns.get("c1-t1"), ns.get("c1-t2"))
+        assert Junction("unused")._terminals == []
+
+        # Compacted relationships can still be modified.
+        t3 = Terminal("c1-t3", conducting_equipment=c1)
+        c1.add_terminal(t3)
+        assert list(c1.terminals) == [ns.get("c1-t1"), ns.get("c1-t2"), t3]
+        c1.remove_terminal(t3)
+        c1.remove_containers(feeder)
+        assert c1.num_equipment_containers() == 0
+
+        breaker = ns.get("cb")
+        assert isinstance(breaker._terminals, tuple)
+        breaker.clear_terminals()
+        assert breaker.num_terminals() == 0
+
+        # Relationships keyed by mRID are rebuilt, with empty ones released where they are created on first use.
+        for i in range(100):
+            feeder.add_equipment(Junction(f"extra{i}"))
+        for i in range(100):
+            feeder.remove_equipment(feeder.get_equipment(f"extra{i}"))
+        grown = sys.getsizeof(feeder._equipment)
+        c1._equipment_containers = dict()
+        node = ns.get("c1-t1").connectivity_node
+        empty_node = ConnectivityNode("empty")
+        ns.add(empty_node)
+
+        ns.compact()
+        assert sys.getsizeof(feeder._equipment) < grown
+        assert {eq.mrid for eq in feeder.equipment} == {eq.mrid for eq in ns.objects(ConductingEquipment)}
+        assert c1._equipment_containers is None
+        assert node.get_terminal_by_mrid("c1-t1") is ns.get("c1-t1")
+        assert empty_node._terminals == {}
+        empty_node.add_terminal(t3)
+        assert list(empty_node.terminals) == [t3]
+
+        j: Junction = ns.get("j")
+        ns.compact()
+        j.add_current_feeder(feeder)
+        with ns.fork():
+            j.remove_current_feeder(feeder)
+            assert j.num_current_feeders() == 0
+        assert list(j.current_feeders) == [feeder]
+        j.remove_current_feeder(feeder)
+        assert j.num_current_feeders() == 0
@@ -14,3 +14,60 @@ TODO:
     test Meter supporting mRIDs or equipment references
     test ordering of send for UsagePoints, Meters, and MeterReadings
 """
+
+import pytest
+
+from zepben.evolve import ConnectivityNode, Terminal, Junction, Feeder, Substation, OperationalRestriction
+
+
+class TestRelationshipCollections(object):
+
+    def test_mrid_keyed_collections_keep_insertion_order(self):
+        cn = ConnectivityNode("cn")
+        terminals = [Terminal(f"t{i}") for i in (3, 1, 2)]
+        for t in terminals:
+            cn.add_terminal(t)
+        cn.add_terminal(terminals[0])
+
+        assert list(cn.terminals) == terminals
+        assert list(cn) == terminals
+        assert cn.num_terminals() == 3
+        assert cn.get_terminal_by_mrid("t1") is terminals[1]
+        with pytest.raises(KeyError):
+            cn.get_terminal_by_mrid("t4")
+        with pytest.raises(ValueError):
+            cn.add_terminal(Terminal("t1"))
+
+        cn.remove_terminal(terminals[1])
+        assert list(cn.terminals) == [terminals[0], terminals[2]]
+        with pytest.raises(ValueError):
+            cn.remove_terminal(terminals[1])
+        cn.clear_terminals()
+        assert cn.num_terminals() == 0
+
+    def test_removing_the_last_item_clears_the_collection(self):
+        junction = Junction("j")
+        feeder = Feeder("f")
+        sub = Substation("s")
+        junction.add_container(feeder).add_current_feeder(feeder)
+        sub.add_feeder(feeder)
+
+        junction.remove_containers(feeder)
+        junction.remove_current_feeder(feeder)
+        sub.remove_feeder(feeder)
+
+        assert junction._equipment_containers is None
+        assert junction._current_feeders is None
+        assert sub._normal_energized_feeders is None
+        with pytest.raises(ValueError):
+            sub.remove_feeder(feeder)
+
+    def test_large_collections(self):
+        restriction = OperationalRestriction("or")
+        junctions = [Junction(f"j{i}") for i in range(50_000)]
+        for j in junctions:
+            restriction.add_equipment(j)
+
+        assert restriction.num_equipment == len(junctions)
+        assert list(restriction.equipment) == junctions
+        assert restriction.get_equipment("j25000") is junctions[25_000]
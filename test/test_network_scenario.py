@@ -0,0 +1,133 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import asyncio
+
+import pytest
+
+from zepben.evolve import NetworkService, Breaker, Junction, Feeder, Terminal, SinglePhaseKind, PhaseDirection, active_scenario, \
+    assign_equipment_containers_to_feeders
+
+
+class TestNetworkScenario(object):
+
+    def test_changes_are_only_seen_in_the_scenario(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        junction = Junction("j1")
+        feeder = Feeder("f1")
+        terminal = Terminal("t1")
+        for io in (breaker, junction, feeder, terminal):
+            ns.add(io)
+        feeder.add_current_equipment(breaker)
+        breaker.add_current_feeder(feeder)
+
+        scenario = ns.fork()
+        with scenario:
+            assert active_scenario() is scenario
+            breaker.set_open(True, SinglePhaseKind.A)
+            breaker.set_normally_open(True)
+            terminal.traced_phases.set_current(SinglePhaseKind.A, PhaseDirection.IN, SinglePhaseKind.A)
+            feeder.add_current_equipment(junction)
+            junction.add_current_feeder(feeder)
+            feeder.remove_current_equipment(breaker)
+            breaker.remove_current_feeder(feeder)
+
+            assert breaker.is_open(SinglePhaseKind.A)
+            assert not breaker.is_open(SinglePhaseKind.B)
+            assert breaker.is_normally_open()
+            assert terminal.traced_phases.phase_current(SinglePhaseKind.A) == SinglePhaseKind.A
+            assert list(feeder.current_equipment) == [junction]
+            assert list(junction.current_feeders) == [feeder]
+            assert breaker.num_current_feeders() == 0
+            # The breaker, the terminal's traced phases, the feeder and the junction.
+            assert scenario.num_changed_objects() == 4
+
+        assert active_scenario() is None
+        assert not breaker.is_open()
+        assert not breaker.is_normally_open()
+        assert terminal.traced_phases.phase_current(SinglePhaseKind.A) == SinglePhaseKind.NONE
+        assert list(feeder.current_equipment) == [breaker]
+        assert junction.num_current_feeders() == 0
+        assert list(breaker.current_feeders) == [feeder]
+
+        # Changes are kept in the scenario for the next time it is entered.
+        with scenario:
+            assert breaker.is_open(SinglePhaseKind.A)
+            assert list(feeder.current_equipment) == [junction]
+
+    def test_scenarios_branch_from_the_network(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        ns.add(breaker)
+
+        first = ns.fork()
+        second = ns.fork()
+        with first:
+            breaker.set_open(True)
+            with second:
+                assert not breaker.is_open()
+                breaker.set_open(True, SinglePhaseKind.B)
+            assert breaker.get_state() == 0b1111
+
+        with second:
+            assert breaker.get_state() == SinglePhaseKind.B.bit_mask
+        assert breaker.get_state() == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(False, False)], indirect=True)
+    async def test_concurrent_scenarios(self, feeder_start_point_to_open_point_network):
+        network = feeder_start_point_to_open_point_network
+        feeder = network.get("f")
+        op = network.get("op")
+
+        async def run(open_point: bool):
+            with network.fork():
+                op.set_open(open_point)
+                # Give the other scenario a chance to run part way through.
+                await asyncio.sleep(0)
+                await assign_equipment_containers_to_feeders().run(network)
+                return {eq.mrid for eq in feeder.current_equipment}
+
+        opened, closed = await asyncio.gather(run(True), run(False))
+
+        assert opened == {"fsp", "c1", "op"}
+        assert closed == {"fsp", "c1", "op", "c2"}
+        assert not op.is_open()
+        assert feeder.num_current_equipment() == 0
+
+    @pytest.mark.asyncio
+    async def test_tasks_sharing_a_scenario(self):
+        ns = NetworkService()
+        breaker = Breaker("b1")
+        ns.add(breaker)
+        scenario = ns.fork()
+        first_entered = asyncio.Event()
+        second_entered = asyncio.Event()
+
+        async def first():
+            with scenario:
+                first_entered.set()
+                await second_entered.wait()
+                breaker.set_open(True, SinglePhaseKind.A)
+                await asyncio.sleep(0)
+            # The second task is still in the scenario, but this one has left it.
+            assert active_scenario() is None
+            assert not breaker.is_open()
+
+        async def second():
+            await first_entered.wait()
+            with scenario:
+                second_entered.set()
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+                assert active_scenario() is scenario
+                assert breaker.is_open(SinglePhaseKind.A)
+            assert active_scenario() is None
+
+        await asyncio.gather(first(), second())
+        with scenario:
+            assert breaker.is_open(SinglePhaseKind.A)
+        assert not breaker.is_open()
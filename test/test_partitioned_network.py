@@ -0,0 +1,170 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from unittest.mock import MagicMock
+
+import pytest
+from zepben.protobuf.nc.nc_data_pb2 import NetworkIdentifiedObject, IdentifiedObjectGroup, NetworkHierarchyFeeder
+from zepben.protobuf.nc.nc_responses_pb2 import GetIdentifiedObjectsResponse, GetNetworkHierarchyResponse
+
+from zepben.evolve import NetworkService, NetworkConsumerClient, FeederPartitionedNetwork, Substation, Feeder, Breaker, AcLineSegment, Terminal, \
+    ConnectivityNode, ConductingEquipment, IdentifiedObject
+
+_NIO_FIELDS = {f.message_type.name: f.name for f in NetworkIdentifiedObject.DESCRIPTOR.oneofs_by_name["identifiedObject"].fields}
+
+
+def _create_source_network() -> NetworkService:
+    """Two feeders from the one substation, with the ends of their lines joined at a shared connectivity node."""
+    ns = NetworkService()
+    sub = Substation("sub")
+    ns.add(sub)
+    for f in ("f1", "f2"):
+        feeder = Feeder(f, normal_energizing_substation=sub)
+        sub.add_feeder(feeder)
+        ns.add(feeder)
+        previous = None
+        for ce in (Breaker(f"{f}-cb"), AcLineSegment(f"{f}-c")):
+            for sn in (1, 2):
+                t = Terminal(f"{ce.mrid}-t{sn}", conducting_equipment=ce, sequence_number=sn)
+                ce.add_terminal(t)
+                ns.add(t)
+            ce.add_container(feeder)
+            feeder.add_equipment(ce)
+            ns.add(ce)
+            if previous:
+                ns.connect_terminals(previous.get_terminal_by_sn(2), ce.get_terminal_by_sn(1))
+            previous = ce
+        ns.connect_by_mrid(previous.get_terminal_by_sn(2), "boundary")
+    return ns
+
+
+def _to_nio(io: IdentifiedObject) -> NetworkIdentifiedObject:
+    pb = io.to_pb()
+    return NetworkIdentifiedObject(**{_NIO_FIELDS[type(pb).__name__]: pb})
+
+
+def _create_stub(source: NetworkService) -> MagicMock:
+    """A stub serving the objects in `source`, sending the terminals of conducting equipment with it as the server does."""
+    def get_identified_objects(request):
+        for mrid in request.mrids:
+            io = source.get(mrid, default=None)
+            if io is not None:
+                owned = [_to_nio(t) for t in io.terminals] if isinstance(io, ConductingEquipment) else []
+                yield GetIdentifiedObjectsResponse(objectGroup=IdentifiedObjectGroup(identifiedObject=_to_nio(io), ownedIdentifiedObject=owned))
+
+    hierarchy = GetNetworkHierarchyResponse(feeders=[NetworkHierarchyFeeder(mRID=f.mrid, name=f.name) for f in source.objects(Feeder)])
+    return MagicMock(**{"getIdentifiedObjects.side_effect": get_identified_objects, "getNetworkHierarchy.return_value": hierarchy})
+
+
+class TestFeederPartitionedNetwork(object):
+
+    @pytest.mark.asyncio
+    async def test_feeders_are_loaded_on_first_access(self):
+        stub = _create_stub(_create_source_network())
+        network = FeederPartitionedNetwork(NetworkConsumerClient(stub=stub))
+
+        assert set((await network.get_network_hierarchy()).feeders) == {"f1", "f2"}
+        assert network.service.len_of() == 0
+
+        f1 = await network.get_feeder("f1")
+        assert f1 is network.service.get("f1")
+        assert {eq.mrid for eq in f1.equipment} == {"f1-cb", "f1-c"}
+        assert network.service.get("f1-c-t2").connectivity_node.mrid == "boundary"
+        assert "f2" not in network.service
+
+        num_calls = stub.getIdentifiedObjects.call_count
+        assert await network.get_feeder("f1") is f1
+        assert stub.getIdentifiedObjects.call_count == num_calls
+
+        assert await network.get_feeder("unknown") is None
+        assert list(network.loaded_feeders()) == [f1]
+
+    @pytest.mark.asyncio
+    async def test_boundary_objects_are_shared_and_kept_until_unused(self):
+        network = FeederPartitionedNetwork(NetworkConsumerClient(stub=_create_stub(_create_source_network())))
+        service = network.service
+
+        await network.get_feeder("f1")
+        f2 = await network.get_feeder("f2")
+        boundary: ConnectivityNode = service.get("boundary")
+        sub: Substation = service.get("sub")
+        assert {t.mrid for t in boundary.terminals} == {"f1-c-t2", "f2-c-t2"}
+        assert {f.mrid for f in sub.feeders} == {"f1", "f2"}
+
+        assert network.evict("f1")
+        assert not network.evict("f1")
+        for mrid in ("f1", "f1-cb", "f1-c", "f1-cb-t1", "f1-c-t2"):
+            assert mrid not in service
+        assert service.get("boundary") is boundary
+        assert service.get("sub") is sub
+        assert [t.mrid for t in boundary.terminals] == ["f2-c-t2"]
+        assert list(sub.feeders) == [f2]
+        assert not service.has_unresolved_references()
+
+        # Reloading relinks the shared objects.
+        f1 = await network.get_feeder("f1")
+        assert {t.mrid for t in boundary.terminals} == {"f1-c-t2", "f2-c-t2"}
+        assert set(sub.feeders) == {f1, f2}
+
+        network.evict("f1")
+        network.evict("f2")
+        assert service.len_of() == 0
+
+    @pytest.mark.asyncio
+    async def test_cold_feeders_are_evicted_over_budget(self):
+        network = FeederPartitionedNetwork(NetworkConsumerClient(stub=_create_stub(_create_source_network())))
+        f1 = await network.get_feeder("f1")
+        network.max_objects = network.service.len_of()
+
+        f2 = await network.get_feeder("f2")
+        assert not network.is_loaded("f1")
+        assert list(network.loaded_feeders()) == [f2]
+        assert "f1-cb" not in network.service
+
+        network.max_objects = None
+        f1 = await network.get_feeder("f1")
+        await network.get_feeder("f2")
+        assert list(network.loaded_feeders()) == [f1, f2]
+
+    @pytest.mark.asyncio
+    async def test_eviction_updates_indexes(self):
+        network = FeederPartitionedNetwork(NetworkConsumerClient(stub=_create_stub(_create_source_network())))
+        service = network.service
+        await network.get_feeder("f1")
+        await network.get_feeder("f2")
+        service.add_index("num_feeders", Substation, lambda sub: sub.num_feeders())
+        service.add_index("num_terminals", ConnectivityNode, lambda cn: cn.num_terminals())
+        sub, boundary = service.get("sub"), service.get("boundary")
+        assert list(service.find("num_feeders", 2)) == [sub]
+        assert boundary in service.find("num_terminals", 2)
+
+        network.evict("f1")
+        assert list(service.find("num_feeders", 2)) == []
+        assert list(service.find("num_feeders", 1)) == [sub]
+        assert boundary not in service.find("num_terminals", 2)
+        assert boundary in service.find("num_terminals", 1)
+
+    @pytest.mark.asyncio
+    async def test_eviction_clears_scenario_references(self):
+        network = FeederPartitionedNetwork(NetworkConsumerClient(stub=_create_stub(_create_source_network())))
+        service = network.service
+        f1 = await network.get_feeder("f1")
+        f2 = await network.get_feeder("f2")
+        f1_c, f2_c = service.get("f1-c"), service.get("f2-c")
+
+        scenario = service.fork()
+        with scenario:
+            # Feed the end of f2 from f1 in the scenario only.
+            f2_c.add_current_feeder(f1)
+            f1.add_current_equipment(f2_c)
+            f1_c.add_current_feeder(f1)
+            f2.add_current_equipment(f2_c)
+        assert scenario.num_changed_objects() == 4
+
+        network.evict("f1")
+        assert scenario.num_changed_objects() == 2
+        with scenario:
+            assert f2_c.num_current_feeders() == 0
+            assert list(f2.current_equipment) == [f2_c]
@@ -5,7 +5,11 @@
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
 import pytest
-from zepben.evolve import SetPhases, phase_log, PhaseDirection, SinglePhaseKind
+from zepben.evolve import SetPhases, phase_log, PhaseDirection, SinglePhaseKind, NetworkService, PhaseCode, Terminal, normal_phases, BulkSetPhases, \
+    compile_topology
+from zepben.evolve.exceptions import TracingException, PhaseException
+from test.network_fixtures import create_source_for_connecting, create_acls_for_connecting, create_switch_for_connecting, \
+    create_junction_for_connecting, create_substation
 from test.util import get_terminal, check_phases
 
 A = SinglePhaseKind.A
@@ -72,3 +76,191 @@ class TestSetPhase(object):
         check_phases(get_terminal(network2, "junc7", 0), [B], [IN])
 
 
+def _create_switched_loop_network():
+    #
+    # s -- c1 -- j1 -- c2 -- sw1 -- c3 -- j2 -- c6 -- sw3 -- c7
+    #             |                       |
+    #             +-- c4 -- sw2 -- c5 ----+
+    #
+    network = NetworkService()
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABC)
+    j1 = create_junction_for_connecting(network, "j1", 3, PhaseCode.ABC)
+    j2 = create_junction_for_connecting(network, "j2", 3, PhaseCode.ABC)
+    c = {i: create_acls_for_connecting(network, f"c{i}", PhaseCode.AB if i == 7 else PhaseCode.ABC) for i in range(1, 8)}
+    sw = {i: create_switch_for_connecting(network, f"sw{i}", 2, PhaseCode.ABC) for i in range(1, 4)}
+
+    network.connect_terminals(s.get_terminal_by_sn(1), c[1].get_terminal_by_sn(1))
+    network.connect_terminals(c[1].get_terminal_by_sn(2), j1.get_terminal_by_sn(1))
+    for (j1_sn, first, switch, second, j2_sn) in ((2, 2, 1, 3, 1), (3, 4, 2, 5, 2)):
+        network.connect_terminals(j1.get_terminal_by_sn(j1_sn), c[first].get_terminal_by_sn(1))
+        network.connect_terminals(c[first].get_terminal_by_sn(2), sw[switch].get_terminal_by_sn(1))
+        network.connect_terminals(sw[switch].get_terminal_by_sn(2), c[second].get_terminal_by_sn(1))
+        network.connect_terminals(c[second].get_terminal_by_sn(2), j2.get_terminal_by_sn(j2_sn))
+    network.connect_terminals(j2.get_terminal_by_sn(3), c[6].get_terminal_by_sn(1))
+    network.connect_terminals(c[6].get_terminal_by_sn(2), sw[3].get_terminal_by_sn(1))
+    network.connect_terminals(sw[3].get_terminal_by_sn(2), c[7].get_terminal_by_sn(1))
+    return network
+
+
+def _traced_phases(network):
+    return {t.mrid: (t.traced_phases.normal_status, t.traced_phases.current_status) for t in network.objects(Terminal)}
+
+
+async def _phases_from_full_run(network):
+    for t in network.objects(Terminal):
+        t.traced_phases.normal_status = 0
+        t.traced_phases.current_status = 0
+    await SetPhases().run(network)
+    return _traced_phases(network)
+
+
+class TestRunSwitch(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("normal", [False, True])
+    @pytest.mark.parametrize("operations", [
+        ["sw1"],
+        ["sw3"],
+        ["sw1", "sw2"],
+        ["sw2", "sw1", "sw1", "sw2"],
+        ["sw3", "sw1", "sw2", "sw3", "sw2"],
+    ])
+    async def test_matches_full_run(self, normal, operations):
+        network = _create_switched_loop_network()
+        set_phases = SetPhases()
+        await set_phases.run(network)
+
+        for mrid in operations:
+            switch = network.get(mrid)
+            if normal:
+                switch.set_normally_open(not switch.is_normally_open())
+            else:
+                switch.set_open(not switch.is_open())
+            await set_phases.run_switch(network, switch, normal)
+
+            incremental = _traced_phases(network)
+            assert incremental == await _phases_from_full_run(network)
+
+    @pytest.mark.asyncio
+    async def test_opening_removes_downstream_phases(self):
+        network = _create_switched_loop_network()
+        set_phases = SetPhases()
+        await set_phases.run(network)
+
+        network.get("sw3").set_open(True)
+        retraced = await set_phases.run_switch(network, network.get("sw3"))
+
+        assert {t.mrid for t in retraced} == {network.get("sw3").get_terminal_by_sn(2).mrid} | {t.mrid for t in network.get("c7").terminals}
+        c7_terminal = network.get("c7").get_terminal_by_sn(1)
+        assert normal_phases(c7_terminal, A).direction() == IN
+        assert c7_terminal.traced_phases.current_status == 0
+
+
+def _create_substation_network():
+    #
+    # s -- fcb -- c1 -- j -- c2(AB) -- c3(XY)
+    #                   |
+    #                   +-- c4(A)
+    #
+    network = NetworkService()
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABCN)
+    fcb = create_switch_for_connecting(network, "fcb", 2, PhaseCode.ABCN)
+    c1 = create_acls_for_connecting(network, "c1", PhaseCode.ABCN)
+    j = create_junction_for_connecting(network, "j", 3, PhaseCode.ABCN)
+    c2 = create_acls_for_connecting(network, "c2", PhaseCode.AB)
+    c3 = create_acls_for_connecting(network, "c3", PhaseCode.XY)
+    c4 = create_acls_for_connecting(network, "c4", PhaseCode.A)
+
+    sub = create_substation(network, "sub")
+    fcb.add_container(sub)
+    sub.add_equipment(fcb)
+
+    network.connect_terminals(s.get_terminal_by_sn(1), fcb.get_terminal_by_sn(1))
+    network.connect_terminals(fcb.get_terminal_by_sn(2), c1.get_terminal_by_sn(1))
+    network.connect_terminals(c1.get_terminal_by_sn(2), j.get_terminal_by_sn(1))
+    network.connect_terminals(j.get_terminal_by_sn(2), c2.get_terminal_by_sn(1))
+    network.connect_terminals(c2.get_terminal_by_sn(2), c3.get_terminal_by_sn(1))
+    network.connect_terminals(j.get_terminal_by_sn(3), c4.get_terminal_by_sn(1))
+    return network
+
+
+class TestBulkSetPhases(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("create_network", [_create_switched_loop_network, _create_substation_network])
+    async def test_matches_set_phases_on_radial_networks(self, create_network):
+        expected = create_network()
+        actual = create_network()
+        for network in (expected, actual):
+            if network.get("sw2", default=None):
+                network.get("sw2").set_normally_open(True)
+                network.get("sw1").set_open(True)
+                network.get("sw3").set_open(True, A)
+
+        await SetPhases().run(expected)
+        await BulkSetPhases().run(actual)
+
+        assert _traced_phases(actual) == _traced_phases(expected)
+        assert any(status for status, _ in _traced_phases(actual).values())
+
+    @pytest.mark.asyncio
+    async def test_reuses_topology(self):
+        network = _create_switched_loop_network()
+        topology = compile_topology(network)
+        await BulkSetPhases().run(network, topology)
+
+        network.get("sw1").set_open(True)
+        network.get("sw2").set_open(True)
+        topology.refresh_open_states()
+        expected = _traced_phases(network)
+        for t in network.objects(Terminal):
+            t.traced_phases.current_status = 0
+        await BulkSetPhases().run(network, topology)
+
+        assert network.get("c3").get_terminal_by_sn(1).traced_phases.current_status == 0
+        assert {mrid: normal for mrid, (normal, _) in _traced_phases(network).items()} == {mrid: normal for mrid, (normal, _) in expected.items()}
+
+    @pytest.mark.asyncio
+    async def test_flows_around_loops(self):
+        network = _create_switched_loop_network()
+        await BulkSetPhases().run(network)
+
+        for t in network.objects(Terminal):
+            assert t.traced_phases.normal_status and t.traced_phases.current_status, t.mrid
+        for sn in (1, 2):
+            assert normal_phases(network.get("c3").get_terminal_by_sn(sn), A).direction() == BOTH
+
+    @pytest.mark.asyncio
+    async def test_differs_from_set_phases_on_loops(self):
+        expected = _create_switched_loop_network()
+        actual = _create_switched_loop_network()
+        await SetPhases().run(expected)
+        await BulkSetPhases().run(actual)
+
+        # Phases flowing around the loop through sw1 and sw2 come back out of j1 towards the source, where `SetPhases` stops at the terminals
+        # it has already traced. Everything else, including the loop itself, is the same.
+        feeding = {("s", 1): OUT, ("c1", 1): IN, ("c1", 2): OUT, ("j1", 1): IN}
+        for (mrid, sn), direction in feeding.items():
+            assert normal_phases(expected.get(mrid).get_terminal_by_sn(sn), A).direction() == direction
+            assert normal_phases(actual.get(mrid).get_terminal_by_sn(sn), A).direction() == BOTH
+
+        feeding_mrids = {actual.get(mrid).get_terminal_by_sn(sn).mrid for mrid, sn in feeding}
+        expected_phases, actual_phases = _traced_phases(expected), _traced_phases(actual)
+        assert {mrid for mrid in actual_phases if actual_phases[mrid] != expected_phases[mrid]} == feeding_mrids
+
+    @pytest.mark.asyncio
+    async def test_crossing_phases(self):
+        network = NetworkService()
+        s1 = create_source_for_connecting(network, "s1", 1, PhaseCode.AB)
+        s2 = create_source_for_connecting(network, "s2", 1, PhaseCode.BC)
+        c1 = create_acls_for_connecting(network, "c1", PhaseCode.XY)
+        network.connect_terminals(s1.get_terminal_by_sn(1), c1.get_terminal_by_sn(1))
+        network.connect_terminals(s2.get_terminal_by_sn(1), c1.get_terminal_by_sn(2))
+
+        with pytest.raises(PhaseException):
+            await BulkSetPhases().run(network)
+
+    @pytest.mark.asyncio
+    async def test_requires_sources(self):
+        with pytest.raises(TracingException):
+            await BulkSetPhases().run(NetworkService())
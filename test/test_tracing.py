@@ -5,7 +5,7 @@
 #  file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
 import pytest
-from zepben.evolve import BranchRecursiveTraversal, Traversal, FifoQueue, LifoQueue
+from zepben.evolve import BranchRecursiveTraversal, Traversal, FifoQueue, LifoQueue, BitsetTracker, DenseIds, Terminal, Tracker, create_basic_depth_trace
 from typing import List, Optional, Set
 
 
@@ -104,6 +104,58 @@ class TestTracing(object):
         for x in range(3, 4):
             assert x in stopping_on
 
+    @pytest.mark.asyncio
+    async def test_sync_callbacks(self):
+        visit_order = []
+        stopping_on = []
+
+        def action(i, s):
+            visit_order.append(i)
+            if s:
+                stopping_on.append(i)
+
+        t = Traversal(queue_next=queue_next, start_item=1, process_queue=FifoQueue(), stop_conditions=[lambda i: i >= 6], step_actions=[action])
+        await validate_run(t, visit_order=visit_order, expected_order=[1, 2, 3, 4, 5, 6, 7])
+        assert stopping_on == [6, 7]
+
+        t = Traversal(queue_next=queue_next, start_item=1, process_queue=LifoQueue(), stop_conditions=[lambda i: i >= 0, lambda i: i >= 6],
+                      step_actions=[action])
+        await _validate_can_stop(t, visit_order=visit_order, expected_order=[1, 3, 2])
+
+    @pytest.mark.asyncio
+    async def test_mixed_sync_and_async_callbacks(self):
+        visit_order = []
+        async_visits = []
+
+        async def async_action(i, s):
+            async_visits.append(i)
+
+        t = Traversal(queue_next=queue_next, start_item=1, process_queue=FifoQueue(), stop_conditions=[lambda i: i >= 6],
+                      step_actions=[lambda i, s: visit_order.append(i), async_action])
+        await validate_run(t, visit_order=visit_order, expected_order=[1, 2, 3, 4, 5, 6, 7])
+        assert async_visits == visit_order
+
+    @pytest.mark.asyncio
+    async def test_plain_functions_returning_coroutines(self):
+        visit_order = []
+        async_visits = []
+
+        async def never_stop(i):
+            return False
+
+        async def stop_from_6(i):
+            return i >= 6
+
+        async def async_action(i, s):
+            async_visits.append(i)
+
+        # Plain functions that wrap coroutine functions return coroutines, which are awaited rather than treated as truthy.
+        t = Traversal(queue_next=queue_next, start_item=1, process_queue=FifoQueue(),
+                      stop_conditions=[lambda i: never_stop(i), lambda i: i >= 100, lambda i: stop_from_6(i)],
+                      step_actions=[lambda i, s: visit_order.append(i), lambda i, s: async_action(i, s)])
+        await validate_run(t, visit_order=visit_order, expected_order=[1, 2, 3, 4, 5, 6, 7])
+        assert async_visits == visit_order
+
 
 def queue_next_br(item: int, traversal: BranchRecursiveTraversal, exclude: Optional[Set[int]] = None):
     if item == 0:
@@ -164,3 +216,130 @@ class TestBranchRecursiveTraversal(object):
         t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next_br, process_queue=LifoQueue(), branch_queue=FifoQueue(), step_actions=[action],
                                      stop_conditions=[cond1, cond2])
         await _validate_can_stop(t, visited, [0, 1, 2, 3, 3, 2, 1], check_visited=False)
+
+    @pytest.mark.asyncio
+    async def test_sync_callbacks(self):
+        visited = list()
+        self.stop_count = 0
+
+        def cond(i):
+            self.stop_count += 1
+            return False
+
+        t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next_br, process_queue=LifoQueue(), branch_queue=FifoQueue(),
+                                     step_actions=[lambda i, s: visited.append(i)], stop_conditions=[cond])
+        await validate_run(t, visited, [0, 1, 2, 3, 3, 2, 1], check_visited=False)
+        assert self.stop_count == len(visited)
+
+    @pytest.mark.asyncio
+    async def test_plain_functions_returning_coroutines(self):
+        visited = list()
+
+        async def never_stop(i):
+            return False
+
+        async def action(i, s):
+            visited.append(i)
+
+        t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next_br, process_queue=LifoQueue(), branch_queue=FifoQueue(),
+                                     step_actions=[lambda i, s: action(i, s)], stop_conditions=[lambda i: never_stop(i)])
+        await validate_run(t, visited, [0, 1, 2, 3, 3, 2, 1], check_visited=False)
+
+    @pytest.mark.asyncio
+    async def test_bitset_tracker(self):
+        visited = list()
+        t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next_br, process_queue=LifoQueue(), branch_queue=FifoQueue(),
+                                     step_actions=[lambda i, s: visited.append(i)], tracker=BitsetTracker(key=lambda i: i))
+        await validate_run(t, visited, [0, 1, 2, 3, 3, 2, 1], check_visited=False)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tracker", [Tracker(), BitsetTracker(key=lambda i: i)])
+    async def test_branches_skip_items_visited_by_parents(self, tracker):
+        visited = list()
+
+        def queue_next(item, traversal, _):
+            # The root queues 10 after branching to 1, which branches to 2, which tries to queue 10 and 11.
+            if item == 0:
+                branch = traversal.create_branch()
+                branch.start_item = 1
+                traversal.branch_queue.put(branch)
+                traversal.process_queue.put(10)
+            elif item == 1:
+                branch = traversal.create_branch()
+                branch.start_item = 2
+                traversal.branch_queue.put(branch)
+            elif item == 2:
+                traversal.process_queue.put(10)
+                traversal.process_queue.put(11)
+
+        t = BranchRecursiveTraversal(start_item=0, queue_next=queue_next, process_queue=FifoQueue(), branch_queue=FifoQueue(),
+                                     step_actions=[lambda i, s: visited.append(i)], tracker=tracker)
+        await t.trace()
+        assert visited == [0, 10, 1, 2, 11]
+
+
+class TestBasicDepthTrace(object):
+
+    @pytest.mark.asyncio
+    async def test_traces_any_items(self):
+        visited = []
+        t = create_basic_depth_trace(lambda i, _: [i + 1, i * 2] if i < 1000 else [])
+        t.add_step_action(lambda i, s: visited.append(i))
+        await t.trace(1)
+        assert sorted(visited) == sorted(set(range(1, 1001)) | {i * 2 for i in range(501, 1000)})
+
+
+class TestBitsetTracker(object):
+
+    def test_visit(self):
+        terminals = [Terminal(f"t{i}") for i in range(20)]
+        tracker = BitsetTracker()
+
+        assert tracker.visit(terminals[0])
+        assert not tracker.visit(terminals[0])
+        assert tracker.visit(terminals[17])
+        assert tracker.has_visited(terminals[17])
+        assert terminals[0] in tracker.visited
+        assert terminals[1] not in tracker.visited
+        assert not tracker.has_visited(Terminal("t0-copy"))
+        # Separate objects are tracked separately, even when they share an mRID.
+        assert not tracker.has_visited(Terminal("t0"))
+        assert len(tracker) == 2
+
+        tracker.clear()
+        assert len(tracker) == 0
+        assert not tracker.has_visited(terminals[0])
+
+    def test_copy(self):
+        terminals = [Terminal(f"t{i}") for i in range(3)]
+        tracker = BitsetTracker()
+        tracker.visit(terminals[0])
+
+        copy = tracker.copy()
+        copy.visit(terminals[1])
+        assert copy.has_visited(terminals[0])
+        assert not tracker.has_visited(terminals[1])
+
+        # Ids are shared, so items first seen by the copy are tracked consistently by the original.
+        tracker.visit(terminals[2])
+        assert not copy.has_visited(terminals[2])
+        assert tracker.has_visited(terminals[2])
+
+    def test_dense_ids(self):
+        ids = DenseIds()
+        a, b, c = Terminal("a"), Terminal("b"), Terminal("c")
+        assert [ids(t) for t in (a, b, a, c, Terminal("a"))] == [0, 1, 0, 2, 3]
+        assert len(ids) == 4
+
+    def test_update(self):
+        tracker = BitsetTracker(key=lambda i: i)
+        tracker.visit(1)
+        other = tracker.copy()
+        other.clear()
+        other.visit(3)
+        other.visit(100)
+
+        tracker.update(other)
+        assert [i for i in range(101) if tracker.has_visited(i)] == [1, 3, 100]
+        with pytest.raises(ValueError):
+            tracker.update(BitsetTracker())
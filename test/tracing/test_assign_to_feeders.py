@@ -6,7 +6,10 @@
 from typing import Iterable
 
 import pytest
-from zepben.evolve import assign_equipment_containers_to_feeders, Equipment
+from zepben.evolve import assign_equipment_containers_to_feeders, Equipment, AssignToFeeders, Feeder, NetworkService, PhaseCode, Switch
+
+from test.network_fixtures import create_source_for_connecting, create_acls_for_connecting, create_switch_for_connecting, \
+    create_junction_for_connecting, create_substation, create_feeder
 
 
 def validate_equipment(equipment: Iterable[Equipment], *expected_mrids: str):
@@ -15,6 +18,60 @@ def validate_equipment(equipment: Iterable[Equipment], *expected_mrids: str):
         assert mrid in equip_mrids
 
 
+def create_looped_feeders_network() -> NetworkService:
+    #
+    # s -- f1 -- c1 -- j1 -- c2 -- op -- c3 -- j2 -- f2 -- c5
+    #                  |                      |
+    #                  +-------- c4 ----------+
+    #
+    network = NetworkService()
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABC)
+    f1 = create_switch_for_connecting(network, "f1cb", 2, PhaseCode.ABC)
+    f2 = create_switch_for_connecting(network, "f2cb", 2, PhaseCode.ABC)
+    op = create_switch_for_connecting(network, "op", 2, PhaseCode.ABC)
+    j1 = create_junction_for_connecting(network, "j1", 3, PhaseCode.ABC)
+    j2 = create_junction_for_connecting(network, "j2", 3, PhaseCode.ABC)
+    c = {i: create_acls_for_connecting(network, f"c{i}", PhaseCode.ABC) for i in range(1, 6)}
+    op.set_normally_open(True)
+
+    for (ce1, sn1), (ce2, sn2) in (((s, 1), (f1, 1)), ((f1, 2), (c[1], 1)), ((c[1], 2), (j1, 1)), ((j1, 2), (c[2], 1)), ((c[2], 2), (op, 1)),
+                                   ((op, 2), (c[3], 1)), ((c[3], 2), (j2, 1)), ((j1, 3), (c[4], 1)), ((c[4], 2), (j2, 2)), ((j2, 3), (f2, 1)),
+                                   ((f2, 2), (c[5], 1))):
+        network.connect_terminals(ce1.get_terminal_by_sn(sn1), ce2.get_terminal_by_sn(sn2))
+
+    sub = create_substation(network, "sub")
+    create_feeder(network, "feeder1", "feeder1", sub, f1.get_terminal_by_sn(2))
+    create_feeder(network, "feeder2", "feeder2", sub, f2.get_terminal_by_sn(2))
+    return network
+
+
+def create_tied_feeders_network() -> NetworkService:
+    #
+    # s1 -- f1cb -- c1 -- sw1 -- c2 -- op -- c3 -- sw2 -- c4 -- f2cb -- s2
+    #
+    network = NetworkService()
+    chain = [create_source_for_connecting(network, "s1", 1, PhaseCode.ABC)]
+    for mrid in ("f1cb", "c1", "sw1", "c2", "op", "c3", "sw2", "c4", "f2cb"):
+        if mrid.startswith("c"):
+            chain.append(create_acls_for_connecting(network, mrid, PhaseCode.ABC))
+        else:
+            chain.append(create_switch_for_connecting(network, mrid, 2, PhaseCode.ABC))
+    chain.append(create_source_for_connecting(network, "s2", 1, PhaseCode.ABC))
+    for ce1, ce2 in zip(chain, chain[1:]):
+        network.connect_terminals(ce1.get_terminal_by_sn(len(list(ce1.terminals))), ce2.get_terminal_by_sn(1))
+    network.get("op").set_normally_open(True)
+    network.get("op").set_open(True)
+
+    sub = create_substation(network, "sub")
+    create_feeder(network, "feeder1", "feeder1", sub, network.get("f1cb").get_terminal_by_sn(2))
+    create_feeder(network, "feeder2", "feeder2", sub, network.get("f2cb").get_terminal_by_sn(1))
+    return network
+
+
+def feeder_equipment(network: NetworkService):
+    return {feeder.mrid: ({e.mrid for e in feeder.equipment}, {e.mrid for e in feeder.current_equipment}) for feeder in network.objects(Feeder)}
+
+
 class TestAssignToFeeders(object):
 
     @pytest.mark.asyncio
@@ -31,5 +88,86 @@ class TestAssignToFeeders(object):
         validate_equipment(feeder.equipment, "fsp", "c1", "op")
         validate_equipment(feeder.current_equipment, "fsp", "c1", "op", "c2")
 
+    @pytest.mark.asyncio
+    async def test_traces_loops(self):
+        network = create_looped_feeders_network()
+        await AssignToFeeders().run(network)
+
+        assert feeder_equipment(network) == {
+            "feeder1": ({"f1cb", "c1", "j1", "c2", "op", "c4", "j2", "c3", "f2cb"}, {"f1cb", "c1", "j1", "c2", "op", "c3", "c4", "j2", "f2cb"}),
+            "feeder2": ({"f2cb", "c5"}, {"f2cb", "c5"}),
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(True, False), (False, True)], indirect=True)
+    async def test_single_pass_matches_per_feeder(self, feeder_start_point_to_open_point_network, feeder_start_point_between_conductors_network):
+        for create_network in (lambda: feeder_start_point_to_open_point_network, lambda: feeder_start_point_between_conductors_network,
+                               create_looped_feeders_network):
+            per_feeder = create_network()
+            await AssignToFeeders().run(per_feeder)
+            expected = feeder_equipment(per_feeder)
+            for feeder in per_feeder.objects(Feeder):
+                for ce in list(feeder.equipment):
+                    ce.remove_containers(feeder)
+                for ce in list(feeder.current_equipment):
+                    ce.remove_current_feeder(feeder)
+                feeder.clear_equipment()
+                feeder.clear_current_equipment()
+
+            await AssignToFeeders().run(per_feeder, single_pass=True)
+            assert feeder_equipment(per_feeder) == expected
+            for feeder in per_feeder.objects(Feeder):
+                assert all(feeder.mrid in {f.mrid for f in ce.normal_feeders} for ce in feeder.equipment)
+                assert all(feeder.mrid in {f.mrid for f in ce.current_feeders} for ce in feeder.current_equipment)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("normal", [False, True])
+    @pytest.mark.parametrize("operations", [
+        ["op"],
+        ["sw1"],
+        ["op", "sw1"],
+        ["sw2", "op", "sw1", "sw2"],
+        ["f1cb", "op", "f1cb"],
+    ])
+    async def test_run_switches_matches_full_run(self, normal, operations):
+        network = create_tied_feeders_network()
+        assign_to_feeders = AssignToFeeders()
+        await assign_to_feeders.run(network)
+
+        for mrid in operations:
+            switch = network.get(mrid)
+            if normal:
+                switch.set_normally_open(not switch.is_normally_open())
+            else:
+                switch.set_open(not switch.is_open())
+            await assign_to_feeders.run_switches(network, [switch], normal)
+
+            expected = create_tied_feeders_network()
+            for ce in network.objects(Switch):
+                expected.get(ce.mrid).set_normally_open(ce.is_normally_open())
+                expected.get(ce.mrid).set_open(ce.is_open())
+            await AssignToFeeders().run(expected)
+
+            assert feeder_equipment(network) == feeder_equipment(expected)
+            for feeder in network.objects(Feeder):
+                assert all(feeder.mrid in {f.mrid for f in ce.normal_feeders} for ce in feeder.equipment)
+                assert all(feeder.mrid in {f.mrid for f in ce.current_feeders} for ce in feeder.current_equipment)
+            for ce in network.objects(Equipment):
+                assert all(ce.mrid in {e.mrid for e in f.equipment} for f in ce.normal_feeders)
+                assert all(ce.mrid in {e.mrid for e in f.current_equipment} for f in ce.current_feeders)
+
+    @pytest.mark.asyncio
+    async def test_run_switches_only_retraces_affected_feeders(self):
+        network = create_tied_feeders_network()
+        assign_to_feeders = AssignToFeeders()
+        await assign_to_feeders.run(network)
 
+        network.get("sw1").set_open(True)
+        assert [f.mrid for f in await assign_to_feeders.run_switches(network, [network.get("sw1")])] == ["feeder1"]
+        assert feeder_equipment(network)["feeder1"][1] == {"f1cb", "c1", "sw1"}
+        assert {f.mrid for f in network.get("c2").current_feeders} == set()
+        assert {f.mrid for f in network.get("c2").normal_feeders} == {"feeder1"}
 
+        network.get("op").set_open(False)
+        assert {f.mrid for f in await assign_to_feeders.run_switches(network, [network.get("op")])} == {"feeder2"}
+        assert feeder_equipment(network)["feeder2"][1] == {"f2cb", "c4", "sw2", "c3", "op", "c2", "sw1"}
@@ -23,3 +23,5 @@ def test_associated_terminal_tracker():
     assert not tracker.has_visited(t1)
     assert tracker.visit(t1)
     assert tracker.has_visited(t1)
+    assert not tracker.visit(t1)
+    assert not tracker.visit(acls1.get_terminal_by_sn(2))
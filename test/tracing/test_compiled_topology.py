@@ -0,0 +1,92 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import compile_topology, connected_equipment_trace, SinglePhaseKind, NetworkService, PhaseCode
+from test.network_fixtures import create_acls_for_connecting, create_switch_for_connecting, create_junction_for_connecting
+
+
+def _mrids(equipment):
+    return [ce.mrid for ce in equipment]
+
+
+class TestCompiledTopology(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(True, True)], indirect=True)
+    async def test_matches_connected_equipment_trace(self, feeder_start_point_to_open_point_network):
+        network = feeder_start_point_to_open_point_network
+        topology = compile_topology(network)
+        start = network.get("fsp")
+
+        visited = set()
+
+        async def visit(ce, _):
+            visited.add(ce.mrid)
+
+        trace = connected_equipment_trace()
+        trace.add_step_action(visit)
+        await trace.trace(start)
+
+        assert set(_mrids(topology.trace(start))) == visited
+        assert _mrids(topology.trace(start)) == ["fsp", "c1", "op", "c2"]
+
+    def test_csr_layout(self, feeder_start_point_between_conductors_network):
+        topology = compile_topology(feeder_start_point_between_conductors_network)
+
+        for e, ce in enumerate(topology.equipment):
+            assert topology.equipment_index(ce.mrid) == e
+            terminals = range(topology.equipment_offsets[e], topology.equipment_offsets[e + 1])
+            assert [topology.terminals[t] for t in terminals] == list(ce.terminals)
+            assert all(topology.terminal_equipment[t] == e for t in terminals)
+
+        for n, cn in enumerate(topology.connectivity_nodes):
+            node_terminals = topology.node_terminals[topology.node_offsets[n]:topology.node_offsets[n + 1]]
+            assert {topology.terminals[t].mrid for t in node_terminals} == {t.mrid for t in cn.terminals}
+
+        c1 = topology.equipment_index("c1")
+        assert topology.terminal_phases[topology.equipment_offsets[c1]] == SinglePhaseKind.A.bit_mask
+
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(True, False)], indirect=True)
+    def test_stops_at_open_switches(self, feeder_start_point_to_open_point_network):
+        network = feeder_start_point_to_open_point_network
+        topology = compile_topology(network)
+        fsp = network.get("fsp")
+
+        assert _mrids(topology.trace(fsp, topology.normally_open_phases)) == ["fsp", "c1", "op"]
+        assert _mrids(topology.trace(fsp, topology.currently_open_phases)) == ["fsp", "c1", "op", "c2"]
+        assert _mrids(topology.trace(fsp)) == ["fsp", "c1", "op", "c2"]
+
+        network.get("op").set_open(True)
+        assert _mrids(topology.trace(fsp, topology.currently_open_phases)) == ["fsp", "c1", "op", "c2"]
+        topology.refresh_open_states()
+        assert _mrids(topology.trace(fsp, topology.currently_open_phases)) == ["fsp", "c1", "op"]
+
+    @pytest.mark.parametrize('feeder_start_point_to_open_point_network', [(False, False)], indirect=True)
+    def test_stop_at(self, feeder_start_point_to_open_point_network):
+        network = feeder_start_point_to_open_point_network
+        topology = compile_topology(network)
+
+        assert _mrids(topology.trace(network.get("fsp"), stop_at=[network.get("c1")])) == ["fsp", "c1"]
+        assert _mrids(topology.trace(network.get("c1"), stop_at=[network.get("c1"), network.get("op")])) == ["c1", "fsp", "op"]
+
+    def test_traces_phases(self):
+        network = NetworkService()
+        j = create_junction_for_connecting(network, "j", 2, PhaseCode.AB)
+        c1 = create_acls_for_connecting(network, "c1", PhaseCode.A)
+        c2 = create_acls_for_connecting(network, "c2", PhaseCode.B)
+        sw = create_switch_for_connecting(network, "sw", 2, PhaseCode.AB)
+        c3 = create_acls_for_connecting(network, "c3", PhaseCode.AB)
+        network.connect_terminals(j.get_terminal_by_sn(1), c1.get_terminal_by_sn(1))
+        network.connect_terminals(j.get_terminal_by_sn(2), c2.get_terminal_by_sn(1))
+        network.connect_terminals(c1.get_terminal_by_sn(2), sw.get_terminal_by_sn(1))
+        network.connect_terminals(sw.get_terminal_by_sn(2), c3.get_terminal_by_sn(1))
+        sw.set_normally_open(True, SinglePhaseKind.A)
+
+        topology = compile_topology(network)
+        assert _mrids(topology.trace(j, phases=[SinglePhaseKind.A])) == ["j", "c1", "sw", "c3"]
+        assert _mrids(topology.trace(j, phases=[SinglePhaseKind.B])) == ["j", "c2"]
+        assert _mrids(topology.trace(j, topology.normally_open_phases, phases=[SinglePhaseKind.A, SinglePhaseKind.B])) == ["j", "c1", "c2", "sw"]
@@ -0,0 +1,57 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+from zepben.evolve import NetworkService, PhaseCode, SinglePhaseKind, get_connectivity
+
+from test.network_fixtures import create_acls_for_connecting, create_junction_for_connecting
+
+
+def _connectivity(terminal, phases=None, exclude=None):
+    return [(cr.to_terminal.mrid, cr.from_nominal_phases, cr.to_nominal_phases) for cr in get_connectivity(terminal, phases, exclude)]
+
+
+class TestConnectivity(object):
+
+    def test_caches_connectivity(self):
+        network = NetworkService()
+        j = create_junction_for_connecting(network, "j", 1, PhaseCode.ABC)
+        c1 = create_acls_for_connecting(network, "c1", PhaseCode.AB)
+        c2 = create_acls_for_connecting(network, "c2", PhaseCode.XY)
+        network.connect_terminals(j.get_terminal_by_sn(1), c1.get_terminal_by_sn(1))
+        t = j.get_terminal_by_sn(1)
+        network.connect_by_mrid(c2.get_terminal_by_sn(1), t.connectivity_node.mrid)
+
+        A, B, X, Y = SinglePhaseKind.A, SinglePhaseKind.B, SinglePhaseKind.X, SinglePhaseKind.Y
+        assert _connectivity(t) == [("c1_t1", [A, B], [A, B]), ("c2_t1", [A, B], [X, Y])]
+        assert _connectivity(c2.get_terminal_by_sn(1)) == [("c1_t1", [X, Y], [A, B]), ("j_t1", [X, Y], [A, B])]
+        assert _connectivity(t, {B, SinglePhaseKind.C}) == [("c1_t1", [B], [B]), ("c2_t1", [B], [Y])]
+        assert _connectivity(t, exclude={c1.get_terminal_by_sn(1)}) == [("c2_t1", [A, B], [X, Y])]
+
+        first = get_connectivity(t)
+        assert len(first) == 2 and all(a is b for a, b in zip(first, get_connectivity(t)))
+        first.clear()
+        assert _connectivity(t) == [("c1_t1", [A, B], [A, B]), ("c2_t1", [A, B], [X, Y])]
+
+    def test_cache_follows_changes(self):
+        network = NetworkService()
+        j = create_junction_for_connecting(network, "j", 1, PhaseCode.ABC)
+        c1 = create_acls_for_connecting(network, "c1", PhaseCode.ABC)
+        c2 = create_acls_for_connecting(network, "c2", PhaseCode.ABC)
+        t = j.get_terminal_by_sn(1)
+        network.connect_terminals(t, c1.get_terminal_by_sn(1))
+        A, B, C = SinglePhaseKind.A, SinglePhaseKind.B, SinglePhaseKind.C
+        assert _connectivity(t) == [("c1_t1", [A, B, C], [A, B, C])]
+
+        network.connect_by_mrid(c2.get_terminal_by_sn(1), t.connectivity_node.mrid)
+        assert _connectivity(t) == [("c1_t1", [A, B, C], [A, B, C]), ("c2_t1", [A, B, C], [A, B, C])]
+
+        c2.get_terminal_by_sn(1).phases = PhaseCode.A
+        assert _connectivity(t) == [("c1_t1", [A, B, C], [A, B, C]), ("c2_t1", [A], [A])]
+
+        network.disconnect(c1.get_terminal_by_sn(1))
+        assert _connectivity(t) == [("c2_t1", [A], [A])]
+
+        network.disconnect_by_mrid(t.connectivity_node.mrid)
+        assert _connectivity(t) == []
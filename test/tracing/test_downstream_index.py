@@ -0,0 +1,65 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import SetPhases, PhaseStep, PhaseCode, build_downstream_index, normal_downstream_trace, current_downstream_trace, compile_topology
+
+from test.tracing.test_find import create_radial_network, MRIDS
+
+
+async def _traced_downstream(trace, ce):
+    reached = set()
+    traversal = trace()
+    traversal.add_step_action(lambda phase_step, _: reached.add(phase_step.conducting_equipment.mrid))
+    await traversal.trace(PhaseStep(ce, frozenset(PhaseCode.ABC.single_phases)), can_stop_on_start_item=False)
+    reached.discard(ce.mrid)
+    return reached
+
+
+class TestDownstreamIndex(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("normal, trace", [(True, normal_downstream_trace), (False, current_downstream_trace)])
+    async def test_matches_downstream_trace(self, normal, trace):
+        network = create_radial_network()
+        network.get("sw").set_open(True)
+        await SetPhases().run(network)
+        index = build_downstream_index(network, normal)
+
+        for mrid in MRIDS:
+            ce = network.get(mrid)
+            expected = await _traced_downstream(trace, ce)
+            assert {d.mrid for d in index.downstream(ce)} == expected
+            assert index.num_downstream(ce) == len(expected)
+            assert index.num_downstream_usage_points(ce) == sum(network.get(d).num_usage_points() for d in expected)
+            for other in MRIDS:
+                assert index.is_downstream(network.get(other), ce) == (other in expected)
+
+    @pytest.mark.asyncio
+    async def test_queries(self):
+        network = create_radial_network()
+        await SetPhases().run(network)
+        topology = compile_topology(network)
+        index = build_downstream_index(network, topology=topology)
+        j1, j2, sw, s, ec3 = (network.get(mrid) for mrid in ("j1", "j2", "sw", "s", "ec3"))
+
+        assert [ce.mrid for ce in index.downstream(sw)] in (["j2", "c4", "ec2", "c5", "ec3"], ["j2", "c5", "ec3", "c4", "ec2"])
+        assert index.num_downstream(s) == len(MRIDS) - 1
+        assert index.num_downstream_usage_points(s) == 4
+        assert index.num_downstream_usage_points(sw) == 3
+        assert index.num_downstream_usage_points(j2) == 2
+        assert index.num_downstream_usage_points(ec3) == 0
+        assert index.is_downstream(ec3, j1) and index.is_downstream(topology.equipment_index(ec3), topology.equipment_index(j1))
+        assert not index.is_downstream(j1, ec3)
+        assert not index.is_downstream(j1, j1)
+        assert index.feeding(j2) is sw
+        assert index.feeding(s) is None
+
+        network.get("sw").set_open(True)
+        topology.refresh_open_states()
+        assert index.num_downstream(sw) == 5
+        assert build_downstream_index(network, topology=topology).num_downstream(sw) == 5
+        assert build_downstream_index(network, normal=False, topology=topology).num_downstream(sw) == 0
@@ -0,0 +1,97 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import NetworkService, PhaseCode, SetPhases, UsagePoint, Status, find_normal, find_current, find_all_normal, find_all_current, \
+    normal_downstream_trace
+from zepben.evolve.services.network.tracing.find import _find_all
+
+from test.network_fixtures import create_source_for_connecting, create_acls_for_connecting, create_switch_for_connecting, \
+    create_junction_for_connecting, create_energy_consumer_for_connecting
+
+MRIDS = ["s", "c1", "j1", "c2", "ec1", "c3", "sw", "j2", "c4", "ec2", "c5", "ec3"]
+
+
+def create_radial_network() -> NetworkService:
+    #
+    # s -- c1 -- j1 -- c2 -- ec1
+    #             |
+    #             +-- c3 -- sw -- j2 -- c4 -- ec2
+    #                              |
+    #                              +-- c5 -- ec3
+    #
+    network = NetworkService()
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABC)
+    j1 = create_junction_for_connecting(network, "j1", 3, PhaseCode.ABC)
+    j2 = create_junction_for_connecting(network, "j2", 3, PhaseCode.ABC)
+    sw = create_switch_for_connecting(network, "sw", 2, PhaseCode.ABC)
+    c = {i: create_acls_for_connecting(network, f"c{i}", PhaseCode.ABC) for i in range(1, 6)}
+    ec = {i: create_energy_consumer_for_connecting(network, f"ec{i}", 1, PhaseCode.ABC) for i in range(1, 4)}
+    for ce in (*ec.values(), j2):
+        up = UsagePoint(f"{ce.mrid}-up")
+        up.add_equipment(ce)
+        ce.add_usage_point(up)
+        network.add(up)
+
+    for (ce1, sn1), (ce2, sn2) in (((s, 1), (c[1], 1)), ((c[1], 2), (j1, 1)), ((j1, 2), (c[2], 1)), ((c[2], 2), (ec[1], 1)), ((j1, 3), (c[3], 1)),
+                                   ((c[3], 2), (sw, 1)), ((sw, 2), (j2, 1)), ((j2, 2), (c[4], 1)), ((c[4], 2), (ec[2], 1)), ((j2, 3), (c[5], 1)),
+                                   ((c[5], 2), (ec[3], 1))):
+        network.connect_terminals(ce1.get_terminal_by_sn(sn1), ce2.get_terminal_by_sn(sn2))
+    return network
+
+
+def _summary(result):
+    return result.status, None if result.equipment is None else sorted(result.equipment)
+
+
+class TestFind(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("find, find_all", [(find_normal, find_all_normal), (find_current, find_all_current)])
+    async def test_find_all_matches_find(self, find, find_all):
+        network = create_radial_network()
+        network.get("sw").set_open(True)
+        await SetPhases().run(network)
+
+        froms = [network.get(mrid) for mrid in MRIDS for _ in range(len(MRIDS) + 1)]
+        tos = [network.get(mrid) for _ in MRIDS for mrid in MRIDS] + [None] * len(MRIDS)
+        tos = [to for i in range(len(MRIDS)) for to in tos[i * len(MRIDS):(i + 1) * len(MRIDS)] + [None]]
+
+        expected = [_summary((await find(f, t))[0]) for f, t in zip(froms, tos)]
+        assert [_summary(r) for r in await find_all(froms, tos)] == expected
+
+    @pytest.mark.asyncio
+    async def test_finds_paths(self):
+        network = create_radial_network()
+        await SetPhases().run(network)
+        ec1, ec2, j1, j2, s = (network.get(mrid) for mrid in ("ec1", "ec2", "j1", "j2", "s"))
+
+        results = await find_all_normal([s, j1, ec2, ec1, j2], [None, j2, j1, ec2, j2])
+        assert [_summary(r) for r in results] == [
+            (Status.SUCCESS, ["ec1", "ec2", "ec3", "j2"]),
+            (Status.SUCCESS, ["ec1", "j2"]),
+            (Status.SUCCESS, ["ec1", "ec2", "ec3", "j2"]),
+            (Status.NO_PATH, []),
+            (Status.SUCCESS, ["j2"]),
+        ]
+
+        assert [r.status for r in await find_all_normal([s, j1], [j2])] == [Status.MISMATCHED_FROM_TO]
+
+    @pytest.mark.asyncio
+    async def test_shares_traces(self):
+        network = create_radial_network()
+        await SetPhases().run(network)
+        traces = []
+
+        def counting_trace():
+            traces.append(1)
+            return normal_downstream_trace()
+
+        meters = [network.get(mrid) for mrid in ("ec1", "ec2", "ec3", "j2")]
+        results = await _find_all(counting_trace, [network.get("j1")] * 4 + meters, meters + [network.get("s")] * 4)
+        assert all(r.status == Status.SUCCESS for r in results)
+        # One trace from j1 and each meter, then a single reverse trace from s for all of the meters, rather than 12 traces for the pairs on their own.
+        assert len(traces) == 6
@@ -0,0 +1,124 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import SinglePhaseKind, NetworkService, PhaseCode, build_network_islands, compile_topology
+
+from test.network_fixtures import create_source_for_connecting, create_switch_for_connecting, create_acls_for_connecting, \
+    create_energy_consumer_for_connecting
+from test.tracing.test_upstream_device_index import create_protected_network
+
+S1_SIDE = {"s1", "c1", "cb", "c2", "j1", "c3", "rc", "c4", "j2", "c5", "fu", "c6", "ec1", "c7", "ec2", "c8", "ec3", "c10", "tie"}
+S2_SIDE = {"s2", "c9", "tie"}
+
+
+def create_single_phase_branch_network() -> NetworkService:
+    #
+    # s -- n1 -- sw -- n2 -- c1 (A) -- n3 -- ec1 (A)
+    #                   |
+    #                   +-- c2 -- n4 -- ec2
+    #
+    network = NetworkService()
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABC)
+    sw = create_switch_for_connecting(network, "sw", 2, PhaseCode.ABC)
+    c1 = create_acls_for_connecting(network, "c1", PhaseCode.A)
+    ec1 = create_energy_consumer_for_connecting(network, "ec1", 1, PhaseCode.A)
+    c2 = create_acls_for_connecting(network, "c2", PhaseCode.ABC)
+    ec2 = create_energy_consumer_for_connecting(network, "ec2", 1, PhaseCode.ABC)
+
+    for (ce, sn), node in (((s, 1), "n1"), ((sw, 1), "n1"), ((sw, 2), "n2"), ((c1, 1), "n2"), ((c2, 1), "n2"), ((c1, 2), "n3"), ((ec1, 1), "n3"),
+                           ((c2, 2), "n4"), ((ec2, 1), "n4")):
+        network.connect_by_mrid(ce.get_terminal_by_sn(sn), node)
+    return network
+
+
+def _islands(islands):
+    return {frozenset(ce.mrid for ce in island.equipment): frozenset(ce.mrid for ce in island.sources) for island in islands.islands()}
+
+
+class TestNetworkIslands(object):
+
+    def test_finds_islands(self):
+        network = create_protected_network()
+        islands = build_network_islands(network)
+
+        assert _islands(islands) == {frozenset(S1_SIDE): frozenset({"s1"}), frozenset(S2_SIDE): frozenset({"s2"})}
+        assert [{ce.mrid for ce in island.equipment} for island in islands.islands_of("ec1")] == [S1_SIDE]
+        assert sorted(len(island.equipment) for island in islands.islands_of(network.get("tie"))) == [len(S2_SIDE), len(S1_SIDE)]
+        assert islands.is_connected("ec1", "s1")
+        assert islands.is_connected("tie", "s2")
+        assert not islands.is_connected("ec1", "s2")
+
+    def test_open_sources_are_not_energising(self):
+        network = create_protected_network()
+        network.get("s2").in_service = False
+        islands = build_network_islands(network, normal=False)
+
+        assert _islands(islands)[frozenset(S2_SIDE)] == frozenset()
+        assert not islands.islands_of("c9")[0].energised
+        assert build_network_islands(network).islands_of("c9")[0].energised
+
+    @pytest.mark.parametrize("normal", [True, False])
+    def test_update_matches_rebuild(self, normal):
+        network = create_protected_network()
+        islands = build_network_islands(network, normal)
+
+        for mrid, is_open in (("rc", True), ("tie", False), ("fu", True), ("rc", False), ("tie", True), ("fu", False)):
+            switch = network.get(mrid)
+            if normal:
+                switch.set_normally_open(is_open)
+            else:
+                switch.set_open(is_open)
+            islands.update(switch)
+            assert _islands(islands) == _islands(build_network_islands(network, normal))
+
+        network.get("rc").set_open(True)
+        islands.update("rc")
+        if normal:
+            assert islands.is_connected("ec1", "s1")
+        else:
+            assert _islands(islands)[frozenset(S1_SIDE - {"s1", "c1", "cb", "c2", "j1", "c3", "c8", "ec3"})] == frozenset()
+            assert not islands.is_connected("ec1", "s1")
+
+    def test_open_phases(self):
+        network = create_protected_network()
+        topology = compile_topology(network)
+        islands = build_network_islands(network, normal=False, topology=topology)
+        rc = network.get("rc")
+
+        rc.set_open(True, SinglePhaseKind.A)
+        islands.update(rc)
+        assert islands.is_connected("ec1", "s1")
+
+        rc.set_open(True, SinglePhaseKind.B)
+        rc.set_open(True, SinglePhaseKind.C)
+        islands.update(rc)
+        assert not islands.is_connected("ec1", "s1")
+        assert topology.currently_open_phases[topology.equipment_index(rc)] == rc.get_state()
+
+    @pytest.mark.parametrize("normal", [True, False])
+    def test_partly_open_switch_feeding_single_phase_branch(self, normal):
+        network = create_single_phase_branch_network()
+        sw = network.get("sw")
+        islands = build_network_islands(network, normal)
+        assert islands.is_connected("ec1", "s")
+        assert [(sorted(ce.mrid for ce in island.equipment), island.phases) for island in islands.islands_of("ec1")] == \
+               [(["c1", "c2", "ec1", "ec2", "s", "sw"], [SinglePhaseKind.A])]
+
+        if normal:
+            sw.set_normally_open(True, SinglePhaseKind.A)
+        else:
+            sw.set_open(True, SinglePhaseKind.A)
+        islands.update(sw)
+
+        assert not islands.is_connected("ec1", "s")
+        assert islands.is_connected("ec2", "s")
+        assert _islands(islands) == _islands(build_network_islands(network, normal))
+        assert {(frozenset(ce.mrid for ce in island.equipment), tuple(island.phases), island.energised) for island in islands.islands()} == {
+            (frozenset({"s", "sw", "c2", "ec2"}), (SinglePhaseKind.B, SinglePhaseKind.C), True),
+            (frozenset({"s", "sw"}), (SinglePhaseKind.A,), True),
+            (frozenset({"sw", "c1", "ec1", "c2", "ec2"}), (SinglePhaseKind.A,), False),
+        }
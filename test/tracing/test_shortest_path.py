@@ -0,0 +1,101 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import NetworkService, PhaseCode, PerLengthSequenceImpedance, compile_topology, shortest_path, shortest_paths, length_weight, \
+    impedance_weight
+
+from test.network_fixtures import create_source_for_connecting, create_acls_for_connecting, create_switch_for_connecting, \
+    create_energy_consumer_for_connecting
+
+
+def create_meshed_network() -> NetworkService:
+    #
+    #       +-- a (10m, low impedance) -- n2 -- b (10m, low impedance) --+
+    #       |                                                            |
+    # s -- n1                                                           n3 -- ec
+    #       |                                                            |
+    #       +-- c (15m, high impedance) -- sw -- d (1m, high impedance) --+
+    #
+    # sw is normally open and currently closed.
+    #
+    network = NetworkService()
+    network.add(PerLengthSequenceImpedance("low", r=0.06, x=0.08))
+    network.add(PerLengthSequenceImpedance("high", r=0.6, x=0.8))
+
+    s = create_source_for_connecting(network, "s", 1, PhaseCode.ABC)
+    ec = create_energy_consumer_for_connecting(network, "ec", 1, PhaseCode.ABC)
+    sw = create_switch_for_connecting(network, "sw", 2, PhaseCode.ABC)
+    sw.set_normally_open(True)
+    a = create_acls_for_connecting(network, "a", PhaseCode.ABC, 10.0, "low")
+    b = create_acls_for_connecting(network, "b", PhaseCode.ABC, 10.0, "low")
+    c = create_acls_for_connecting(network, "c", PhaseCode.ABC, 15.0, "high")
+    d = create_acls_for_connecting(network, "d", PhaseCode.ABC, 1.0, "high")
+
+    for (ce, sn), node in (((s, 1), "n1"), ((a, 1), "n1"), ((c, 1), "n1"), ((a, 2), "n2"), ((b, 1), "n2"), ((b, 2), "n3"), ((d, 2), "n3"),
+                           ((ec, 1), "n3"), ((c, 2), "n4"), ((sw, 1), "n4"), ((sw, 2), "n5"), ((d, 1), "n5")):
+        network.connect_by_mrid(ce.get_terminal_by_sn(sn), node)
+    return network
+
+
+def _mrids(path):
+    return [ce.mrid for ce in path.equipment] if path is not None else None
+
+
+class TestShortestPath(object):
+
+    def test_weights(self):
+        network = create_meshed_network()
+        assert length_weight(network.get("c")) == 15.0
+        assert length_weight(network.get("sw")) == 0.0
+        assert impedance_weight(network.get("a")) == pytest.approx(1.0)
+        assert impedance_weight(network.get("c")) == pytest.approx(15.0)
+        assert impedance_weight(network.get("s")) == 0.0
+
+    @pytest.mark.parametrize("normal, weight, expected, cost", [
+        (True, length_weight, ["s", "a", "b", "ec"], 20.0),
+        (False, length_weight, ["s", "c", "sw", "d", "ec"], 16.0),
+        (False, impedance_weight, ["s", "a", "b", "ec"], 2.0),
+        (False, lambda ce: 1.0, ["s", "a", "b", "ec"], 4.0),
+    ])
+    def test_finds_lowest_weight_path(self, normal, weight, expected, cost):
+        network = create_meshed_network()
+        path = shortest_path(compile_topology(network), network.get("s"), network.get("ec"), weight, normal)
+        assert _mrids(path) == expected
+        assert path.cost == pytest.approx(cost)
+
+    def test_open_equipment(self):
+        network = create_meshed_network()
+        network.get("a").normally_in_service = False
+        topology = compile_topology(network)
+        s, ec, sw, d = (network.get(mrid) for mrid in ("s", "ec", "sw", "d"))
+
+        assert shortest_path(topology, s, ec) is None
+        assert _mrids(shortest_path(topology, s, sw)) == ["s", "c", "sw"]
+        assert _mrids(shortest_path(topology, sw, ec)) == ["sw", "d", "ec"]
+        assert _mrids(shortest_path(topology, s, s)) == ["s"]
+
+        network.get("sw").set_normally_open(False)
+        topology.refresh_open_states()
+        assert _mrids(shortest_path(topology, s, ec)) == ["s", "c", "sw", "d", "ec"]
+
+    def test_many_to_many_matches_single_paths(self):
+        network = create_meshed_network()
+        topology = compile_topology(network)
+        mrids = ["s", "a", "b", "c", "d", "sw", "ec"]
+        froms = [network.get(mrid) for mrid in mrids + ["s"]]
+        tos = [network.get(mrid) for mrid in mrids]
+
+        paths = shortest_paths(topology, froms, tos, impedance_weight, False)
+        assert [[_mrids(p) for p in row] for row in paths] == \
+               [[_mrids(shortest_path(topology, f, t, impedance_weight, False)) for t in tos] for f in froms]
+        assert [[p.cost for p in row] for row in paths] == \
+               [[shortest_path(topology, f, t, impedance_weight, False).cost for t in tos] for f in froms]
+
+    def test_negative_weights(self):
+        network = create_meshed_network()
+        with pytest.raises(ValueError):
+            shortest_path(compile_topology(network), network.get("s"), network.get("ec"), lambda ce: -1.0)
@@ -0,0 +1,123 @@
+#  Copyright 2021 Zeppelin Bend Pty Ltd
+#
+#  This Source Code Form is subject to the terms of the Mozilla Public
+#  License, v. 2.0. If a copy of the MPL was not distributed with this
+#  file, You can obtain one at https://mozilla.org/MPL/2.0/.
+import pytest
+
+from zepben.evolve import NetworkService, PhaseCode, SetPhases, PhaseStep, Fuse, Recloser, ConductingEquipment, build_upstream_device_index, \
+    normal_upstream_trace, current_upstream_trace
+
+from test.network_fixtures import create_source_for_connecting, create_acls_for_connecting, create_switch_for_connecting, \
+    create_junction_for_connecting, create_energy_consumer_for_connecting, create_terminals, create_feeder, create_substation
+
+MRIDS = ["s1", "c1", "cb", "c2", "j1", "c3", "rc", "c4", "j2", "c5", "fu", "c6", "ec1", "c7", "ec2", "c8", "ec3", "s2", "c9", "tie", "c10"]
+
+
+def _create_device(network: NetworkService, device: ConductingEquipment) -> ConductingEquipment:
+    create_terminals(network, device, 2, PhaseCode.ABC)
+    network.add(device)
+    return device
+
+
+def create_protected_network() -> NetworkService:
+    #
+    # s1 -- c1 -- cb -- c2 -- j1 -- c3 -- rc -- c4 -- j2 -- c5 -- fu -- c6 -- ec1
+    #                          |                       |
+    #                          +-- c8 -- ec3           +-- c7 -- ec2
+    #                                                  |
+    #                                s2 -- c9 -- tie -- c10
+    #
+    # cb is the head of a feeder, and tie is normally and currently open.
+    #
+    network = NetworkService()
+    s1 = create_source_for_connecting(network, "s1", 1, PhaseCode.ABC)
+    s2 = create_source_for_connecting(network, "s2", 1, PhaseCode.ABC)
+    cb = create_switch_for_connecting(network, "cb", 2, PhaseCode.ABC)
+    tie = create_switch_for_connecting(network, "tie", 2, PhaseCode.ABC, True, True, True)
+    rc = _create_device(network, Recloser("rc"))
+    fu = _create_device(network, Fuse("fu"))
+    j1 = create_junction_for_connecting(network, "j1", 3, PhaseCode.ABC)
+    j2 = create_junction_for_connecting(network, "j2", 4, PhaseCode.ABC)
+    c = {i: create_acls_for_connecting(network, f"c{i}", PhaseCode.ABC) for i in range(1, 11)}
+    ec = {i: create_energy_consumer_for_connecting(network, f"ec{i}", 1, PhaseCode.ABC) for i in range(1, 4)}
+
+    for (ce1, sn1), (ce2, sn2) in (((s1, 1), (c[1], 1)), ((c[1], 2), (cb, 1)), ((cb, 2), (c[2], 1)), ((c[2], 2), (j1, 1)), ((j1, 2), (c[3], 1)),
+                                   ((c[3], 2), (rc, 1)), ((rc, 2), (c[4], 1)), ((c[4], 2), (j2, 1)), ((j2, 2), (c[5], 1)), ((c[5], 2), (fu, 1)),
+                                   ((fu, 2), (c[6], 1)), ((c[6], 2), (ec[1], 1)), ((j2, 3), (c[7], 1)), ((c[7], 2), (ec[2], 1)),
+                                   ((j1, 3), (c[8], 1)), ((c[8], 2), (ec[3], 1)), ((s2, 1), (c[9], 1)), ((c[9], 2), (tie, 1)), ((tie, 2), (c[10], 1)),
+                                   ((c[10], 2), (j2, 4))):
+        network.connect_terminals(ce1.get_terminal_by_sn(sn1), ce2.get_terminal_by_sn(sn2))
+
+    create_feeder(network, "f", "f", create_substation(network, "sub"), cb.get_terminal_by_sn(2))
+    return network
+
+
+def _nearest(index, ce):
+    return tuple(d.mrid if d is not None else None for d in (index.nearest_breaker(ce), index.nearest_fuse(ce), index.nearest_recloser(ce),
+                                                              index.nearest_feeder_head(ce), index.nearest_protective_device(ce),
+                                                              index.feeder_of(ce)))
+
+
+async def _traced_upstream(trace, ce):
+    reached = []
+    traversal = trace()
+    traversal.add_step_action(lambda phase_step, _: reached.append(phase_step.conducting_equipment.mrid))
+    await traversal.trace(PhaseStep(ce, frozenset(PhaseCode.ABC.single_phases)), can_stop_on_start_item=False)
+    return reached
+
+
+class TestUpstreamDeviceIndex(object):
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("trace", [normal_upstream_trace, current_upstream_trace])
+    async def test_upstream_trace(self, trace):
+        network = create_protected_network()
+        await SetPhases().run(network)
+
+        assert await _traced_upstream(trace, network.get("ec1")) == ["ec1", "c6", "fu", "c5", "j2", "c4", "rc", "c3", "j1", "c2", "cb", "c1", "s1"]
+        assert await _traced_upstream(trace, network.get("ec3")) == ["ec3", "c8", "j1", "c2", "cb", "c1", "s1"]
+        assert await _traced_upstream(trace, network.get("c10")) == ["c10", "j2", "c4", "rc", "c3", "j1", "c2", "cb", "c1", "s1"]
+        assert await _traced_upstream(trace, network.get("s2")) == ["s2"]
+
+    @pytest.mark.asyncio
+    async def test_nearest_devices(self):
+        network = create_protected_network()
+        await SetPhases().run(network)
+        index = build_upstream_device_index(network)
+
+        assert _nearest(index, network.get("ec1")) == ("cb", "fu", "rc", "cb", "fu", "c6")
+        assert _nearest(index, network.get("ec2")) == ("cb", None, "rc", "cb", "rc", "c7")
+        assert _nearest(index, network.get("ec3")) == ("cb", None, None, "cb", "cb", "c8")
+        assert _nearest(index, network.get("fu")) == ("cb", None, "rc", "cb", "rc", "c5")
+        assert _nearest(index, network.get("cb")) == (None, None, None, None, None, "c1")
+        assert _nearest(index, network.get("s1")) == (None,) * 6
+        assert _nearest(index, network.get("c10")) == ("cb", None, "rc", "cb", "rc", "j2")
+        assert _nearest(index, network.get("c9")) == (None, None, None, None, None, "s2")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("normal", [True, False])
+    async def test_refresh_matches_rebuild(self, normal):
+        network = create_protected_network()
+        set_phases = SetPhases()
+        await set_phases.run(network)
+        index = build_upstream_device_index(network, normal)
+
+        for mrid, is_open in (("rc", True), ("tie", False), ("rc", False), ("tie", True)):
+            switch = network.get(mrid)
+            if normal:
+                switch.set_normally_open(is_open)
+            else:
+                switch.set_open(is_open)
+            index.refresh(await set_phases.run_switch(network, switch, normal))
+
+            expected = build_upstream_device_index(network, normal)
+            assert {mrid: _nearest(index, network.get(mrid)) for mrid in MRIDS} == {mrid: _nearest(expected, network.get(mrid)) for mrid in MRIDS}
+
+        rc = network.get("rc")
+        if normal:
+            rc.set_normally_open(True)
+        else:
+            rc.set_open(True)
+        index.refresh(await set_phases.run_switch(network, rc, normal))
+        assert _nearest(index, network.get("ec1")) == (None,) * 6